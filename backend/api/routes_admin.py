@@ -0,0 +1,79 @@
+"""API routes for operational / admin endpoints."""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from backend.pool_monitor import PoolStats
+from database import get_db, get_read_db, SessionLocal
+from core.snapshot_blob_store import SnapshotBlobStore
+from core.json_reencoder import JsonReencoder, JsonReencodeJob
+from models.types import COMPRESSIBLE_COLUMNS, CODEC_NAMES, preferred_codec, zstandard
+
+
+router = APIRouter()
+
+
+@router.get("/db-pool")
+async def get_db_pool_stats():
+    """
+    Connection pool pressure per engine.
+    
+    Checked-out / overflow gauges, checkout wait and hold time histograms,
+    pool timeouts and connections currently held longer than
+    DB_POOL_LONG_HELD_SECONDS (with the thread holding them).
+    """
+    return {"pools": [stats.report() for stats in PoolStats.all()]}
+
+
+@router.get("/version-storage")
+async def get_version_storage_report(db: Session = Depends(get_read_db)):
+    """
+    Version snapshot storage report.
+    
+    Versions by storage format (full, delta, blob), state/value blob counts
+    and bytes, and the deduplication ratio of blob-stored snapshots
+    (logical bytes / stored bytes).
+    """
+    return SnapshotBlobStore(db).report()
+
+
+@router.get("/json-compression")
+async def get_json_compression_status(db: Session = Depends(get_read_db)):
+    """
+    Compressed JSON settings, compressible / compressed columns and the last
+    re-encoding job.
+    """
+    codec = preferred_codec()
+    job = JsonReencodeJob.current()
+    
+    return {
+        "codec": CODEC_NAMES[codec] if codec else None,
+        "zstd_available": zstandard is not None,
+        "compressible_columns": COMPRESSIBLE_COLUMNS,
+        "columns": [
+            f"{table.name}.{column.name}"
+            for table, columns in JsonReencoder(db).targets() for column in columns
+        ],
+        "job": job.to_dict() if job else None,
+    }
+
+
+@router.post("/json-compression/reencode", status_code=202)
+async def start_json_reencode(
+    chunk_size: int = Query(500, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """
+    Start a background job that rewrites the columns enabled in
+    JSON_COMPRESSED_COLUMNS with the current codec (plain JSON written
+    before compression was enabled, or another codec). Poll
+    GET /json-compression for progress.
+    
+    On PostgreSQL the columns must have been converted to bytea first
+    (compress_json_columns.py).
+    """
+    try:
+        JsonReencoder(db).check_storage()
+        job = JsonReencodeJob.start(SessionLocal, chunk_size=chunk_size)
+    except (ValueError, RuntimeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return job.to_dict()
@@ -4,9 +4,10 @@ API Routes - Import/Export Manager
 Endpoints para importación/exportación masiva de productos.
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
 from typing import List, Dict, Optional
 import sys
 from pathlib import Path
@@ -16,7 +17,7 @@ import io
 sys.path.append(str(Path(__file__).parent.parent))
 
 from import_export.import_export_manager import ImportExportManager
-from database import get_db
+from database import get_db, get_read_db
 
 router = APIRouter(prefix="/api/import-export", tags=["import-export"])
 
@@ -44,7 +45,7 @@ class ExportFiltersRequest(BaseModel):
 # --- Routes ---
 
 @router.get("/template/excel")
-async def download_excel_template():
+async def download_excel_template(db: Session = Depends(get_read_db)):
     """
     Descargar template Excel para importación masiva.
     
@@ -55,8 +56,6 @@ async def download_excel_template():
     - Dropdowns de validación (Family, Format, PAO, etc.)
     """
     try:
-        # Obtener session de DB
-        db = next(get_db())
         manager = ImportExportManager(db)
         
         # Generar template
@@ -76,7 +75,7 @@ async def download_excel_template():
 
 
 @router.post("/import/excel", response_model=ImportResultResponse)
-async def import_from_excel(file: UploadFile = File(...)):
+async def import_from_excel(file: UploadFile = File(...), db: Session = Depends(get_db)):
     """
     Importar productos desde archivo Excel.
     
@@ -105,8 +104,6 @@ async def import_from_excel(file: UploadFile = File(...)):
             content = await file.read()
             f.write(content)
         
-        # Obtener session de DB
-        db = next(get_db())
         manager = ImportExportManager(db)
         
         # Importar
@@ -121,7 +118,7 @@ async def import_from_excel(file: UploadFile = File(...)):
 
 
 @router.get("/export/markdown/{sku}")
-async def export_to_markdown(sku: str):
+async def export_to_markdown(sku: str, db: Session = Depends(get_read_db)):
     """
     Exportar ficha de producto a formato Markdown.
     
@@ -129,7 +126,6 @@ async def export_to_markdown(sku: str):
         sku: SKU del producto
     """
     try:
-        db = next(get_db())
         manager = ImportExportManager(db)
         
         # Generar Markdown
@@ -151,7 +147,7 @@ async def export_to_markdown(sku: str):
 
 
 @router.get("/export/html/{sku}")
-async def export_to_html(sku: str):
+async def export_to_html(sku: str, db: Session = Depends(get_read_db)):
     """
     Exportar ficha de producto a formato HTML.
     
@@ -159,7 +155,6 @@ async def export_to_html(sku: str):
         sku: SKU del producto
     """
     try:
-        db = next(get_db())
         manager = ImportExportManager(db)
         
         # Generar HTML
@@ -184,7 +179,8 @@ async def export_to_html(sku: str):
 async def export_catalog_excel(
     family: Optional[str] = Query(None),
     brand: Optional[str] = Query(None),
-    status: Optional[str] = Query(None)
+    status: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db)
 ):
     """
     Exportar catálogo de productos a Excel con filtros.
@@ -195,7 +191,6 @@ async def export_catalog_excel(
         status: Filtrar por estado (opcional)
     """
     try:
-        db = next(get_db())
         manager = ImportExportManager(db)
         
         # Aplicar filtros
@@ -224,12 +219,11 @@ async def export_catalog_excel(
 
 
 @router.get("/stats")
-async def get_import_export_stats():
+async def get_import_export_stats(db: Session = Depends(get_read_db)):
     """
     Obtener estadísticas de import/export.
     """
     try:
-        db = next(get_db())
         manager = ImportExportManager(db)
         
         # Por ahora retornar info básica
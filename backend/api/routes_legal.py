@@ -1,11 +1,15 @@
 """API routes for legal compliance operations."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
-from database import get_db
+from database import get_db, get_read_db, ReadSessionLocal
 from legal_framework.compliance_validator import ComplianceValidator
 from core.product_sheet_manager import ProductSheetManager
+from core.bulk_compliance_manager import BulkComplianceManager, BulkComplianceJob
+from core.compliance_status_manager import ComplianceStatusManager
+from core.serialization import dumps_line, NDJSON_MEDIA_TYPE
 
 
 router = APIRouter()
@@ -25,6 +29,51 @@ class ValidateRequest(BaseModel):
         }
 
 
+class BulkValidateRequest(BaseModel):
+    """Schema for catalog-wide compliance validation."""
+    countries: Optional[List[str]] = None
+    skus: Optional[List[str]] = None
+    family: Optional[str] = None
+    brand: Optional[str] = None
+    status: Optional[str] = None
+    only_failing: bool = False
+    chunk_size: int = 500
+    workers: Optional[int] = None
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "countries": ["PORTUGAL", "ITALY", "SPAIN"],
+                "family": "COSMETICS_FACIAL",
+                "only_failing": True
+            }
+        }
+
+
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _bulk_params(request: BulkValidateRequest) -> Dict[str, Any]:
+    """Keyword arguments for BulkComplianceManager.iter_results."""
+    return {
+        "countries": request.countries,
+        "filters": {"family": request.family, "brand": request.brand, "status": request.status},
+        "skus": request.skus,
+        "only_failing": request.only_failing,
+        "chunk_size": request.chunk_size,
+        "workers": request.workers,
+    }
+
+
+def _excel_response(results, summary: Dict[str, Any]) -> Response:
+    """Excel summary as a download."""
+    return Response(
+        content=BulkComplianceManager.build_excel(results, summary),
+        media_type=EXCEL_MEDIA_TYPE,
+        headers={"Content-Disposition": "attachment; filename=compliance_report.xlsx"}
+    )
+
+
 @router.get("/countries")
 async def get_available_countries():
     """Get list of available countries with legal frameworks."""
@@ -81,7 +130,7 @@ async def get_family_requirements(country: str, family: str):
 @router.post("/validate")
 async def validate_compliance(
     request: ValidateRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Validate product compliance against multiple countries."""
     # Get product data
@@ -104,7 +153,7 @@ async def validate_compliance(
 async def get_product_compliance(
     sku: str,
     country: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get compliance status for a product in a specific country."""
     # Get product
@@ -126,7 +175,7 @@ async def get_product_compliance(
 @router.get("/products/{sku}/compliance")
 async def get_product_compliance_all(
     sku: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get compliance status for a product in all available countries."""
     # Get product
@@ -145,3 +194,107 @@ async def get_product_compliance_all(
     results = validator.validate_multiple_countries(product_data, countries)
     
     return results
+
+
+@router.post("/bulk-validate")
+def bulk_validate(
+    request: BulkValidateRequest,
+    format: str = Query("ndjson", pattern="^(ndjson|xlsx)$"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Validate many products against several countries.
+    
+    NDJSON (default) streams one line per event: start, product, progress
+    (with running per-country counts) and summary. xlsx returns a report with
+    a per-country summary sheet and one row per product.
+    """
+    manager = BulkComplianceManager(db)
+    events = manager.iter_results(**_bulk_params(request))
+    
+    if format == "xlsx":
+        results = []
+        summary = {}
+        for event in events:
+            if event["type"] == "product":
+                results.append(event)
+            elif event["type"] == "summary":
+                summary = event
+        return _excel_response(results, summary)
+    
+    return StreamingResponse(
+        (dumps_line(event) for event in events),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+@router.post("/bulk-validate/jobs")
+async def start_bulk_validation_job(request: BulkValidateRequest):
+    """Start a background bulk validation job; poll it for progress."""
+    job = BulkComplianceJob.start(ReadSessionLocal, _bulk_params(request))
+    return job.to_dict()
+
+
+@router.get("/bulk-validate/jobs/{job_id}")
+async def get_bulk_validation_job(job_id: str):
+    """Get job status, progress and per-country aggregate counts."""
+    job = BulkComplianceJob.get(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    return job.to_dict()
+
+
+@router.get("/bulk-validate/jobs/{job_id}/results")
+def get_bulk_validation_results(
+    job_id: str,
+    format: str = Query("ndjson", pattern="^(ndjson|xlsx)$")
+):
+    """Download job results (available so far for NDJSON; on completion for xlsx)."""
+    job = BulkComplianceJob.get(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    if format == "xlsx":
+        if job.status != "completed":
+            raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}")
+        return _excel_response(job.iter_results(), job.summary)
+    
+    return StreamingResponse(
+        (dumps_line(result) for result in job.iter_results()),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+@router.get("/compliance-index/summary")
+async def get_compliance_index_summary(db: Session = Depends(get_read_db)):
+    """Count products by country and compliance status from the persisted index."""
+    manager = ComplianceStatusManager(db)
+    return {"countries": manager.get_summary()}
+
+
+@router.get("/compliance-index/products/{sku}")
+async def get_indexed_product_compliance(sku: str, db: Session = Depends(get_read_db)):
+    """Get the persisted per-country compliance rows for a product."""
+    manager = ComplianceStatusManager(db)
+    rows = manager.get_product_status(sku)
+    
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"No compliance status indexed for SKU {sku}")
+    
+    return {"sku": sku, "countries": {row.country: row.to_dict() for row in rows}}
+
+
+@router.post("/compliance-index/sync")
+def sync_compliance_index(
+    countries: Optional[List[str]] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Recompute index rows that are missing or validated with older rules."""
+    try:
+        manager = ComplianceStatusManager(db)
+        return {"refreshed": manager.sync(countries)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,14 +1,21 @@
 """API routes for product sheet operations."""
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
-from database import get_db
+from database import get_db, get_read_db
 from core.product_sheet_manager import ProductSheetManager
+from core.ean_index import EanIndex
+from core.product_completion import ProductCompletion
+from core.catalog_counters import CatalogCounters
+from core.serialization import json_response, NDJSON_MEDIA_TYPE
 
 
 router = APIRouter()
 
+FIELDS_DESCRIPTION = "Comma-separated columns, 'list' (compact list view, default) or 'all'"
+
 
 class ProductSheetCreate(BaseModel):
     """Schema for creating a product sheet."""
@@ -69,13 +76,19 @@ class ProductSheetResponse(BaseModel):
         from_attributes = True
 
 
+class EanResolveRequest(BaseModel):
+    """Schema for resolving several EANs at once."""
+    eans: List[str] = Field(..., min_length=1, max_length=1000)
+
+
 class ProductListResponse(BaseModel):
     """Schema for product list response."""
     products: List[Dict[str, Any]]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     per_page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 @router.post("/", response_model=Dict[str, Any], status_code=201)
@@ -92,7 +105,10 @@ async def create_product(
         raise HTTPException(status_code=400, detail=f"Product with SKU {product.sku} already exists")
     
     # Create product
-    new_product = manager.create_sheet(product.dict(), created_by="system")
+    try:
+        new_product = manager.create_sheet(product.dict(), created_by="system")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return new_product.to_dict()
 
@@ -101,14 +117,38 @@ async def create_product(
 async def list_products(
     page: int = Query(1, ge=1),
     per_page: int = Query(30, ge=1, le=100),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="offset (page) or cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (implies pagination=cursor)"),
+    sort_by: str = Query("created_date"),
+    sort_desc: bool = Query(True),
+    include_total: bool = Query(True, description="Total count (cached per filter combination)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     family: Optional[str] = Query(None),
     brand: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    compliance_country: Optional[str] = Query(None, description="Country code for compliance filters"),
+    compliance_status: Optional[List[str]] = Query(None, description="COMPLIANT, WARNING, NON_COMPLIANT, ERROR"),
+    min_compliance: Optional[int] = Query(None, ge=0, le=100),
+    max_compliance: Optional[int] = Query(None, ge=0, le=100),
+    min_completion: Optional[int] = Query(None, ge=0, le=100),
+    max_completion: Optional[int] = Query(None, ge=0, le=100),
+    db: Session = Depends(get_read_db)
 ):
-    """List all product sheets with filters and pagination."""
+    """
+    List all product sheets with filters and pagination.
+    
+    Offset mode (default) returns page/pages. Cursor mode returns
+    next_cursor (null on the last page) and costs the same at any depth;
+    it supports sort_by created_date, updated_date, completion_percentage
+    or sku.
+    """
     manager = ProductSheetManager(db)
     
+    try:
+        columns = manager.resolve_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     filters = {}
     if family:
         filters['family'] = family
@@ -116,50 +156,201 @@ async def list_products(
         filters['brand'] = brand
     if status:
         filters['status'] = status
+    if compliance_country:
+        filters['compliance_country'] = compliance_country
+    if compliance_status:
+        filters['compliance_status'] = compliance_status
+    if min_compliance is not None:
+        filters['min_compliance'] = min_compliance
+    if max_compliance is not None:
+        filters['max_compliance'] = max_compliance
+    if min_completion is not None:
+        filters['min_completion'] = min_completion
+    if max_completion is not None:
+        filters['max_completion'] = max_completion
+    
+    if cursor or pagination == "cursor":
+        try:
+            products, next_cursor = manager.list_sheets_cursor(
+                filters=filters,
+                cursor=cursor,
+                per_page=per_page,
+                sort_by=sort_by,
+                sort_desc=sort_desc,
+                columns=columns,
+                as_rows=True
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        return json_response({
+            "products": products,
+            "total": manager.count_sheets_cached(filters) if include_total else None,
+            "page": None,
+            "per_page": per_page,
+            "pages": None,
+            "next_cursor": next_cursor
+        })
     
     products, total = manager.list_sheets(
         filters=filters,
         page=page,
-        per_page=per_page
+        per_page=per_page,
+        sort_by=sort_by,
+        sort_desc=sort_desc,
+        with_total=include_total,
+        columns=columns,
+        as_rows=True
     )
     
-    return {
-        "products": [p.to_dict() for p in products],
+    return json_response({
+        "products": products,
         "total": total,
         "page": page,
         "per_page": per_page,
-        "pages": (total + per_page - 1) // per_page
-    }
+        "pages": (total + per_page - 1) // per_page if total is not None else None,
+        "next_cursor": None
+    })
+
+
+@router.get("/aggregates")
+async def get_product_aggregates(
+    fresh: bool = Query(False, description="Recount from the products table instead of the counters"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Catalog counts for the dashboard: total, by family, status, family and
+    status, completion bucket and title language.
+    
+    Served from materialized counters maintained on every write and cached
+    for a few seconds.
+    """
+    try:
+        return json_response(CatalogCounters(db).aggregates(fresh=fresh))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/search")
 async def search_products(
     q: str = Query(..., min_length=1),
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=200),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_read_db)
 ):
-    """Search products by SKU, EAN, or title."""
+    """Search products by SKU, EAN, brand, title, description or INCI (ranked)."""
     manager = ProductSheetManager(db)
-    results = manager.search_sheets(q)
     
-    return {
-        "results": [p.to_dict() for p in results],
+    try:
+        columns = manager.resolve_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    results = manager.search_sheets(q, limit, columns=columns, as_rows=True)
+    
+    return json_response({
+        "results": results,
         "count": len(results)
+    })
+
+
+@router.get("/by-ean/{ean}", response_model=Dict[str, Any])
+async def get_product_by_ean(
+    ean: str,
+    db: Session = Depends(get_read_db)
+):
+    """Get the product sheet that owns a barcode."""
+    manager = ProductSheetManager(db)
+    sku = manager.ean_index.resolve(ean)
+    product = manager.get_row(sku) if sku else None
+    
+    if not product:
+        raise HTTPException(status_code=404, detail=f"Product with EAN {ean} not found")
+    
+    return json_response(product)
+
+
+@router.post("/by-ean/resolve")
+async def resolve_eans(
+    request: EanResolveRequest,
+    db: Session = Depends(get_read_db)
+):
+    """Resolve up to 1000 EANs to SKUs in one query."""
+    manager = ProductSheetManager(db)
+    resolved = manager.resolve_eans(request.eans)
+    
+    return {
+        "resolved": resolved,
+        "not_found": [ean for ean in EanIndex.normalize(request.eans) if ean not in resolved],
+        "count": len(resolved)
     }
 
 
+@router.post("/bulk")
+async def bulk_upsert_products(
+    request: Request,
+    chunk_size: int = Query(500, ge=1, le=5000, description="Products per batch and transaction"),
+    db: Session = Depends(get_db)
+):
+    """
+    Create or update many product sheets.
+    
+    Body: JSON array of products, or NDJSON (Content-Type
+    application/x-ndjson, one product per line). Each product has a SKU
+    plus the fields to set. Every product is validated first; invalid ones
+    are reported per item and the rest are written in batches.
+    
+    Returns summary {created, updated, unchanged, errors} and per-item
+    results [{index, sku, status, error?}].
+    """
+    body = await request.body()
+    
+    try:
+        if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            items = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+    
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail="Body must be a non-empty JSON array or NDJSON stream")
+    
+    manager = ProductSheetManager(db)
+    result = manager.bulk_upsert(items, updated_by="system", chunk_size=chunk_size)
+    
+    return json_response(result)
+
+
+@router.post("/completion/rebuild")
+def rebuild_completion(
+    only_missing: bool = Query(False, description="Only products without completion bits"),
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """Recompute completion_percentage of the whole catalog in batches."""
+    try:
+        rebuilt = ProductCompletion(db).rebuild(only_missing=only_missing, chunk_size=chunk_size)
+        CatalogCounters(db).rebuild()
+        ProductSheetManager.invalidate_counts()
+        return {"rebuilt": rebuilt}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{sku}", response_model=Dict[str, Any])
 async def get_product(
     sku: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific product sheet by SKU."""
     manager = ProductSheetManager(db)
-    product = manager.get_sheet(sku)
+    product = manager.get_row(sku)
     
     if not product:
         raise HTTPException(status_code=404, detail=f"Product with SKU {sku} not found")
     
-    return product.to_dict()
+    return json_response(product)
 
 
 @router.put("/{sku}", response_model=Dict[str, Any])
@@ -174,7 +365,10 @@ async def update_product(
     # Only include non-None fields
     update_data = {k: v for k, v in product_update.dict().items() if v is not None}
     
-    product = manager.update_sheet(sku, update_data, updated_by="system")
+    try:
+        product = manager.update_sheet(sku, update_data, updated_by="system")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     if not product:
         raise HTTPException(status_code=404, detail=f"Product with SKU {sku} not found")
@@ -201,7 +395,7 @@ async def delete_product(
 @router.get("/{sku}/stats")
 async def get_product_stats(
     sku: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get statistics for a specific product."""
     manager = ProductSheetManager(db)
@@ -4,8 +4,10 @@ API Routes - Translation Engine
 Endpoints para sugerencias de traducción y gestión de translation memory.
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
 from typing import List, Dict, Optional
 import sys
 from pathlib import Path
@@ -14,12 +16,19 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from translations.translation_engine import TranslationEngine
+from core.auto_translation_manager import AutoTranslationManager
+from core.serialization import dumps_line, NDJSON_MEDIA_TYPE
+from database import get_db
+from config import settings
 
 
 router = APIRouter(prefix="/api/translations", tags=["translations"])
 
-# Inicializar TranslationEngine
-translation_engine = TranslationEngine()
+# Inicializar TranslationEngine (backend "sql" para varios workers)
+translation_engine = TranslationEngine(
+    memory_backend=settings.translation_memory_backend,
+    memory_cache_size=settings.translation_memory_cache_size
+)
 
 
 # --- Pydantic Models ---
@@ -34,6 +43,23 @@ class TranslationSuggestionRequest(BaseModel):
     family: Optional[str] = None
 
 
+class BatchSuggestionItem(BaseModel):
+    """Entrada individual de una petición batch de sugerencias."""
+    source_text: str
+    source_lang: str
+    target_lang: str
+    family: Optional[str] = None
+    threshold: Optional[float] = None
+    max_suggestions: Optional[int] = None
+
+
+class BatchSuggestionRequest(BaseModel):
+    """Request para obtener sugerencias de muchos textos en una sola llamada."""
+    items: List[BatchSuggestionItem]
+    threshold: float = 0.75
+    max_suggestions: int = 5
+
+
 class TranslationSuggestion(BaseModel):
     """Sugerencia de traducción."""
     text: str
@@ -42,6 +68,28 @@ class TranslationSuggestion(BaseModel):
     count: int = 0
 
 
+class TermSuggestionRequest(BaseModel):
+    """Request para detectar términos de glossary dentro de un texto."""
+    source_text: str
+    family: str
+    target_lang: str
+
+
+class TermSuggestion(BaseModel):
+    """Término de glossary encontrado dentro del texto origen."""
+    term: str
+    matched_text: str
+    translations: List[str]
+    start: int
+    end: int
+
+
+class BatchSuggestionResponse(BaseModel):
+    """Sugerencias por entrada, en el mismo orden que la petición."""
+    results: List[List[TranslationSuggestion]]
+    total_items: int
+
+
 class SaveTranslationRequest(BaseModel):
     """Request para guardar traducción."""
     source_text: str
@@ -51,6 +99,17 @@ class SaveTranslationRequest(BaseModel):
     confidence: float = 0.95
 
 
+class AutoTranslateRequest(BaseModel):
+    """Request para auto-traducir campos obligatorios que faltan."""
+    skus: Optional[List[str]] = None
+    family: Optional[str] = None
+    brand: Optional[str] = None
+    status: Optional[str] = None
+    countries: Optional[List[str]] = None
+    min_confidence: float = 0.9
+    chunk_size: int = 200
+
+
 class GlossaryResponse(BaseModel):
     """Respuesta con glosario."""
     family: str
@@ -92,6 +151,55 @@ async def suggest_translation(request: TranslationSuggestionRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/suggest/batch", response_model=BatchSuggestionResponse)
+async def suggest_translation_batch(request: BatchSuggestionRequest):
+    """
+    Obtener sugerencias para muchos textos en una sola llamada.
+    
+    Pensado para una ficha completa (title, description, mode_of_use,
+    warnings...) en varios idiomas destino. Los resultados respetan el orden
+    de entrada.
+    """
+    try:
+        items = [
+            item.dict(exclude_none=True)
+            for item in request.items
+        ]
+        
+        results = translation_engine.suggest_batch(
+            items,
+            threshold=request.threshold,
+            max_suggestions=request.max_suggestions
+        )
+        
+        return {
+            "results": results,
+            "total_items": len(items)
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/suggest/terms", response_model=List[TermSuggestion])
+async def suggest_terms(request: TermSuggestionRequest):
+    """
+    Detectar términos de glossary dentro de un texto largo.
+    
+    Útil para párrafos (mode_of_use, warnings) donde no hay exact match:
+    devuelve cada término del glossary encontrado con su posición.
+    """
+    try:
+        return translation_engine.suggest_terms(
+            source_text=request.source_text,
+            family=request.family,
+            target_lang=request.target_lang
+        )
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/save")
 async def save_translation(request: SaveTranslationRequest):
     """
@@ -120,6 +228,67 @@ async def save_translation(request: SaveTranslationRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/auto-translate")
+async def auto_translate(request: AutoTranslateRequest, db: Session = Depends(get_db)):
+    """
+    Proponer traducciones para los campos multiidioma obligatorios que faltan.
+    
+    Los idiomas requeridos salen de `translation_mandatory` en las reglas de
+    cada país. Solo se usan exact matches y glossary con confidence >=
+    min_confidence. No modifica productos: devuelve un patch propuesto
+    {sku: {field: {lang: text}}}.
+    """
+    try:
+        manager = AutoTranslationManager(db, translation_engine)
+        
+        return manager.propose(
+            skus=request.skus,
+            filters=_auto_translate_filters(request),
+            countries=request.countries,
+            min_confidence=request.min_confidence,
+            chunk_size=request.chunk_size
+        )
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/auto-translate/stream")
+def auto_translate_stream(request: AutoTranslateRequest, db: Session = Depends(get_db)):
+    """
+    Auto-traducción para todo el catálogo con progreso en streaming (NDJSON).
+    
+    Emite un evento por línea: start, product (por SKU con huecos),
+    progress (por chunk) y summary al final.
+    """
+    manager = AutoTranslationManager(db, translation_engine)
+    
+    events = manager.iter_proposals(
+        skus=request.skus,
+        filters=_auto_translate_filters(request),
+        countries=request.countries,
+        min_confidence=request.min_confidence,
+        chunk_size=request.chunk_size
+    )
+    
+    return StreamingResponse(
+        (dumps_line(event) for event in events),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+def _auto_translate_filters(request: AutoTranslateRequest) -> Dict[str, str]:
+    """Construir filtros de producto desde la request de auto-traducción."""
+    filters = {}
+    if request.family:
+        filters["family"] = request.family
+    if request.brand:
+        filters["brand"] = request.brand
+    if request.status:
+        filters["status"] = request.status
+    return filters
+
+
 @router.get("/glossary/{family}/{target_lang}", response_model=GlossaryResponse)
 async def get_glossary(family: str, target_lang: str):
     """
@@ -165,6 +334,21 @@ async def get_translation_stats():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/reload")
+async def reload_translation_data():
+    """
+    Recargar glossaries y translation memory modificados en disco.
+    
+    Solo se recompilan los archivos cuya firma (mtime, tamaño) cambió.
+    """
+    try:
+        changes = translation_engine.reload_if_changed()
+        return {"reloaded": changes, "stats": translation_engine.get_stats()}
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/supported-languages")
 async def get_supported_languages():
     """
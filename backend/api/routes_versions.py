@@ -2,8 +2,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
+from datetime import datetime
 from pydantic import BaseModel, Field
-from database import get_db
+from database import get_db, get_read_db
 from core.version_manager import VersionManager
 
 
@@ -27,16 +28,41 @@ class SnapshotCreate(BaseModel):
 @router.get("/{sku}/versions")
 async def get_product_versions(
     sku: str,
-    db: Session = Depends(get_db)
+    include_snapshots: bool = Query(True, description="Include complete_snapshot (false: metadata only)"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Versions per page (cursor pagination)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    date_from: Optional[datetime] = Query(None, description="Versions taken at or after this date"),
+    date_to: Optional[datetime] = Query(None, description="Versions taken at or before this date"),
+    created_by: Optional[str] = Query(None, description="Versions created by this user"),
+    db: Session = Depends(get_read_db)
 ):
-    """Get all versions for a product."""
+    """
+    Get versions for a product, newest first.
+    
+    Without limit/cursor all matching versions are returned; with them,
+    a page plus next_cursor (null on the last page).
+    """
     manager = VersionManager(db)
-    versions = manager.get_versions(sku)
+    filters = {"date_from": date_from, "date_to": date_to, "created_by": created_by}
+    
+    next_cursor = None
+    if limit or cursor:
+        try:
+            versions, next_cursor = manager.list_versions_cursor(
+                sku, cursor=cursor, limit=limit or 50, include_snapshots=include_snapshots, **filters
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        total = manager.count_versions(sku, **filters)
+    else:
+        versions = manager.get_versions(sku, include_snapshots=include_snapshots, **filters)
+        total = len(versions)
     
     return {
         "sku": sku,
-        "total_versions": len(versions),
-        "versions": [v.to_dict() for v in versions]
+        "total_versions": total,
+        "versions": manager.to_dicts(versions) if include_snapshots else [v.to_dict(include_snapshot=False) for v in versions],
+        "next_cursor": next_cursor
     }
 
 
@@ -44,7 +70,7 @@ async def get_product_versions(
 async def get_version_snapshot(
     sku: str,
     version_number: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific version snapshot."""
     manager = VersionManager(db)
@@ -78,14 +104,14 @@ async def create_version_snapshot(
     if not version:
         raise HTTPException(status_code=404, detail=f"Product with SKU {sku} not found")
     
-    return version.to_dict()
+    return manager.to_dicts([version])[0]
 
 
 @router.get("/{sku}/changelog")
 async def get_product_changelog(
     sku: str,
     limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get changelog history for a product."""
     manager = VersionManager(db)
@@ -103,7 +129,7 @@ async def compare_versions(
     sku: str,
     version_from: str = Query(..., alias="from"),
     version_to: str = Query(..., alias="to"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Compare two versions and show differences."""
     manager = VersionManager(db)
@@ -125,7 +151,10 @@ async def restore_version(
     """Restore a product to a previous version."""
     manager = VersionManager(db)
     
-    product = manager.restore_version(sku, version_number, restored_by="system")
+    try:
+        product = manager.restore_version(sku, version_number, restored_by="system")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     if not product:
         raise HTTPException(
@@ -143,11 +172,25 @@ async def restore_version(
 @router.get("/{sku}/timeline")
 async def get_version_timeline(
     sku: str,
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Versions per page (cursor pagination)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    date_from: Optional[datetime] = Query(None, description="Versions taken at or after this date"),
+    date_to: Optional[datetime] = Query(None, description="Versions taken at or before this date"),
+    created_by: Optional[str] = Query(None, description="Versions created by this user"),
+    db: Session = Depends(get_read_db)
 ):
-    """Get visual timeline of versions."""
+    """Get visual timeline of versions (metadata only, snapshots are not loaded)."""
     manager = VersionManager(db)
-    versions = manager.get_versions(sku)
+    filters = {"date_from": date_from, "date_to": date_to, "created_by": created_by}
+    
+    next_cursor = None
+    if limit or cursor:
+        try:
+            versions, next_cursor = manager.list_versions_cursor(sku, cursor=cursor, limit=limit or 50, **filters)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        versions = manager.get_versions(sku, include_snapshots=False, **filters)
     
     timeline = []
     for v in versions:
@@ -163,5 +206,6 @@ async def get_version_timeline(
     
     return {
         "sku": sku,
-        "timeline": timeline
+        "timeline": timeline,
+        "next_cursor": next_cursor
     }
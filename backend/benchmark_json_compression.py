@@ -0,0 +1,238 @@
+"""Benchmark: database size and read latency before/after compressing JSON columns."""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+
+LANGUAGES = ("es", "pt", "it", "en", "fr", "br")
+SYLLABLES = ("ca", "ra", "te", "lo", "mi", "sa", "na", "ti", "po", "le", "du", "ve", "on", "es", "al", "ri", "ma", "co")
+
+
+def parse_args():
+    """Command line options."""
+    parser = argparse.ArgumentParser(description="CompressedJSON size / latency benchmark (SQLite)")
+    parser.add_argument("--products", type=int, default=50000)
+    parser.add_argument("--versions", type=int, default=500000, help="Total versions (spread over products)")
+    parser.add_argument("--reads", type=int, default=2000, help="Random reads per measurement")
+    parser.add_argument("--codec", default="auto", help="JSON_COMPRESSION used for re-encoding")
+    parser.add_argument("--columns", default="*", help="JSON_COMPRESSED_COLUMNS (default: every compressible column)")
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "benchmark_json_compression.db"))
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# Configure the backend for a throw-away database before importing it
+for suffix in ("", "-wal", "-shm"):
+    if os.path.exists(args.db + suffix):
+        os.remove(args.db + suffix)
+os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+os.environ["DEBUG"] = "false"
+os.environ["JSON_COMPRESSED_COLUMNS"] = args.columns
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(1, str(Path(__file__).parent.parent))
+
+from sqlalchemy import JSON, MetaData, insert, select
+from backend.config import settings
+from backend.database import init_db, engine, SessionLocal
+from models.product_sheet import ProductSheet, ProductVersion
+from models.types import CompressedJSON
+from core.json_reencoder import JsonReencoder
+
+
+def vocabulary(rng: random.Random, size: int = 400):
+    """Pseudo-words of one language."""
+    return ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))) for _ in range(size)]
+
+
+def sentence(rng: random.Random, words, length: int) -> str:
+    """Random text of about length words."""
+    return " ".join(rng.choice(words) for _ in range(length)).capitalize() + "."
+
+
+def multilingual(rng: random.Random, vocabularies, length: int):
+    """{lang: text} like the product's multilingual fields."""
+    return {lang: sentence(rng, vocabularies[lang], length) for lang in LANGUAGES}
+
+
+def make_product(rng: random.Random, vocabularies, i: int):
+    """Synthetic product row."""
+    return {
+        "sku": f"BM-{i:07d}",
+        "ean_list": [f"84{rng.randrange(10 ** 11):011d}"],
+        "brand": f"Brand {i % 200}",
+        "family": rng.choice(("COSMETICS_FACIAL", "COSMETICS_BODY", "FOOD_SUPPLEMENTS", "FOOD_PASTA")),
+        "title_short": multilingual(rng, vocabularies, 4),
+        "description_detailed": multilingual(rng, vocabularies, 60),
+        "mode_of_use": multilingual(rng, vocabularies, 25),
+        "general_warnings": multilingual(rng, vocabularies, 30),
+        "specific_warnings": {"pregnancy": multilingual(rng, vocabularies, 10), "children": multilingual(rng, vocabularies, 10)},
+        "storage_conditions": multilingual(rng, vocabularies, 10),
+        "key_benefits": multilingual(rng, vocabularies, 15),
+        "marketing_claims": multilingual(rng, vocabularies, 15),
+        "label_positions": {
+            position: [rng.choice(("logo", "title", "ean", "warnings", "inci", "pao")) for _ in range(3)]
+            for position in ("frontal", "trasera", "lateral_izq", "lateral_dcha")
+        },
+        "inci_ingredients": ", ".join(rng.choice(vocabularies["en"]).upper() for _ in range(25)),
+        "packaging_languages": list(LANGUAGES),
+        "completion_percentage": rng.randint(40, 100),
+    }
+
+
+def legacy_table(table):
+    """Copy of a table with plain JSON columns (how data was stored before CompressedJSON)."""
+    legacy = table.to_metadata(MetaData())
+    for column in legacy.columns:
+        if isinstance(column.type, CompressedJSON):
+            column.type = JSON()
+    return legacy
+
+
+def load(rng: random.Random):
+    """Insert the synthetic catalog and version history as plain JSON."""
+    vocabularies = {lang: vocabulary(random.Random(f"{args.seed}-{lang}")) for lang in LANGUAGES}
+    products_table = legacy_table(ProductSheet.__table__)
+    versions_table = legacy_table(ProductVersion.__table__)
+    per_product = max(1, args.versions // args.products)
+    start = datetime(2024, 1, 1)
+
+    with engine.begin() as conn:
+        batch, versions = [], []
+        for i in range(args.products):
+            product = make_product(rng, vocabularies, i)
+            batch.append(product)
+
+            snapshot = dict(product)
+            for v in range(per_product):
+                # Minor edit per version: one language of the description
+                lang = rng.choice(LANGUAGES)
+                snapshot = {
+                    **snapshot,
+                    "description_detailed": {**snapshot["description_detailed"], lang: sentence(rng, vocabularies[lang], 60)},
+                    "current_version": f"1.{v}",
+                    "updated_date": (start + timedelta(days=v)).isoformat(),
+                }
+                versions.append({
+                    "version_id": f"{product['sku']}-{v:04d}",
+                    "sku": product["sku"],
+                    "version_number": f"1.{v + 1}",
+                    "version_type": "minor",
+                    "status": "current" if v == per_product - 1 else "archived",
+                    "snapshot_date": start + timedelta(days=v),
+                    "complete_snapshot": snapshot,
+                    "snapshot_format": "full",
+                    "delta_depth": 0,
+                })
+
+            if len(batch) >= 500:
+                conn.execute(insert(products_table), batch)
+                conn.execute(insert(versions_table), versions)
+                batch, versions = [], []
+
+        if batch:
+            conn.execute(insert(products_table), batch)
+            conn.execute(insert(versions_table), versions)
+
+    return per_product
+
+
+def vacuum():
+    """Rewrite the SQLite file so its size reflects the data."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.exec_driver_sql("VACUUM")
+
+
+def latency(rng: random.Random, fetch, keys):
+    """Time random reads: (p50 ms, p95 ms)."""
+    timings = []
+    for key in rng.sample(keys, min(args.reads, len(keys))):
+        start = time.perf_counter()
+        fetch(key)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def measure(label: str):
+    """Database size and read latencies."""
+    vacuum()
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+
+    try:
+        skus = db.execute(select(ProductSheet.sku)).scalars().all()
+        version_ids = db.execute(select(ProductVersion.version_id)).scalars().all()
+
+        def fetch_product(sku):
+            db.execute(select(ProductSheet).where(ProductSheet.sku == sku)).scalar_one()
+            db.expunge_all()
+
+        def fetch_snapshot(version_id):
+            db.execute(
+                select(ProductVersion.complete_snapshot).where(ProductVersion.version_id == version_id)
+            ).scalar_one()
+
+        def scan_history(sku):
+            db.execute(select(ProductVersion.complete_snapshot).where(ProductVersion.sku == sku)).all()
+
+        result = {
+            "label": label,
+            "size_mb": os.path.getsize(args.db) / 1024 / 1024,
+            "product": latency(rng, fetch_product, skus),
+            "snapshot": latency(rng, fetch_snapshot, version_ids),
+            "history": latency(rng, scan_history, skus),
+        }
+    finally:
+        db.close()
+
+    return result
+
+
+def main():
+    """Load, measure, re-encode, measure again."""
+    rng = random.Random(args.seed)
+    settings.json_compression = "none"
+    init_db()
+
+    print(f"📦 Loading {args.products} products / {args.versions} versions into {args.db} ...")
+    start = time.perf_counter()
+    per_product = load(rng)
+    print(f"   loaded in {time.perf_counter() - start:.1f}s ({per_product} versions per product)")
+
+    before = measure("plain JSON")
+
+    settings.json_compression = args.codec
+    print(f"🗜️  Re-encoding with JSON_COMPRESSION={args.codec} ...")
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        totals = JsonReencoder(db).run(chunk_size=2000)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    print(f"   {totals['rewritten']} values rewritten in {elapsed:.1f}s "
+          f"({totals['bytes_before'] / 1024 / 1024:.1f} MB -> {totals['bytes_after'] / 1024 / 1024:.1f} MB)")
+
+    after = measure("compressed")
+
+    print()
+    print(f"{'':<12}{'DB size':>12}{'product p50/p95':>22}{'snapshot p50/p95':>22}{'history p50/p95':>22}")
+    for row in (before, after):
+        print(
+            f"{row['label']:<12}{row['size_mb']:>9.1f} MB"
+            + "".join(f"{row[key][0]:>12.3f}/{row[key][1]:.3f} ms" for key in ("product", "snapshot", "history"))
+        )
+    print(f"\nSize: {after['size_mb'] / before['size_mb'] * 100:.1f}% of plain JSON")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Version history compaction script: store snapshots as keyframes + deltas."""
+import argparse
+import sys
+from pathlib import Path
+
+# Add backend (and repo root, for backend.* imports) to path
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(1, str(Path(__file__).parent.parent))
+
+from backend.database import init_db, engine, SessionLocal
+from core.version_manager import VersionManager
+
+
+def format_bytes(size: int) -> str:
+    """Format a byte count for humans."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} {unit}"
+        size /= 1024
+
+
+def main():
+    """Convert existing version history and report space saved."""
+    parser = argparse.ArgumentParser(description="Compact product version history")
+    parser.add_argument("--interval", type=int, default=None,
+                        help="Versions per keyframe (default: VERSION_KEYFRAME_INTERVAL)")
+    parser.add_argument("--full", action="store_true",
+                        help="Store every version as a full snapshot (undo compaction)")
+    parser.add_argument("--sku", action="append", dest="skus",
+                        help="Only this product (repeatable)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report savings without writing")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="Run VACUUM afterwards to shrink the SQLite file")
+    args = parser.parse_args()
+
+    # Adds the delta columns to existing product_versions tables
+    init_db()
+
+    db = SessionLocal()
+    try:
+        print("🗜️  Compacting version history...")
+        report = VersionManager(db).compact_history(
+            keyframe_interval=args.interval,
+            full=args.full,
+            skus=args.skus,
+            dry_run=args.dry_run
+        )
+    except Exception as e:
+        print(f"❌ Error compacting version history: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"  Products:   {report['products']}")
+    print(f"  Versions:   {report['versions']} ({report['keyframes']} keyframes, {report['deltas']} deltas)")
+    print(f"  Rewritten:  {report['rewritten']}{' (dry run)' if args.dry_run else ''}")
+    print(f"  Before:     {format_bytes(report['bytes_before'])}")
+    print(f"  After:      {format_bytes(report['bytes_after'])}")
+    print(f"  Saved:      {format_bytes(report['bytes_saved'])} ({report['saved_percent']}%)")
+
+    if args.vacuum and not args.dry_run and engine.dialect.name == "sqlite":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM")
+        print("✅ SQLite file vacuumed")
+
+
+if __name__ == "__main__":
+    main()
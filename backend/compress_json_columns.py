@@ -0,0 +1,74 @@
+"""Compressed JSON migration script: convert and re-encode the columns of JSON_COMPRESSED_COLUMNS."""
+import argparse
+import sys
+from pathlib import Path
+
+# Add backend (and repo root, for backend.* imports) to path
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(1, str(Path(__file__).parent.parent))
+
+from backend.database import init_db, engine, SessionLocal
+from core.json_reencoder import JsonReencoder
+from models.types import COMPRESSIBLE_COLUMNS
+
+
+def main():
+    """Convert column types (PostgreSQL), rewrite existing rows and report space saved."""
+    parser = argparse.ArgumentParser(description="Compress / decompress JSON columns")
+    parser.add_argument("--decompress", action="append", dest="decompress", metavar="TABLE.COLUMN",
+                        help="Rewrite this column as plain JSON (remove it from JSON_COMPRESSED_COLUMNS first; repeatable)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Rows per transaction")
+    parser.add_argument("--list", action="store_true", help="List compressible columns and exit")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="Run VACUUM afterwards to shrink the SQLite file")
+    args = parser.parse_args()
+
+    if args.list:
+        for column in COMPRESSIBLE_COLUMNS:
+            print(column)
+        return
+
+    init_db()
+
+    db = SessionLocal()
+    try:
+        reencoder = JsonReencoder(db, columns=args.decompress, decompress=bool(args.decompress))
+        targets = [f"{table.name}.{column.name}" for table, columns in reencoder.targets() for column in columns]
+        if not targets:
+            print("Nothing to do: set JSON_COMPRESSED_COLUMNS (see --list)")
+            return
+
+        print(f"🗜️  {'Decompressing' if args.decompress else 'Compressing'}: {', '.join(targets)}")
+
+        # PostgreSQL: json -> bytea before compressing, bytea -> json after decompressing
+        if not args.decompress:
+            for column in reencoder.convert_columns():
+                print(f"  Converted {column} to bytea")
+
+        totals = reencoder.run(
+            chunk_size=args.chunk_size,
+            on_progress=lambda t: print(f"  {t['table']}: {t['rows']} rows, {t['rewritten']} rewritten", end="\r")
+        )
+        print()
+
+        if args.decompress:
+            for column in reencoder.convert_columns():
+                print(f"  Converted {column} to json")
+    except Exception as e:
+        print(f"❌ Error re-encoding JSON columns: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"  Rewritten:  {totals['rewritten']} values")
+    print(f"  Before:     {totals['bytes_before'] / 1024 / 1024:.1f} MB")
+    print(f"  After:      {totals['bytes_after'] / 1024 / 1024:.1f} MB")
+
+    if args.vacuum and engine.dialect.name == "sqlite":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM")
+        print("✅ SQLite file vacuumed")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,27 @@ class Settings(BaseSettings):
         alias="DATABASE_URL"
     )
     
+    # Read replicas for GET routes (comma-separated URLs, empty: reads use DATABASE_URL)
+    database_read_url: str = Field(default="", alias="DATABASE_READ_URL")
+    # Seconds after a write during which the same client reads from the primary
+    read_your_writes_seconds: float = Field(default=5.0, alias="READ_YOUR_WRITES_SECONDS")
+    
+    # Version snapshots: "delta" (keyframe every VERSION_KEYFRAME_INTERVAL versions, patches in between) or "full"
+    version_storage: str = Field(default="delta", alias="VERSION_STORAGE")
+    version_keyframe_interval: int = Field(default=10, alias="VERSION_KEYFRAME_INTERVAL")
+    # Store keyframes once per distinct content (snapshot_blobs table)
+    version_snapshot_dedup: bool = Field(default=True, alias="VERSION_SNAPSHOT_DEDUP")
+    
+    # JSON columns stored compressed, as "table.column" (comma-separated, * for all
+    # compressible columns); convert existing data with compress_json_columns.py
+    json_compressed_columns: str = Field(default="", alias="JSON_COMPRESSED_COLUMNS")
+    # Codec of compressed columns: auto (zstd if installed, else zlib), zstd, zlib or none
+    json_compression: str = Field(default="auto", alias="JSON_COMPRESSION")
+    json_compression_min_bytes: int = Field(default=256, alias="JSON_COMPRESSION_MIN_BYTES")
+    
+    # Checkouts held longer than this are reported by GET /api/admin/db-pool
+    db_pool_long_held_seconds: float = Field(default=5.0, alias="DB_POOL_LONG_HELD_SECONDS")
+    
     # Security
     secret_key: str = Field(
         default="your-super-secret-key-change-in-production-min-32-chars",
@@ -40,6 +61,12 @@ class Settings(BaseSettings):
     upload_dir: str = Field(default="./uploads", alias="UPLOAD_DIR")
     max_file_size: int = Field(default=10485760, alias="MAX_FILE_SIZE")
     
+    # Translations (seconds between glossary/memory file checks, 0 disables)
+    translation_reload_interval: float = Field(default=5.0, alias="TRANSLATION_RELOAD_INTERVAL")
+    # "json" (single process) or "sql" (table shared by every worker)
+    translation_memory_backend: str = Field(default="json", alias="TRANSLATION_MEMORY_BACKEND")
+    translation_memory_cache_size: int = Field(default=2048, alias="TRANSLATION_MEMORY_CACHE_SIZE")
+    
     # Server
     host: str = Field(default="0.0.0.0", alias="HOST")
     port: int = Field(default=8000, alias="PORT")
@@ -52,6 +79,16 @@ class Settings(BaseSettings):
     def origins_list(self) -> List[str]:
         """Get allowed origins as a list."""
         return [origin.strip() for origin in self.allowed_origins.split(",")]
+    
+    @property
+    def read_urls_list(self) -> List[str]:
+        """Get read replica URLs as a list."""
+        return [url.strip() for url in self.database_read_url.split(",") if url.strip()]
+    
+    @property
+    def json_compressed_columns_list(self) -> List[str]:
+        """Get compressed JSON columns ("table.column") as a list."""
+        return [column.strip() for column in self.json_compressed_columns.split(",") if column.strip()]
 
 
 settings = Settings()
@@ -0,0 +1,274 @@
+"""Auto Translation Manager - Fill missing mandatory translations across product sheets."""
+from typing import List, Dict, Optional, Any, Iterator
+from sqlalchemy.orm import Session
+from core.product_sheet_manager import ProductSheetManager
+from legal_framework.compliance_validator import ComplianceValidator
+from translations.translation_engine import TranslationEngine
+
+
+class AutoTranslationManager:
+    """
+    Manager for whole-sheet auto-translation.
+
+    For every product it finds the multilingual fields (title_short,
+    mode_of_use, ...) missing a language required by the country rule YAMLs
+    (`translation_mandatory`) and proposes a value from translation memory
+    exact matches or glossary hits. Nothing is written to the database: the
+    result is a proposed patch per SKU.
+    """
+
+    # Preferred languages to translate from, in order
+    SOURCE_LANGUAGES = ["es", "en", "pt", "it", "fr"]
+
+    # Suggestion sources trusted for automatic filling
+    ACCEPTED_SOURCES = ("exact_match", "glossary")
+
+    def __init__(
+        self,
+        db: Session,
+        translation_engine: TranslationEngine,
+        validator: Optional[ComplianceValidator] = None,
+    ):
+        """
+        Initialize manager.
+
+        Args:
+            db: Database session
+            translation_engine: Shared TranslationEngine instance
+            validator: ComplianceValidator providing the country rules (optional)
+        """
+        self.db = db
+        self.engine = translation_engine
+        self.validator = validator or ComplianceValidator()
+        self.sheet_manager = ProductSheetManager(db)
+        self._requirements_cache: Dict[tuple, Dict[str, List[str]]] = {}
+
+    def iter_proposals(
+        self,
+        skus: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        countries: Optional[List[str]] = None,
+        min_confidence: float = 0.9,
+        chunk_size: int = 200,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream auto-translation proposals for a set of products.
+
+        Products are loaded in keyset-paginated chunks (only the columns the
+        rules reference) and each chunk is translated with one
+        TranslationEngine.suggest_batch call.
+
+        Args:
+            skus: Restrict to these SKUs (optional)
+            filters: Product filters (family, brand, status, language)
+            countries: Country codes whose rules apply (default: all)
+            min_confidence: Minimum suggestion confidence to accept
+            chunk_size: Products per chunk
+
+        Yields:
+            Events: {"type": "start"}, {"type": "product"} per product with
+            gaps, {"type": "progress"} per chunk and a final {"type": "summary"}
+        """
+        total = self.sheet_manager.count_sheets(filters, skus)
+        yield {"type": "start", "total_products": total}
+
+        processed = 0
+        summary = {"products_with_gaps": 0, "missing": 0, "filled": 0, "unresolved": 0}
+
+        for chunk in self.sheet_manager.iter_sheets(
+            filters=filters,
+            skus=skus,
+            chunk_size=chunk_size,
+            columns=self._columns(countries),
+        ):
+            for proposal in self._propose_chunk(chunk, countries, min_confidence):
+                summary["products_with_gaps"] += 1
+                summary["missing"] += proposal["missing_count"]
+                summary["filled"] += proposal["filled_count"]
+                summary["unresolved"] += len(proposal["unresolved"])
+                yield {"type": "product", **proposal}
+
+            processed += len(chunk)
+            yield {"type": "progress", "processed": processed, "total_products": total}
+
+        yield {"type": "summary", "processed": processed, **summary}
+
+    def propose(
+        self,
+        skus: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        countries: Optional[List[str]] = None,
+        min_confidence: float = 0.9,
+        chunk_size: int = 200,
+    ) -> Dict[str, Any]:
+        """
+        Collect auto-translation proposals into a single result.
+
+        Intended for a SKU or a small set; use iter_proposals for catalog runs.
+
+        Returns:
+            Dictionary with "patch" ({sku: {field: {lang: text}}}),
+            "products" (per-SKU details) and "summary"
+        """
+        patch = {}
+        products = []
+        summary = {}
+
+        for event in self.iter_proposals(skus, filters, countries, min_confidence, chunk_size):
+            if event["type"] == "product":
+                products.append(event)
+                if event["patch"]:
+                    patch[event["sku"]] = event["patch"]
+            elif event["type"] == "summary":
+                summary = event
+
+        summary.pop("type", None)
+
+        return {"patch": patch, "products": products, "summary": summary}
+
+    def find_missing_translations(
+        self,
+        product: Any,
+        countries: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find mandatory (field, language) pairs without content.
+
+        Args:
+            product: ProductSheet instance
+            countries: Country codes whose rules apply (default: all)
+
+        Returns:
+            List of {"field", "lang", "source_lang", "source_text"}; source_lang
+            is None when the field has no content in any language
+        """
+        missing = []
+
+        for field, langs in self._requirements(product.family, countries).items():
+            values = getattr(product, field, None) or {}
+            if not isinstance(values, dict):
+                continue
+
+            source_lang = self._pick_source_language(values)
+
+            for lang in langs:
+                if self._has_text(values.get(lang)):
+                    continue
+
+                missing.append({
+                    "field": field,
+                    "lang": lang,
+                    "source_lang": source_lang,
+                    "source_text": values.get(source_lang) if source_lang else None,
+                })
+
+        return missing
+
+    def _propose_chunk(
+        self,
+        products: List[Any],
+        countries: Optional[List[str]],
+        min_confidence: float,
+    ) -> List[Dict[str, Any]]:
+        """Build proposals for one chunk of products with a single batch lookup."""
+        gaps_by_product = []
+        items = []
+
+        for product in products:
+            gaps = self.find_missing_translations(product, countries)
+            if not gaps:
+                continue
+
+            gaps_by_product.append((product.sku, gaps))
+            for gap in gaps:
+                if gap["source_text"]:
+                    items.append({
+                        "source_text": gap["source_text"],
+                        "source_lang": gap["source_lang"],
+                        "target_lang": gap["lang"],
+                        "family": product.family,
+                    })
+
+        suggestions = iter(self.engine.suggest_batch(items, include_fuzzy=False)) if items else iter(())
+        proposals = []
+
+        for sku, gaps in gaps_by_product:
+            patch: Dict[str, Dict[str, str]] = {}
+            filled = []
+            unresolved = []
+
+            for gap in gaps:
+                if not gap["source_text"]:
+                    unresolved.append({"field": gap["field"], "lang": gap["lang"], "reason": "no_source_text"})
+                    continue
+
+                best = self._best_suggestion(next(suggestions), min_confidence)
+                if best is None:
+                    unresolved.append({"field": gap["field"], "lang": gap["lang"], "reason": "no_confident_match"})
+                    continue
+
+                patch.setdefault(gap["field"], {})[gap["lang"]] = best["text"]
+                filled.append({
+                    "field": gap["field"],
+                    "lang": gap["lang"],
+                    "source_lang": gap["source_lang"],
+                    "text": best["text"],
+                    "confidence": best["confidence"],
+                    "source": best["source"],
+                })
+
+            proposals.append({
+                "sku": sku,
+                "patch": patch,
+                "filled": filled,
+                "unresolved": unresolved,
+                "missing_count": len(gaps),
+                "filled_count": len(filled),
+            })
+
+        return proposals
+
+    def _best_suggestion(self, suggestions: List[Dict], min_confidence: float) -> Optional[Dict]:
+        """Return the top exact-match/glossary suggestion above min_confidence."""
+        for suggestion in suggestions:
+            if suggestion["source"] in self.ACCEPTED_SOURCES and suggestion["confidence"] >= min_confidence:
+                return suggestion
+        return None
+
+    def _requirements(self, family: str, countries: Optional[List[str]]) -> Dict[str, List[str]]:
+        """Mandatory translations for a family, cached per (family, countries)."""
+        key = (family, tuple(sorted(countries)) if countries else None)
+
+        if key not in self._requirements_cache:
+            self._requirements_cache[key] = self.validator.get_mandatory_translations(family, countries)
+
+        return self._requirements_cache[key]
+
+    def _columns(self, countries: Optional[List[str]]) -> List[str]:
+        """Columns needed to detect gaps: family plus every multilingual field in the rules."""
+        fields = set()
+
+        for country in countries or self.validator.get_available_countries():
+            country_rules = self.validator.get_country_rules(country) or {}
+            for family in country_rules:
+                if isinstance(country_rules[family], dict):
+                    fields.update(self.validator.get_mandatory_translations(family, [country]))
+
+        return ["family", *sorted(fields)]
+
+    def _pick_source_language(self, values: Dict[str, Any]) -> Optional[str]:
+        """Pick the language to translate from (preferred order, then any)."""
+        for lang in self.SOURCE_LANGUAGES:
+            if self._has_text(values.get(lang)):
+                return lang
+
+        for lang, value in values.items():
+            if self._has_text(value):
+                return lang
+
+        return None
+
+    @staticmethod
+    def _has_text(value: Any) -> bool:
+        """Check if a multilingual value has non-empty text."""
+        return isinstance(value, str) and bool(value.strip())
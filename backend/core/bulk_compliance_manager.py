@@ -0,0 +1,374 @@
+"""Bulk Compliance Manager - Validate the whole catalog against country rules."""
+import io
+import json
+import os
+import tempfile
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Optional, Any, Iterator, Iterable
+import openpyxl
+from sqlalchemy.orm import Session
+from core.product_sheet_manager import ProductSheetManager
+from legal_framework.compliance_validator import ComplianceValidator
+
+
+# Statuses returned by ComplianceValidator.validate_for_country
+STATUSES = ("COMPLIANT", "WARNING", "NON_COMPLIANT", "ERROR")
+
+
+def validate_chunk(
+    products: List[Dict[str, Any]],
+    countries: List[str],
+    rules_dir: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Validate a chunk of products against several countries.
+
+    Module-level so it can run in ProcessPoolExecutor workers; each worker
+    compiles the rules once and reuses them for every chunk.
+
+    Args:
+        products: Product data dictionaries (rule fields only)
+        countries: Country codes
+        rules_dir: Rules directory (default: legal_framework package)
+
+    Returns:
+        Compact per-product results (see BulkComplianceManager.iter_results)
+    """
+    validator = ComplianceValidator(rules_dir)
+    results = []
+
+    for product in products:
+        validation = validator.validate_multiple_countries(product, countries)
+        results.append({
+            "sku": product.get("sku"),
+            "family": product.get("family"),
+            "overall_status": validation["overall_status"],
+            "countries": {
+                country: {
+                    "status": result["status"],
+                    "percentage": result.get("percentage", 0),
+                    "missing": [issue["field"] for issue in result.get("critical_issues", [])],
+                    "warnings": len(result.get("warnings", [])),
+                }
+                for country, result in validation["countries"].items()
+            },
+        })
+
+    return results
+
+
+class BulkComplianceManager:
+    """
+    Manager for catalog-wide compliance validation.
+
+    Products are streamed from the database in keyset-paginated chunks
+    (only the columns the rules reference) and validated in a process pool,
+    keeping a bounded number of chunks in flight.
+    """
+
+    def __init__(self, db: Session, validator: Optional[ComplianceValidator] = None):
+        """
+        Initialize manager.
+
+        Args:
+            db: Database session
+            validator: ComplianceValidator providing the rules (optional)
+        """
+        self.db = db
+        self.validator = validator or ComplianceValidator()
+        self.sheet_manager = ProductSheetManager(db)
+
+    def iter_results(
+        self,
+        countries: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        skus: Optional[List[str]] = None,
+        only_failing: bool = False,
+        chunk_size: int = 500,
+        workers: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream validation results for a set of products.
+
+        Args:
+            countries: Country codes to validate (default: all available)
+            filters: Product filters (family, brand, status, language)
+            skus: Restrict to these SKUs (optional)
+            only_failing: Skip products compliant in every country
+            chunk_size: Products per chunk (DB page and pool task)
+            workers: Worker processes (default: CPU count, max 4; 1 = inline)
+
+        Yields:
+            Events: {"type": "start"}, {"type": "product"} per product,
+            {"type": "progress"} per chunk with running aggregate counts and a
+            final {"type": "summary"}
+        """
+        countries = [c.upper() for c in (countries or self.validator.get_available_countries())]
+        total = self.sheet_manager.count_sheets(filters, skus)
+
+        yield {"type": "start", "total_products": total, "countries": countries}
+
+        counts = {country: {status: 0 for status in STATUSES} for country in countries}
+        overall = {status: 0 for status in STATUSES}
+        processed = 0
+
+        for results in self._validate_chunks(countries, filters, skus, chunk_size, workers):
+            for result in results:
+                overall[result["overall_status"]] = overall.get(result["overall_status"], 0) + 1
+                for country, country_result in result["countries"].items():
+                    counts[country][country_result["status"]] += 1
+
+                if only_failing and result["overall_status"] == "COMPLIANT":
+                    continue
+
+                yield {"type": "product", **result}
+
+            processed += len(results)
+            yield {
+                "type": "progress",
+                "processed": processed,
+                "total_products": total,
+                "counts": counts,
+            }
+
+        yield {
+            "type": "summary",
+            "processed": processed,
+            "countries": countries,
+            "counts": counts,
+            "overall": overall,
+        }
+
+    def _validate_chunks(
+        self,
+        countries: List[str],
+        filters: Optional[Dict[str, Any]],
+        skus: Optional[List[str]],
+        chunk_size: int,
+        workers: Optional[int],
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Load chunks from the DB and validate them (inline or in a process pool)."""
+        columns = ["family", *self.validator.get_rule_fields(countries)]
+        rules_dir = str(self.validator.rules_dir)
+
+        chunks = (
+            [{column: getattr(product, column, None) for column in ["sku", *columns]} for product in chunk]
+            for chunk in self.sheet_manager.iter_sheets(
+                filters=filters,
+                skus=skus,
+                chunk_size=chunk_size,
+                columns=columns,
+            )
+        )
+
+        if workers is None:
+            workers = min(4, os.cpu_count() or 1)
+
+        if workers <= 1:
+            for chunk in chunks:
+                yield validate_chunk(chunk, countries, rules_dir)
+            return
+
+        pool = ProcessPoolExecutor(max_workers=workers)
+        pending = deque()
+
+        try:
+            for chunk in chunks:
+                pending.append(pool.submit(validate_chunk, chunk, countries, rules_dir))
+
+                # Keep the pool busy while bounding memory to a few chunks
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def build_excel(results: Iterable[Dict[str, Any]], summary: Dict[str, Any]) -> bytes:
+        """
+        Build an Excel report: per-country summary plus one row per product.
+
+        Args:
+            results: Product results ("product" events)
+            summary: Final "summary" event
+
+        Returns:
+            bytes: Excel file
+        """
+        countries = summary.get("countries", [])
+
+        wb = openpyxl.Workbook(write_only=True)
+
+        ws_summary = wb.create_sheet("Resumen")
+        ws_summary.append(["País", *STATUSES])
+        for country in countries:
+            counts = summary["counts"].get(country, {})
+            ws_summary.append([country, *[counts.get(status, 0) for status in STATUSES]])
+        ws_summary.append([])
+        ws_summary.append(["Global", *[summary.get("overall", {}).get(status, 0) for status in STATUSES]])
+        ws_summary.append(["Productos validados", summary.get("processed", 0)])
+
+        ws_products = wb.create_sheet("Productos")
+        header = ["SKU", "Familia", "Estado global"]
+        for country in countries:
+            header += [f"{country} estado", f"{country} %", f"{country} campos faltantes"]
+        ws_products.append(header)
+
+        for result in results:
+            row = [result["sku"], result["family"], result["overall_status"]]
+            for country in countries:
+                country_result = result["countries"].get(country, {})
+                row += [
+                    country_result.get("status", ""),
+                    country_result.get("percentage", 0),
+                    ", ".join(country_result.get("missing", [])),
+                ]
+            ws_products.append(row)
+
+        output = io.BytesIO()
+        wb.save(output)
+
+        return output.getvalue()
+
+
+class BulkComplianceJob:
+    """
+    Background bulk validation run with live progress and aggregate counts.
+
+    Jobs live in the memory of the process that started them; product
+    results are written as NDJSON to a temporary file.
+    """
+
+    MAX_JOBS = 20
+
+    _jobs: Dict[str, "BulkComplianceJob"] = {}
+    _jobs_lock = threading.Lock()
+
+    def __init__(self, params: Dict[str, Any]):
+        """
+        Initialize job.
+
+        Args:
+            params: Keyword arguments for BulkComplianceManager.iter_results
+        """
+        self.job_id = str(uuid.uuid4())
+        self.params = params
+        self.status = "pending"  # pending, running, completed, failed
+        self.total_products = 0
+        self.processed = 0
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.summary: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.results_path = os.path.join(
+            tempfile.gettempdir(), "compliance_jobs", f"{self.job_id}.ndjson"
+        )
+
+    @classmethod
+    def start(cls, session_factory, params: Dict[str, Any]) -> "BulkComplianceJob":
+        """
+        Start a job in a background thread.
+
+        Args:
+            session_factory: Callable returning a new database session
+            params: Keyword arguments for BulkComplianceManager.iter_results
+
+        Returns:
+            The started job
+        """
+        job = cls(params)
+
+        with cls._jobs_lock:
+            cls._jobs[job.job_id] = job
+            cls._prune()
+
+        threading.Thread(target=job._run, args=(session_factory,), daemon=True).start()
+        return job
+
+    @classmethod
+    def get(cls, job_id: str) -> Optional["BulkComplianceJob"]:
+        """Get a job by ID (None if unknown or pruned)."""
+        return cls._jobs.get(job_id)
+
+    @classmethod
+    def _prune(cls):
+        """Drop the oldest finished jobs beyond MAX_JOBS (and their result files)."""
+        finished = sorted(
+            (job for job in cls._jobs.values() if job.finished_at),
+            key=lambda job: job.finished_at,
+        )
+
+        while len(cls._jobs) > cls.MAX_JOBS and finished:
+            job = finished.pop(0)
+            cls._jobs.pop(job.job_id, None)
+            if os.path.exists(job.results_path):
+                os.unlink(job.results_path)
+
+    def _run(self, session_factory):
+        """Run the validation, updating progress as chunks complete."""
+        self.status = "running"
+        db = session_factory()
+
+        try:
+            os.makedirs(os.path.dirname(self.results_path), exist_ok=True)
+            manager = BulkComplianceManager(db)
+
+            with open(self.results_path, 'w', encoding='utf-8') as f:
+                for event in manager.iter_results(**self.params):
+                    event_type = event.pop("type")
+
+                    if event_type == "product":
+                        f.write(json.dumps(event, ensure_ascii=False) + "\n")
+                    elif event_type == "start":
+                        self.total_products = event["total_products"]
+                    elif event_type == "progress":
+                        self.processed = event["processed"]
+                        self.counts = event["counts"]
+                    elif event_type == "summary":
+                        self.summary = event
+
+            self.status = "completed"
+        except Exception as e:
+            print(f"Error in bulk compliance job {self.job_id}: {e}")
+            self.error = str(e)
+            self.status = "failed"
+        finally:
+            db.close()
+            self.finished_at = datetime.utcnow()
+
+    def iter_results(self) -> Iterator[Dict[str, Any]]:
+        """
+        Read product results written so far.
+
+        Yields:
+            Product result dictionaries
+        """
+        if not os.path.exists(self.results_path):
+            return
+
+        with open(self.results_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.endswith("\n"):
+                    yield json.loads(line)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert job state to dictionary."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total_products": self.total_products,
+            "processed": self.processed,
+            "progress_percentage": int(self.processed * 100 / self.total_products) if self.total_products else 0,
+            "counts": self.counts,
+            "summary": self.summary,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,334 @@
+"""Catalog Counters - Materialized product counts for the dashboard."""
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Optional, Any, Iterable, Tuple
+from sqlalchemy import case, delete, func, insert, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.product_sheet import ProductSheet, ProductCounter
+
+
+# Product fields that determine which counters a product adds to
+COUNTER_FIELDS = ("family", "status", "completion_percentage", "title_short")
+
+# completion_percentage buckets: (label, min, max)
+COMPLETION_BUCKETS = (
+    ("0-24", 0, 24),
+    ("25-49", 25, 49),
+    ("50-74", 50, 74),
+    ("75-99", 75, 99),
+    ("100", 100, 100),
+)
+
+# Separator of family and status in family_status keys
+_PAIR_SEP = "\t"
+
+# Cached aggregates: (expires_at, result)
+_aggregates_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_aggregates_cache_lock = threading.Lock()
+
+
+class CatalogCounters:
+    """
+    Manager for the product_counters table.
+
+    Keeps product counts by family and status, completion bucket and title
+    language. Writes through ProductSheetManager (and version restore and
+    Excel import) apply the difference between the product's counter keys
+    before and after the change, in the caller's transaction (not
+    committed). rebuild() recomputes everything with grouped queries; it
+    runs at startup only while the table is empty, and otherwise through
+    POST /api/products/completion/rebuild (e.g. after writes made outside
+    the managers).
+    """
+
+    # Seconds an aggregates() result is reused (cleared on writes)
+    CACHE_TTL = 30
+
+    def __init__(self, db: Session):
+        """Initialize with database session."""
+        self.db = db
+
+    @staticmethod
+    def keys(data: Optional[Dict[str, Any]]) -> List[Tuple[str, str]]:
+        """
+        Get the counters a product adds to.
+
+        Args:
+            data: Product values of COUNTER_FIELDS (None: no product)
+
+        Returns:
+            List of (dimension, key)
+        """
+        if data is None:
+            return []
+
+        keys = [
+            ("total", ""),
+            ("family_status", f"{data.get('family') or ''}{_PAIR_SEP}{data.get('status') or ''}"),
+            ("completion", CatalogCounters._bucket(data.get('completion_percentage') or 0)),
+        ]
+        keys.extend(("language", lang) for lang in CatalogCounters._languages(data.get('title_short')))
+
+        return keys
+
+    @classmethod
+    def product_keys(cls, product: Optional[ProductSheet]) -> List[Tuple[str, str]]:
+        """Counter keys of a ProductSheet instance (None: no product)."""
+        if product is None:
+            return []
+        return cls.keys({field: getattr(product, field) for field in COUNTER_FIELDS})
+
+    def apply(self, old_keys: Iterable[Tuple[str, str]], new_keys: Iterable[Tuple[str, str]]):
+        """
+        Move a product from its old counters to its new ones (not committed).
+
+        Args:
+            old_keys: Keys before the write ([] for a new product)
+            new_keys: Keys after the write ([] for a deleted product)
+        """
+        deltas = Counter(new_keys)
+        deltas.subtract(old_keys)
+        self.apply_deltas(deltas)
+
+    def apply_deltas(self, deltas: Dict[Tuple[str, str], int]):
+        """
+        Add deltas to counters, creating missing rows (not committed).
+
+        Args:
+            deltas: Dictionary {(dimension, key): delta}
+        """
+        table = ProductCounter.__table__
+        # Sorted: concurrent writers lock counter rows in the same order
+        rows = [
+            {"dimension": dimension, "key": key, "count": delta}
+            for (dimension, key), delta in sorted(deltas.items()) if delta
+        ]
+        if not rows:
+            return
+
+        dialect = self.db.get_bind().dialect.name
+
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+            stmt = dialect_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.dimension, table.c.key],
+                set_={"count": table.c.count + stmt.excluded["count"]}
+            )
+            self.db.execute(stmt, rows)
+            return
+
+        for row in rows:
+            increment = (
+                update(table)
+                .where(table.c.dimension == row["dimension"], table.c.key == row["key"])
+                .values(count=table.c.count + row["count"])
+            )
+            if self.db.execute(increment).rowcount:
+                continue
+            try:
+                with self.db.begin_nested():
+                    self.db.execute(insert(table).values(row))
+            except IntegrityError:
+                # Created by a concurrent writer
+                self.db.execute(increment)
+
+    def aggregates(self, fresh: bool = False) -> Dict[str, Any]:
+        """
+        Get catalog counts for the dashboard.
+
+        Args:
+            fresh: Compute with grouped queries over products instead of
+                reading the counters (bypasses the cache)
+
+        Returns:
+            Dictionary with total, by_family, by_status, by_family_status,
+            by_completion, by_language and generated_date
+        """
+        now = time.monotonic()
+
+        if not fresh:
+            with _aggregates_cache_lock:
+                cached = _aggregates_cache.get("aggregates")
+            if cached and cached[0] > now:
+                return cached[1]
+
+        if fresh:
+            counts = self._compute()
+        else:
+            counts = {
+                (dimension, key): count
+                for dimension, key, count in self.db.execute(
+                    select(ProductCounter.dimension, ProductCounter.key, ProductCounter.count)
+                )
+            }
+
+        result = self._format(counts)
+
+        if not fresh:
+            with _aggregates_cache_lock:
+                _aggregates_cache["aggregates"] = (now + self.CACHE_TTL, result)
+
+        return result
+
+    @staticmethod
+    def invalidate():
+        """Clear cached aggregates (after writes)."""
+        with _aggregates_cache_lock:
+            _aggregates_cache.clear()
+
+    def rebuild(self, only_if_empty: bool = False) -> int:
+        """
+        Replace every counter with values from grouped queries.
+
+        Serialized with writers: the counters are locked before the catalog
+        is scanned (DELETE first, which takes the SQLite write lock; LOCK
+        TABLE on PostgreSQL), so writes cannot commit between the scan and
+        the replacement. Writers wait for the rebuild to commit.
+
+        Args:
+            only_if_empty: Do nothing if counters exist (startup)
+
+        Returns:
+            Number of counter rows written
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.execute(text("LOCK TABLE product_counters IN EXCLUSIVE MODE"))
+
+        if only_if_empty and self.db.execute(select(ProductCounter.dimension).limit(1)).first():
+            self.db.rollback()
+            return 0
+
+        self.db.execute(delete(ProductCounter))
+        counts = self._compute()
+
+        if counts:
+            self.db.execute(insert(ProductCounter), [
+                {"dimension": dimension, "key": key, "count": count}
+                for (dimension, key), count in counts.items()
+            ])
+        self.db.commit()
+        self.invalidate()
+
+        return len(counts)
+
+    def _compute(self, chunk_size: int = 1000) -> Dict[Tuple[str, str], int]:
+        """Count the catalog: grouped SQL for family/status and completion, a title scan for languages."""
+        counts: Dict[Tuple[str, str], int] = {}
+
+        # Served by idx_products_family_status
+        rows = self.db.execute(
+            select(ProductSheet.family, ProductSheet.status, func.count())
+            .group_by(ProductSheet.family, ProductSheet.status)
+        )
+        for family, status, count in rows:
+            counts[("family_status", f"{family or ''}{_PAIR_SEP}{status or ''}")] = count
+            counts[("total", "")] = counts.get(("total", ""), 0) + count
+
+        completion = func.coalesce(ProductSheet.completion_percentage, 0)
+        bucket = case(
+            *[(completion.between(low, high), label) for label, low, high in COMPLETION_BUCKETS],
+            else_=COMPLETION_BUCKETS[0][0]
+        )
+        for label, count in self.db.execute(select(bucket, func.count()).group_by(bucket)):
+            counts[("completion", label)] = count
+
+        # Languages are JSON keys: stream title_short in keyset chunks
+        query = select(ProductSheet.sku, ProductSheet.title_short)
+        last_sku = None
+
+        while True:
+            chunk_query = query.where(ProductSheet.sku > last_sku) if last_sku is not None else query
+            chunk = self.db.execute(chunk_query.order_by(ProductSheet.sku).limit(chunk_size)).all()
+
+            if not chunk:
+                break
+
+            last_sku = chunk[-1][0]
+            for _, title in chunk:
+                for lang in self._languages(title):
+                    counts[("language", lang)] = counts.get(("language", lang), 0) + 1
+
+        return counts
+
+    @staticmethod
+    def _format(counts: Dict[Tuple[str, str], int]) -> Dict[str, Any]:
+        """Shape counter values as the aggregates response."""
+        by_family: Dict[str, int] = {}
+        by_status: Dict[str, int] = {}
+        by_family_status: Dict[str, Dict[str, int]] = {}
+        by_completion = {label: 0 for label, _, _ in COMPLETION_BUCKETS}
+        by_language: Dict[str, int] = {}
+
+        for (dimension, key), count in counts.items():
+            if count <= 0:
+                continue
+            if dimension == "family_status":
+                family, _, status = key.partition(_PAIR_SEP)
+                by_family[family] = by_family.get(family, 0) + count
+                by_status[status] = by_status.get(status, 0) + count
+                by_family_status.setdefault(family, {})[status] = count
+            elif dimension == "completion":
+                by_completion[key] = count
+            elif dimension == "language":
+                by_language[key] = count
+
+        return {
+            "total": counts.get(("total", ""), 0),
+            "by_family": by_family,
+            "by_status": by_status,
+            "by_family_status": by_family_status,
+            "by_completion": by_completion,
+            "by_language": by_language,
+            "generated_date": datetime.utcnow().isoformat(),
+        }
+
+    @staticmethod
+    def _languages(title: Any) -> List[str]:
+        """Languages with a non-empty title."""
+        if not isinstance(title, dict):
+            return []
+        return [lang for lang, value in title.items() if isinstance(value, str) and value.strip()]
+
+    @staticmethod
+    def _bucket(percentage: int) -> str:
+        """Completion bucket label of a percentage."""
+        for label, low, high in COMPLETION_BUCKETS:
+            if low <= percentage <= high:
+                return label
+        return COMPLETION_BUCKETS[0][0]
+
+    @classmethod
+    def start_background_rebuild(cls, session_factory, after: Optional[threading.Thread] = None) -> threading.Thread:
+        """
+        Build the counters in a daemon thread with its own session, if the
+        counters table is empty (first start, or after an upgrade).
+
+        Args:
+            session_factory: Callable returning a new database session
+            after: Thread to wait for first (e.g. the completion rebuild)
+
+        Returns:
+            The started thread
+        """
+        def run():
+            if after is not None:
+                after.join()
+            db = session_factory()
+            try:
+                cls(db).rebuild(only_if_empty=True)
+            except Exception as e:
+                print(f"Error rebuilding catalog counters: {e}")
+            finally:
+                db.close()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,325 @@
+"""Compliance Status Manager - Persisted per-country compliance index."""
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional, Any, Iterable, Set
+from sqlalchemy import delete, exists, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, load_only
+from models.product_sheet import ProductSheet, ProductCompliance
+from legal_framework.compliance_validator import ComplianceValidator
+
+
+# Serializes full resyncs (startup, rules file changes, admin trigger)
+_sync_lock = threading.Lock()
+
+
+class ComplianceStatusManager:
+    """
+    Manager for the product_compliance table.
+
+    One row per (SKU, country) with status, percentage and issue counts, so
+    compliance can be filtered in SQL. Rows are kept current by:
+    - refresh_product(): on writes, only for countries whose rules reference
+      a changed field (field -> countries map derived from the YAMLs)
+    - sync(): rows missing or validated with an older version of the rules
+      file (every row of a country after its YAML changes)
+    """
+
+    def __init__(self, db: Session, validator: Optional[ComplianceValidator] = None):
+        """
+        Initialize manager.
+
+        Args:
+            db: Database session
+            validator: ComplianceValidator providing the rules (optional)
+        """
+        self.db = db
+        self.validator = validator or ComplianceValidator()
+
+    def affected_countries(self, changed_fields: Iterable[str]) -> Set[str]:
+        """
+        Get countries whose compliance depends on any of the changed fields.
+
+        Args:
+            changed_fields: Product field names that were modified
+
+        Returns:
+            Set of country codes
+        """
+        dependencies = self.validator.get_field_dependencies()
+        countries = set()
+
+        for field in changed_fields:
+            countries |= dependencies.get(field, set())
+
+        return countries
+
+    def refresh_product(self, product: ProductSheet, countries: Optional[Iterable[str]] = None):
+        """
+        Recompute index rows for one product (added to the session, not committed).
+
+        Args:
+            product: ProductSheet instance
+            countries: Country codes to recompute (default: all available)
+        """
+        product_data = product.to_dict()
+        rows = []
+
+        for country in countries if countries is not None else self.validator.get_available_countries():
+            row = self._build_row(product_data, country)
+            if row is not None:
+                rows.append(row)
+
+        self._upsert_rows(rows)
+
+    def _upsert_rows(self, rows: List[ProductCompliance]):
+        """
+        Insert or replace index rows by (sku, country) (not committed).
+
+        A single upsert statement instead of merge() (SELECT, then INSERT or
+        UPDATE), which races with the DELETE + INSERT of a concurrent sync().
+        """
+        table = ProductCompliance.__table__
+        values = [{column.name: getattr(row, column.name) for column in table.columns} for row in rows]
+        if not values:
+            return
+
+        dialect = self.db.get_bind().dialect.name
+
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+            stmt = dialect_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.sku, table.c.country],
+                set_={
+                    column.name: stmt.excluded[column.name]
+                    for column in table.columns if not column.primary_key
+                }
+            )
+            self.db.execute(stmt, values)
+            return
+
+        for row in values:
+            replace = (
+                update(table)
+                .where(table.c.sku == row["sku"], table.c.country == row["country"])
+                .values(row)
+            )
+            if self.db.execute(replace).rowcount:
+                continue
+            try:
+                with self.db.begin_nested():
+                    self.db.execute(insert(table).values(row))
+            except IntegrityError:
+                # Created by a concurrent sync()
+                self.db.execute(replace)
+
+    def refresh_products(self, products: List[Dict[str, Any]], countries: List[Optional[Set[str]]]):
+        """
+        Recompute index rows for many products (not committed).
+
+        Same as refresh_product() per product, with one DELETE per country
+        and batched inserts instead of an upsert per product.
+
+        Args:
+            products: Product data dictionaries
+            countries: Country codes to recompute per product (None: all available)
+        """
+        available = self.validator.get_available_countries()
+        by_country: Dict[str, List[Dict[str, Any]]] = {}
+
+        for product_data, product_countries in zip(products, countries):
+            for country in product_countries if product_countries is not None else available:
+                by_country.setdefault(country.upper(), []).append(product_data)
+
+        for country, country_products in by_country.items():
+            version = self.validator.get_rules_version(country)
+            if version is None:
+                continue
+
+            self.db.execute(
+                delete(ProductCompliance).where(
+                    ProductCompliance.country == country,
+                    ProductCompliance.sku.in_([product_data['sku'] for product_data in country_products])
+                )
+            )
+            self.db.add_all([
+                self._build_row(product_data, country, version) for product_data in country_products
+            ])
+
+    def remove_product(self, sku: str):
+        """
+        Delete index rows for a product (not committed).
+
+        Args:
+            sku: Product SKU
+        """
+        self.db.execute(delete(ProductCompliance).where(ProductCompliance.sku == sku))
+
+    def sync(self, countries: Optional[List[str]] = None, chunk_size: int = 500) -> Dict[str, int]:
+        """
+        Recompute rows that are missing or were validated with older rules.
+
+        Args:
+            countries: Country codes to sync (default: all available)
+            chunk_size: Products per chunk
+
+        Returns:
+            Dictionary {country: recomputed rows}
+        """
+        with _sync_lock:
+            available = self.validator.get_available_countries()
+            refreshed = {}
+
+            for country in countries or available:
+                version = self.validator.get_rules_version(country)
+                if version is None:
+                    continue
+                refreshed[country.upper()] = self._sync_country(country.upper(), version, chunk_size)
+
+            # Rows for countries whose rules file was removed
+            self.db.execute(delete(ProductCompliance).where(ProductCompliance.country.notin_(available)))
+            self.db.commit()
+
+        return refreshed
+
+    def _sync_country(self, country: str, version: str, chunk_size: int) -> int:
+        """Recompute one country in keyset-paginated chunks of stale products."""
+        fields = ["sku", "family", *self.validator.get_rule_fields([country])]
+        columns = [getattr(ProductSheet, f) for f in fields if f != "sku" and hasattr(ProductSheet, f)]
+
+        is_current = exists().where(
+            ProductCompliance.sku == ProductSheet.sku,
+            ProductCompliance.country == country,
+            ProductCompliance.rules_version == version
+        )
+
+        query = self.db.query(ProductSheet).options(load_only(ProductSheet.sku, *columns)).filter(~is_current)
+        last_sku = None
+        total = 0
+
+        while True:
+            chunk_query = query.filter(ProductSheet.sku > last_sku) if last_sku is not None else query
+            chunk = chunk_query.order_by(ProductSheet.sku).limit(chunk_size).all()
+
+            if not chunk:
+                break
+
+            last_sku = chunk[-1].sku
+            rows = [
+                self._build_row({f: getattr(product, f, None) for f in fields}, country, version)
+                for product in chunk
+            ]
+
+            self.db.execute(
+                delete(ProductCompliance).where(
+                    ProductCompliance.country == country,
+                    ProductCompliance.sku.in_([product.sku for product in chunk])
+                )
+            )
+            self.db.add_all(rows)
+            self.db.commit()
+            self.db.expunge_all()
+
+            total += len(rows)
+
+        return total
+
+    def _build_row(
+        self,
+        product_data: Dict[str, Any],
+        country: str,
+        version: Optional[str] = None
+    ) -> Optional[ProductCompliance]:
+        """Validate one product for one country and build its index row."""
+        version = version or self.validator.get_rules_version(country)
+        if version is None:
+            return None
+
+        result = self.validator.validate_for_country(product_data, country)
+
+        return ProductCompliance(
+            sku=product_data['sku'],
+            country=country.upper(),
+            family=result.get('family'),
+            status=result['status'],
+            percentage=result.get('percentage', 0),
+            critical_issues=len(result.get('critical_issues', [])),
+            warnings=len(result.get('warnings', [])),
+            missing_fields=[issue['field'] for issue in result.get('critical_issues', [])],
+            rules_version=version,
+            validated_date=datetime.utcnow(),
+        )
+
+    def get_product_status(self, sku: str) -> List[ProductCompliance]:
+        """
+        Get indexed compliance rows for a product.
+
+        Args:
+            sku: Product SKU
+
+        Returns:
+            List of ProductCompliance rows
+        """
+        return self.db.query(ProductCompliance).filter(ProductCompliance.sku == sku).all()
+
+    def get_summary(self) -> Dict[str, Dict[str, int]]:
+        """
+        Count indexed products by country and status.
+
+        Returns:
+            Dictionary {country: {status: count}}
+        """
+        rows = self.db.execute(
+            select(ProductCompliance.country, ProductCompliance.status, func.count())
+            .group_by(ProductCompliance.country, ProductCompliance.status)
+        ).all()
+
+        summary: Dict[str, Dict[str, int]] = {}
+        for country, status, count in rows:
+            summary.setdefault(country, {})[status] = count
+
+        return summary
+
+    @classmethod
+    def start_background_sync(cls, session_factory, countries: Optional[List[str]] = None) -> threading.Thread:
+        """
+        Run sync() in a daemon thread with its own session.
+
+        Args:
+            session_factory: Callable returning a new database session
+            countries: Country codes to sync (default: all available)
+
+        Returns:
+            The started thread
+        """
+        def run():
+            db = session_factory()
+            try:
+                refreshed = cls(db).sync(countries)
+                if any(refreshed.values()):
+                    print(f"Compliance index synced: {refreshed}")
+            except Exception as e:
+                print(f"Error syncing compliance index: {e}")
+            finally:
+                db.close()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    @classmethod
+    def watch_rules(cls, session_factory):
+        """
+        Resync a country's rows in the background whenever its rules file changes.
+
+        Args:
+            session_factory: Callable returning a new database session
+        """
+        ComplianceValidator().registry.add_listener(
+            lambda countries: cls.start_background_sync(session_factory, sorted(countries))
+        )
@@ -0,0 +1,231 @@
+"""EAN Index - Barcode to SKU resolution through the product_eans table."""
+import threading
+from typing import List, Dict, Optional, Any, Iterable
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.orm import Session, load_only
+from models.product_sheet import ProductSheet, ProductEan
+
+
+class EanIndex:
+    """
+    Index of the EANs in ProductSheet.ean_list.
+
+    Each EAN belongs to at most one product (primary key on ean), so
+    resolving a barcode is a single index lookup. Rows are written in the
+    caller's transaction (not committed).
+    """
+
+    # Maximum EANs per resolve_many() query (bound parameter limits)
+    CHUNK_SIZE = 500
+
+    def __init__(self, db: Session):
+        """Initialize index with database session."""
+        self.db = db
+
+    @staticmethod
+    def normalize(eans: Optional[Iterable[Any]]) -> List[str]:
+        """
+        Normalize an EAN list: strings, trimmed, without empties or duplicates.
+
+        Args:
+            eans: EAN values (str or int)
+
+        Returns:
+            List of EANs in their original order
+        """
+        normalized = []
+
+        for ean in eans or []:
+            ean = str(ean).strip()
+            if ean and ean not in normalized:
+                normalized.append(ean)
+
+        return normalized
+
+    def resolve(self, ean: str) -> Optional[str]:
+        """
+        Get the SKU that owns an EAN.
+
+        Args:
+            ean: Barcode
+
+        Returns:
+            SKU or None
+        """
+        return self.db.execute(
+            select(ProductEan.sku).where(ProductEan.ean == str(ean).strip())
+        ).scalar_one_or_none()
+
+    def resolve_many(self, eans: Iterable[Any]) -> Dict[str, str]:
+        """
+        Resolve several EANs (one query per CHUNK_SIZE EANs).
+
+        Args:
+            eans: Barcodes
+
+        Returns:
+            Dictionary {ean: sku} with the EANs found
+        """
+        eans = self.normalize(eans)
+        resolved = {}
+
+        for start in range(0, len(eans), self.CHUNK_SIZE):
+            rows = self.db.execute(
+                select(ProductEan.ean, ProductEan.sku)
+                .where(ProductEan.ean.in_(eans[start:start + self.CHUNK_SIZE]))
+            )
+            resolved.update({ean: sku for ean, sku in rows})
+
+        return resolved
+
+    def find_conflicts(self, sku: str, eans: Iterable[Any]) -> Dict[str, str]:
+        """
+        Get EANs already assigned to other products.
+
+        Args:
+            sku: Product SKU the EANs are for
+            eans: Barcodes
+
+        Returns:
+            Dictionary {ean: owning sku}
+        """
+        return {ean: owner for ean, owner in self.resolve_many(eans).items() if owner != sku}
+
+    def check_available(self, sku: str, eans: Iterable[Any]):
+        """
+        Ensure no EAN belongs to another product.
+
+        Args:
+            sku: Product SKU the EANs are for
+            eans: Barcodes
+
+        Raises:
+            ValueError: If an EAN is assigned to another SKU
+        """
+        conflicts = self.find_conflicts(sku, eans)
+        if conflicts:
+            details = ", ".join(f"{ean} ({owner})" for ean, owner in conflicts.items())
+            raise ValueError(f"EAN already assigned to another product: {details}")
+
+    def set_product_eans(self, sku: str, eans: Optional[Iterable[Any]]):
+        """
+        Replace the index rows of a product (not committed).
+
+        Args:
+            sku: Product SKU
+            eans: Current ean_list of the product
+        """
+        self.db.execute(delete(ProductEan).where(ProductEan.sku == sku))
+        self.db.add_all([
+            ProductEan(ean=ean, sku=sku, position=position)
+            for position, ean in enumerate(self.normalize(eans))
+        ])
+
+    def set_many(self, eans_by_sku: Dict[str, Optional[Iterable[Any]]]):
+        """
+        Replace the index rows of many products (not committed).
+
+        Args:
+            eans_by_sku: Dictionary {sku: current ean_list}
+        """
+        skus = list(eans_by_sku)
+
+        for start in range(0, len(skus), self.CHUNK_SIZE):
+            self.db.execute(delete(ProductEan).where(ProductEan.sku.in_(skus[start:start + self.CHUNK_SIZE])))
+
+        rows = [
+            {"ean": ean, "sku": sku, "position": position}
+            for sku, eans in eans_by_sku.items()
+            for position, ean in enumerate(self.normalize(eans))
+        ]
+        if rows:
+            self.db.execute(insert(ProductEan), rows)
+
+    def remove_product(self, sku: str):
+        """
+        Delete the index rows of a product (not committed).
+
+        Args:
+            sku: Product SKU
+        """
+        self.db.execute(delete(ProductEan).where(ProductEan.sku == sku))
+
+    def sync(self, chunk_size: int = 500) -> Dict[str, Any]:
+        """
+        Index products without EAN rows and drop rows of deleted products.
+
+        An EAN already owned by another product is skipped and reported.
+
+        Args:
+            chunk_size: Products per chunk
+
+        Returns:
+            Dictionary {"indexed": products, "conflicts": [{ean, sku, owner}]}
+        """
+        orphaned = ~exists().where(ProductSheet.sku == ProductEan.sku)
+        self.db.execute(delete(ProductEan).where(orphaned).execution_options(synchronize_session=False))
+        self.db.commit()
+
+        has_rows = exists().where(ProductEan.sku == ProductSheet.sku)
+        query = self.db.query(ProductSheet).options(
+            load_only(ProductSheet.sku, ProductSheet.ean_list)
+        ).filter(~has_rows)
+        last_sku = None
+        indexed = 0
+        conflicts = []
+
+        while True:
+            chunk_query = query.filter(ProductSheet.sku > last_sku) if last_sku is not None else query
+            chunk = chunk_query.order_by(ProductSheet.sku).limit(chunk_size).all()
+
+            if not chunk:
+                break
+
+            last_sku = chunk[-1].sku
+            owners = self.resolve_many(ean for product in chunk for ean in product.ean_list or [])
+
+            for product in chunk:
+                eans = []
+                for ean in self.normalize(product.ean_list):
+                    owner = owners.setdefault(ean, product.sku)
+                    if owner == product.sku:
+                        eans.append(ean)
+                    else:
+                        conflicts.append({"ean": ean, "sku": product.sku, "owner": owner})
+
+                if eans:
+                    self.set_product_eans(product.sku, eans)
+                    indexed += 1
+
+            self.db.commit()
+            self.db.expunge_all()
+
+        return {"indexed": indexed, "conflicts": conflicts}
+
+    @classmethod
+    def start_background_sync(cls, session_factory) -> threading.Thread:
+        """
+        Run sync() in a daemon thread with its own session.
+
+        Args:
+            session_factory: Callable returning a new database session
+
+        Returns:
+            The started thread
+        """
+        def run():
+            db = session_factory()
+            try:
+                result = cls(db).sync()
+                if result["indexed"]:
+                    print(f"EAN index synced: {result['indexed']} products")
+                for conflict in result["conflicts"]:
+                    print(f"Duplicate EAN {conflict['ean']} in {conflict['sku']} (owned by {conflict['owner']})")
+            except Exception as e:
+                print(f"Error syncing EAN index: {e}")
+            finally:
+                db.close()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
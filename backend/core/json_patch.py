@@ -0,0 +1,99 @@
+"""JSON Patch - Deltas between snapshots as RFC 6902 style operations."""
+from typing import List, Dict, Any
+
+
+def _escape(key: str) -> str:
+    """Escape a key as a JSON pointer token (RFC 6901)."""
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    """Decode a JSON pointer token."""
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _same(a: Any, b: Any) -> bool:
+    """Equality that does not confuse True/1 or 1/1.0 (different JSON values)."""
+    return a is b or (type(a) is type(b) and a == b)
+
+
+def make_patch(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compute the operations that turn one object into another.
+
+    Objects are compared key by key recursively; lists and scalars that
+    differ are replaced whole.
+
+    Args:
+        old: Source object
+        new: Target object
+
+    Returns:
+        List of {"op": "add"|"replace"|"remove", "path": pointer, "value"?}
+    """
+    ops: List[Dict[str, Any]] = []
+    _diff(old, new, "", ops)
+    return ops
+
+
+def _diff(old: Dict[str, Any], new: Dict[str, Any], path: str, ops: List[Dict[str, Any]]):
+    """Append operations for two objects at path."""
+    for key, old_value in old.items():
+        pointer = f"{path}/{_escape(key)}"
+        if key not in new:
+            ops.append({"op": "remove", "path": pointer})
+            continue
+
+        new_value = new[key]
+        if _same(old_value, new_value):
+            continue
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            _diff(old_value, new_value, pointer, ops)
+        else:
+            ops.append({"op": "replace", "path": pointer, "value": new_value})
+
+    for key, new_value in new.items():
+        if key not in old:
+            ops.append({"op": "add", "path": f"{path}/{_escape(key)}", "value": new_value})
+
+
+def apply_patch(document: Dict[str, Any], patch: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply make_patch() operations to an object.
+
+    The document is not modified: objects along patched paths are copied,
+    everything else is shared with the result.
+
+    Args:
+        document: Source object
+        patch: Operations from make_patch()
+
+    Returns:
+        Patched object
+
+    Raises:
+        ValueError: If an operation's path does not exist in the document
+    """
+    result = dict(document)
+    copied = {id(result)}
+
+    for op in patch:
+        tokens = [_unescape(token) for token in op["path"].split("/")[1:]]
+        parent = result
+
+        for token in tokens[:-1]:
+            child = parent.get(token)
+            if not isinstance(child, dict):
+                raise ValueError(f"Invalid patch path: {op['path']}")
+            if id(child) not in copied:
+                child = dict(child)
+                parent[token] = child
+                copied.add(id(child))
+            parent = child
+
+        if op["op"] == "remove":
+            parent.pop(tokens[-1], None)
+        else:
+            parent[tokens[-1]] = op["value"]
+
+    return result
@@ -0,0 +1,315 @@
+"""JSON Re-encoder - Compresses / decompresses the JSON columns declared with json_column."""
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional, Any, Callable, Tuple
+from sqlalchemy import LargeBinary, Table, Text, bindparam, inspect, select, text, type_coerce, update
+from sqlalchemy.orm import Session
+from sqlalchemy.types import NullType
+from backend.database import Base
+from models.types import COMPRESSIBLE_COLUMNS, CompressedJSON, decode_json, encode_json, encoded_codec, plain_json, preferred_codec
+from config import settings
+
+
+class JsonReencoder:
+    """
+    Re-encoder of compressible JSON columns (declared with json_column).
+
+    By default, rows of the columns enabled in JSON_COMPRESSED_COLUMNS that
+    were written as plain JSON (before the column was enabled) or with
+    another codec are rewritten with the current JSON_COMPRESSION settings.
+    With decompress=True, columns removed from JSON_COMPRESSED_COLUMNS are
+    rewritten as plain JSON. Tables are walked in keyset-paginated chunks
+    over their primary key, each chunk committed separately, so the job can
+    run while the application serves requests.
+
+    On PostgreSQL compressed columns are bytea: convert_columns() changes
+    the column types (explicit migration, see compress_json_columns.py).
+    """
+
+    def __init__(self, db: Session, columns: Optional[List[str]] = None, decompress: bool = False):
+        """
+        Initialize re-encoder.
+
+        Args:
+            db: Database session
+            columns: Only these "table.column" (default: every enabled column, or
+                every disabled one with decompress)
+            decompress: Rewrite as plain JSON instead of compressing
+        """
+        self.db = db
+        self.columns = columns
+        self.decompress = decompress
+        self.codec = None if decompress else preferred_codec()
+
+    def targets(self) -> List[Tuple[Table, List[Any]]]:
+        """
+        Get the tables and columns to re-encode.
+
+        Returns:
+            List of (table, columns); tables without a single-column primary key are skipped
+
+        Raises:
+            ValueError: If a requested column is not compressible, or is still
+                enabled when decompressing
+        """
+        requested = set(self.columns) if self.columns is not None else None
+        if requested is not None:
+            unknown = requested - set(COMPRESSIBLE_COLUMNS)
+            if unknown:
+                raise ValueError(f"Not compressible JSON columns: {', '.join(sorted(unknown))}")
+
+        targets = []
+        for table in Base.metadata.sorted_tables:
+            columns = []
+            for column in table.columns:
+                key = f"{table.name}.{column.name}"
+                if key not in COMPRESSIBLE_COLUMNS or requested is not None and key not in requested:
+                    continue
+
+                enabled = isinstance(column.type, CompressedJSON)
+                if self.decompress and enabled and requested is not None:
+                    raise ValueError(f"{key} is still listed in JSON_COMPRESSED_COLUMNS")
+                if enabled != self.decompress:
+                    columns.append(column)
+
+            if columns and len(table.primary_key.columns) == 1:
+                targets.append((table, columns))
+        return targets
+
+    def check_storage(self):
+        """
+        Check that the database column types can hold the encoded values.
+
+        Raises:
+            ValueError: If a compressed column is still json on PostgreSQL
+        """
+        pending = [
+            f"{table}.{column}"
+            for table, column, binary in self._storage()
+            if not binary and not self.decompress
+        ]
+        if pending:
+            raise ValueError(
+                f"Columns not converted to bytea: {', '.join(pending)} (run compress_json_columns.py)"
+            )
+
+    def convert_columns(self) -> List[str]:
+        """
+        Change the database type of the target columns (PostgreSQL only).
+
+        json columns become bytea (existing values kept as plain UTF-8 JSON)
+        when compressing; with decompress, bytea columns become json again,
+        so run it after run() has rewritten them as plain JSON. Rewrites the
+        whole table under an exclusive lock.
+
+        Returns:
+            Converted "table.column" names
+        """
+        converted = []
+
+        for table, column, binary in self._storage():
+            if not self.decompress and not binary:
+                statement = f"ALTER TABLE {table} ALTER COLUMN {column} TYPE bytea USING convert_to({column}::text, 'UTF8')"
+            elif self.decompress and binary:
+                statement = f"ALTER TABLE {table} ALTER COLUMN {column} TYPE json USING convert_from({column}, 'UTF8')::json"
+            else:
+                continue
+
+            self.db.execute(text(statement))
+            self.db.commit()
+            converted.append(f"{table}.{column}")
+
+        return converted
+
+    def _storage(self) -> List[Tuple[str, str, bool]]:
+        """(table, column, stored as binary) of the targets on PostgreSQL (empty elsewhere)."""
+        bind = self.db.get_bind()
+        if bind.dialect.name != "postgresql":
+            return []
+
+        inspector = inspect(bind)
+        storage = []
+        for table, columns in self.targets():
+            existing = {column['name']: column['type'] for column in inspector.get_columns(table.name)}
+            for column in columns:
+                storage.append((table.name, column.name, isinstance(existing.get(column.name), LargeBinary)))
+        return storage
+
+    def needs_reencode(self, raw: Any) -> bool:
+        """
+        Check if a stored value differs from what the re-encoder would write.
+
+        Args:
+            raw: Column value as returned by the driver
+
+        Returns:
+            True if the value should be rewritten
+        """
+        if raw is None:
+            return False
+
+        codec = encoded_codec(raw)
+        if codec is None:
+            # Plain JSON (legacy text included) stays as is below the compression threshold
+            size = len(raw.encode("utf-8")) if isinstance(raw, str) else len(bytes(raw))
+            return self.codec is not None and size >= settings.json_compression_min_bytes
+        return codec != self.codec
+
+    def run(self, chunk_size: int = 500, on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Re-encode every target column.
+
+        Args:
+            chunk_size: Rows per transaction
+            on_progress: Called with the running totals after each chunk
+
+        Returns:
+            Totals: tables, rows, rewritten, bytes_before and bytes_after
+            (stored bytes of the rewritten values)
+
+        Raises:
+            ValueError: If the columns cannot hold the encoded values (see check_storage)
+        """
+        self.check_storage()
+        totals = {"tables": 0, "table": None, "rows": 0, "rewritten": 0, "bytes_before": 0, "bytes_after": 0}
+
+        for table, columns in self.targets():
+            totals["table"] = table.name
+            self._run_table(table, columns, chunk_size, totals, on_progress)
+            totals["tables"] += 1
+
+        totals["table"] = None
+        return totals
+
+    def _run_table(self, table: Table, columns: List[Any], chunk_size: int, totals: Dict[str, Any], on_progress):
+        """Re-encode one table in keyset-paginated chunks."""
+        pk = list(table.primary_key.columns)[0]
+        # Plain JSON goes back to TEXT where the JSON type stores text (SQLite)
+        as_text = self.decompress and self.db.get_bind().dialect.name != "postgresql"
+        # Raw stored bytes: bypass CompressedJSON decoding
+        query = select(pk, *[type_coerce(column, LargeBinary).label(column.name) for column in columns])
+        # Compare-and-set on the raw value: rows written meanwhile are left alone
+        statements = {
+            column.name: (
+                update(table)
+                .where(pk == bindparam('b_pk'), type_coerce(column, NullType()) == bindparam('b_old', type_=NullType()))
+                .values({column.name: bindparam('b_value', type_=Text if as_text else LargeBinary)})
+            )
+            for column in columns
+        }
+        last_pk = None
+
+        while True:
+            chunk_query = query.where(pk > last_pk) if last_pk is not None else query
+            rows = self.db.execute(chunk_query.order_by(pk).limit(chunk_size)).all()
+
+            if not rows:
+                break
+
+            last_pk = rows[-1][0]
+            params: Dict[str, List[Dict[str, Any]]] = {column.name: [] for column in columns}
+
+            for row in rows:
+                for column in columns:
+                    raw = row._mapping[column.name]
+                    if not self.needs_reencode(raw):
+                        continue
+
+                    value = decode_json(raw)
+                    encoded = plain_json(value) if self.decompress else encode_json(value)
+                    if not isinstance(raw, str) and encoded == bytes(raw):
+                        continue
+                    params[column.name].append({
+                        'b_pk': row[0],
+                        'b_old': raw,
+                        'b_value': encoded.decode("utf-8") if as_text else encoded
+                    })
+                    totals["bytes_before"] += len(raw.encode("utf-8")) if isinstance(raw, str) else len(bytes(raw))
+                    totals["bytes_after"] += len(encoded)
+
+            for name, column_params in params.items():
+                if column_params:
+                    self.db.execute(statements[name], column_params)
+                    totals["rewritten"] += len(column_params)
+            self.db.commit()
+
+            totals["rows"] += len(rows)
+            if on_progress:
+                on_progress(dict(totals))
+
+
+class JsonReencodeJob:
+    """Background JsonReencoder run (one at a time per process), polled for progress."""
+
+    _current: Optional["JsonReencodeJob"] = None
+    _lock = threading.Lock()
+
+    def __init__(self, chunk_size: int):
+        """Initialize job."""
+        self.chunk_size = chunk_size
+        self.status = "pending"  # pending, running, completed, failed
+        self.progress: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+
+    @classmethod
+    def start(cls, session_factory, chunk_size: int = 500) -> "JsonReencodeJob":
+        """
+        Start a re-encoding job in a daemon thread.
+
+        Args:
+            session_factory: Callable returning a new database session
+            chunk_size: Rows per transaction
+
+        Returns:
+            The started job
+
+        Raises:
+            RuntimeError: If a job is already running
+        """
+        with cls._lock:
+            if cls._current is not None and cls._current.status in ("pending", "running"):
+                raise RuntimeError("A re-encoding job is already running")
+            job = cls(chunk_size)
+            cls._current = job
+
+        threading.Thread(target=job._run, args=(session_factory,), daemon=True).start()
+        return job
+
+    @classmethod
+    def current(cls) -> Optional["JsonReencodeJob"]:
+        """Get the last started job (None if none)."""
+        return cls._current
+
+    def _run(self, session_factory):
+        """Run the re-encoder, updating progress after each chunk."""
+        self.status = "running"
+        db = session_factory()
+
+        try:
+            self.progress = JsonReencoder(db).run(self.chunk_size, on_progress=self._on_progress)
+            self.status = "completed"
+        except Exception as e:
+            print(f"Error re-encoding JSON columns: {e}")
+            db.rollback()
+            self.error = str(e)
+            self.status = "failed"
+        finally:
+            db.close()
+            self.finished_at = datetime.utcnow()
+
+    def _on_progress(self, totals: Dict[str, Any]):
+        """Store running totals."""
+        self.progress = totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert job to dictionary."""
+        return {
+            "status": self.status,
+            "chunk_size": self.chunk_size,
+            "progress": self.progress,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
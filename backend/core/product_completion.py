@@ -0,0 +1,225 @@
+"""Product Completion - Incrementally maintained completion_percentage."""
+import threading
+from typing import List, Dict, Optional, Any, Iterable
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+from models.product_sheet import ProductSheet
+
+
+# Required/important fields with weights for completion_percentage
+COMPLETION_WEIGHTS = {
+    'sku': 5,
+    'family': 5,
+    'title_short': 10,
+    'brand': 5,
+    'inci_ingredients': 10,
+    'mode_of_use': 10,
+    'general_warnings': 10,
+    'made_in': 5,
+    'distributor': 5,
+    'packaging_languages': 5,
+    'net_weight_value': 5,
+    'format_type': 5,
+    'pao': 5,
+    'allergens_present': 5,
+    'product_images': 5,
+    'description_detailed': 10,
+}
+
+# Bit i of ProductSheet.completion_fields = COMPLETION_FIELDS[i] is filled
+COMPLETION_FIELDS = tuple(COMPLETION_WEIGHTS)
+
+_TOTAL_WEIGHT = sum(COMPLETION_WEIGHTS.values())
+
+
+class ProductCompletion:
+    """
+    Maintainer of ProductSheet.completion_percentage.
+
+    ProductSheet.completion_fields keeps one filled/unfilled bit per
+    weighted field, so a write only re-checks the fields it touches and the
+    percentage is the weighted sum of the set bits. Products without bits
+    (created before the column existed or written outside the managers)
+    are filled by rebuild().
+
+    Changing COMPLETION_WEIGHTS keys requires rebuild(only_missing=False).
+    """
+
+    def __init__(self, db: Session):
+        """Initialize with database session."""
+        self.db = db
+
+    @staticmethod
+    def has_value(value: Any) -> bool:
+        """Check if a field has value (non-empty dict/list/string, truthy scalar)."""
+        if not value:
+            return False
+        if isinstance(value, str):
+            return bool(value.strip())
+        return True
+
+    @classmethod
+    def bits(cls, data: Dict[str, Any]) -> int:
+        """
+        Compute the filled-field bits of a complete product.
+
+        Args:
+            data: Product data dictionary (missing fields count as empty)
+
+        Returns:
+            Bit mask over COMPLETION_FIELDS
+        """
+        return cls.bits_many([data])[0]
+
+    @classmethod
+    def bits_many(cls, rows: List[Dict[str, Any]]) -> List[int]:
+        """
+        Compute the filled-field bits of many products in one pass per field.
+
+        Args:
+            rows: Product data dictionaries
+
+        Returns:
+            Bit masks, in the same order
+        """
+        masks = [0] * len(rows)
+
+        for i, field in enumerate(COMPLETION_FIELDS):
+            bit = 1 << i
+            for j, row in enumerate(rows):
+                if cls.has_value(row.get(field)):
+                    masks[j] |= bit
+
+        return masks
+
+    @classmethod
+    def update_bits(cls, bits: int, changes: Dict[str, Any]) -> int:
+        """
+        Update bits for the changed fields only.
+
+        Args:
+            bits: Current bit mask
+            changes: New values of the changed fields (others are ignored)
+
+        Returns:
+            Updated bit mask
+        """
+        for i, field in enumerate(COMPLETION_FIELDS):
+            if field in changes:
+                if cls.has_value(changes[field]):
+                    bits |= 1 << i
+                else:
+                    bits &= ~(1 << i)
+
+        return bits
+
+    @staticmethod
+    def percentage(bits: int) -> int:
+        """
+        Completion percentage (0-100) of a bit mask.
+
+        Args:
+            bits: Bit mask over COMPLETION_FIELDS
+
+        Returns:
+            Weighted percentage of filled fields
+        """
+        weight = sum(w for i, w in enumerate(COMPLETION_WEIGHTS.values()) if bits >> i & 1)
+        return int((weight / _TOTAL_WEIGHT) * 100)
+
+    @staticmethod
+    def affects(changed_fields: Iterable[str]) -> bool:
+        """Check if any changed field is weighted."""
+        return any(field in COMPLETION_WEIGHTS for field in changed_fields)
+
+    def apply(self, product: ProductSheet, changed_fields: Optional[Iterable[str]] = None):
+        """
+        Update completion_fields and completion_percentage of a product.
+
+        Args:
+            product: ProductSheet instance
+            changed_fields: Fields modified since the bits were computed
+                (None: recompute every field)
+        """
+        if changed_fields is None or product.completion_fields is None:
+            bits = self.bits({field: getattr(product, field) for field in COMPLETION_FIELDS})
+        else:
+            changes = {field: getattr(product, field) for field in changed_fields if field in COMPLETION_WEIGHTS}
+            if not changes:
+                return
+            bits = self.update_bits(product.completion_fields, changes)
+
+        product.completion_fields = bits
+        product.completion_percentage = self.percentage(bits)
+
+    def rebuild(self, only_missing: bool = False, chunk_size: int = 1000) -> int:
+        """
+        Recompute completion of the catalog in keyset-paginated chunks.
+
+        Only the weighted columns are read; each chunk is written with one
+        executemany UPDATE and committed.
+
+        Args:
+            only_missing: Only products without completion_fields
+            chunk_size: Products per chunk
+
+        Returns:
+            Number of products updated
+        """
+        columns = [getattr(ProductSheet, field) for field in COMPLETION_FIELDS if field != 'sku']
+        query = select(ProductSheet.sku, *columns)
+        if only_missing:
+            query = query.where(ProductSheet.completion_fields.is_(None))
+
+        stmt = (
+            update(ProductSheet.__table__)
+            .where(ProductSheet.__table__.c.sku == bindparam('b_sku'))
+            .values(completion_fields=bindparam('b_bits'), completion_percentage=bindparam('b_percentage'))
+        )
+        last_sku = None
+        total = 0
+
+        while True:
+            chunk_query = query.where(ProductSheet.sku > last_sku) if last_sku is not None else query
+            result = self.db.execute(chunk_query.order_by(ProductSheet.sku).limit(chunk_size))
+            rows = [row._asdict() for row in result]
+
+            if not rows:
+                break
+
+            last_sku = rows[-1]['sku']
+            self.db.execute(stmt, [
+                {'b_sku': row['sku'], 'b_bits': bits, 'b_percentage': self.percentage(bits)}
+                for row, bits in zip(rows, self.bits_many(rows))
+            ])
+            self.db.commit()
+
+            total += len(rows)
+
+        return total
+
+    @classmethod
+    def start_background_rebuild(cls, session_factory) -> threading.Thread:
+        """
+        Run rebuild(only_missing=True) in a daemon thread with its own session.
+
+        Args:
+            session_factory: Callable returning a new database session
+
+        Returns:
+            The started thread
+        """
+        def run():
+            db = session_factory()
+            try:
+                rebuilt = cls(db).rebuild(only_missing=True)
+                if rebuilt:
+                    print(f"Completion rebuilt: {rebuilt} products")
+            except Exception as e:
+                print(f"Error rebuilding completion: {e}")
+            finally:
+                db.close()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
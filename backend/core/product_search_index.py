@@ -0,0 +1,529 @@
+"""Product Search Index - Full-text search over product sheets."""
+import re
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional, Any, Iterable
+from sqlalchemy import delete, exists, insert, inspect, or_, select, text, update
+from sqlalchemy.orm import Session, load_only
+from models.product_sheet import ProductSheet, ProductSearchEntry
+
+
+# Product fields that feed the search document
+SEARCH_FIELDS = ("sku", "ean_list", "brand", "title_short", "description_detailed", "inci_ingredients")
+
+# PostgreSQL text search configuration per content language (others: simple)
+TEXT_SEARCH_CONFIGS = {
+    "es": "spanish",
+    "pt": "portuguese",
+    "br": "portuguese",
+    "it": "italian",
+    "en": "english",
+    "fr": "french",
+    "de": "german",
+}
+
+# Query terms: runs of letters/digits (never contain FTS/tsquery operators)
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# Plural / gender endings stripped from SQLite query terms before prefix matching
+_SUFFIX_RE = re.compile(r"(?:s)?[aeiouáéíóú]?s?$")
+
+# SKU / brand fragments shorter than this are not substring-matched (trigram indexes)
+FRAGMENT_MIN_LENGTH = 3
+
+# Engine -> full-text search available (schema created once per engine)
+_schema_state: Dict[Any, bool] = {}
+# Engine -> SKU / brand fragment index available
+_fragment_state: Dict[Any, bool] = {}
+_schema_lock = threading.Lock()
+
+
+def like_pattern(fragment: str) -> str:
+    """Substring LIKE pattern with %, _ and \\ escaped (use with escape="\\")."""
+    return "%" + re.sub(r"([\\%_])", r"\\\1", fragment) + "%"
+
+
+class ProductSearchIndex:
+    """
+    Full-text index over SKU, EANs, brand and every language of the title,
+    description and INCI list.
+
+    - SQLite: FTS5 table product_search_fts (rowid = product_search.id),
+      unicode61 tokenizer without diacritics, ranked with bm25
+    - PostgreSQL: tsvector column product_search.document with a GIN index,
+      each language stemmed with its own text search configuration and
+      ranked with ts_rank_cd
+
+    Ranking is computed over at most MAX_CANDIDATES matches. Every query
+    term is matched as a prefix (on SQLite after dropping its
+    plural/gender ending, in place of stemming). SKU and brand fragments
+    that are not whole tokens ("VIT-00") are matched through trigram
+    indexes (FTS5 trigram table product_search_ids_fts on SQLite, pg_trgm
+    GIN indexes on products.sku / products.brand on PostgreSQL) and
+    appended after the ranked matches. Entries are written in the
+    caller's transaction (not committed); sync() repairs products changed
+    outside ProductSheetManager.
+    """
+
+    FTS_TABLE = "product_search_fts"
+    IDS_FTS_TABLE = "product_search_ids_fts"
+
+    # bm25 column weights: sku, eans, brand, title, description, inci
+    FTS_WEIGHTS = (10.0, 10.0, 5.0, 3.0, 1.0, 1.0)
+
+    # Matches scored per query: bounds ranking cost for very common terms
+    MAX_CANDIDATES = 500
+
+    def __init__(self, db: Session):
+        """Initialize index with database session."""
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    @classmethod
+    def ensure_schema(cls, bind) -> bool:
+        """
+        Create the search tables for an engine (once per process).
+        
+        Existing tables are detected first, so read replicas (which reject
+        DDL) use the schema replicated from the primary.
+
+        Args:
+            bind: SQLAlchemy engine
+
+        Returns:
+            True if full-text search is available on this database
+        """
+        with _schema_lock:
+            if bind in _schema_state:
+                return _schema_state[bind]
+
+            available = False
+            try:
+                if cls._schema_exists(bind):
+                    _schema_state[bind] = True
+                    _fragment_state[bind] = True
+                    return True
+                
+                ProductSearchEntry.__table__.create(bind=bind, checkfirst=True)
+                had_ids_table = inspect(bind).has_table(cls.IDS_FTS_TABLE)
+
+                with bind.begin() as conn:
+                    if bind.dialect.name == "sqlite":
+                        conn.execute(text(
+                            f"CREATE VIRTUAL TABLE IF NOT EXISTS {cls.FTS_TABLE} USING fts5("
+                            "sku, eans, brand, title, description, inci, "
+                            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+                        ))
+                        conn.execute(text(
+                            f"CREATE VIRTUAL TABLE IF NOT EXISTS {cls.IDS_FTS_TABLE} USING fts5("
+                            "sku, brand, tokenize = 'trigram')"
+                        ))
+                        if not had_ids_table:
+                            # Databases indexed before the fragment table existed
+                            conn.execute(text(
+                                f"INSERT INTO {cls.IDS_FTS_TABLE} (rowid, sku, brand) "
+                                "SELECT s.id, p.sku, COALESCE(p.brand, '') "
+                                "FROM product_search s JOIN products p ON p.sku = s.sku"
+                            ))
+                        available = True
+                        _fragment_state[bind] = True
+                    elif bind.dialect.name == "postgresql":
+                        conn.execute(text("ALTER TABLE product_search ADD COLUMN IF NOT EXISTS document tsvector"))
+                        conn.execute(text(
+                            "CREATE INDEX IF NOT EXISTS idx_product_search_document "
+                            "ON product_search USING GIN (document)"
+                        ))
+                        available = True
+            except Exception as e:
+                print(f"Error creating full-text search index: {e}")
+
+            if bind.dialect.name == "postgresql" and available:
+                _fragment_state[bind] = cls._create_trigram_indexes(bind)
+
+            _schema_state[bind] = available
+            return available
+
+    @staticmethod
+    def _create_trigram_indexes(bind) -> bool:
+        """Create the pg_trgm indexes used for SKU / brand fragments (PostgreSQL)."""
+        try:
+            with bind.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                for column in ("sku", "brand"):
+                    conn.execute(text(
+                        f"CREATE INDEX IF NOT EXISTS idx_products_{column}_trgm "
+                        f"ON products USING GIN ({column} gin_trgm_ops)"
+                    ))
+            return True
+        except Exception as e:
+            print(f"Error creating trigram indexes (SKU / brand fragments are not matched): {e}")
+            return False
+
+    @classmethod
+    def _schema_exists(cls, bind) -> bool:
+        """Check if the search tables (and FTS table / tsvector column) already exist."""
+        inspector = inspect(bind)
+        if not inspector.has_table(ProductSearchEntry.__tablename__):
+            return False
+        if bind.dialect.name == "sqlite":
+            return inspector.has_table(cls.FTS_TABLE) and inspector.has_table(cls.IDS_FTS_TABLE)
+        if bind.dialect.name == "postgresql":
+            columns = {column["name"] for column in inspector.get_columns(ProductSearchEntry.__tablename__)}
+            indexes = {index["name"] for index in inspector.get_indexes(ProductSheet.__tablename__)}
+            return "document" in columns and {"idx_products_sku_trgm", "idx_products_brand_trgm"} <= indexes
+        return False
+
+    @property
+    def available(self) -> bool:
+        """Whether full-text search is supported by the current database."""
+        return self.ensure_schema(self.db.get_bind())
+
+    @staticmethod
+    def affects(changed_fields: Iterable[str]) -> bool:
+        """
+        Check if any changed field is part of the search document.
+
+        Args:
+            changed_fields: Product field names that were modified
+
+        Returns:
+            True if the product must be reindexed
+        """
+        return any(field in SEARCH_FIELDS for field in changed_fields)
+
+    def search(self, query_str: str, limit: int = 50) -> Optional[List[str]]:
+        """
+        Search the index.
+
+        Args:
+            query_str: Free text (SKU, EAN, brand or words in any language)
+            limit: Maximum results
+
+        Returns:
+            SKUs ordered by relevance, or None if full-text search is unavailable
+        """
+        if not self.available:
+            return None
+
+        terms = _TERM_RE.findall(query_str.lower())
+        if not terms:
+            return []
+
+        if self.dialect == "sqlite":
+            weights = ", ".join(str(w) for w in self.FTS_WEIGHTS)
+            rows = self.db.execute(
+                text(
+                    "SELECT s.sku FROM ("
+                    f"SELECT rowid, bm25({self.FTS_TABLE}, {weights}) AS score FROM {self.FTS_TABLE} "
+                    f"WHERE {self.FTS_TABLE} MATCH :match LIMIT :candidates"
+                    ") f JOIN product_search s ON s.id = f.rowid "
+                    "ORDER BY f.score LIMIT :limit"
+                ),
+                {
+                    "match": " ".join(f'"{self._stem(term)}"*' for term in terms),
+                    "candidates": self.MAX_CANDIDATES,
+                    "limit": limit,
+                }
+            )
+        else:
+            # Any configuration may match: the query language is unknown
+            configs = ["simple", *sorted(set(TEXT_SEARCH_CONFIGS.values()))]
+            tsquery = " || ".join(f"to_tsquery('{config}', :terms)" for config in configs)
+            rows = self.db.execute(
+                text(
+                    f"WITH q AS (SELECT {tsquery} AS query), "
+                    "candidates AS ("
+                    "SELECT s.sku, s.document FROM product_search s, q "
+                    "WHERE s.document @@ q.query LIMIT :candidates) "
+                    "SELECT c.sku FROM candidates c, q "
+                    "ORDER BY ts_rank_cd(c.document, q.query) DESC "
+                    "LIMIT :limit"
+                ),
+                {
+                    "terms": " & ".join(f"{term}:*" for term in terms),
+                    "candidates": self.MAX_CANDIDATES,
+                    "limit": limit,
+                }
+            )
+
+        skus = [sku for (sku,) in rows]
+
+        # SKU / brand fragments, after the ranked matches
+        if len(skus) < limit:
+            skus.extend(self._fragment_search(query_str.strip(), limit - len(skus), exclude=set(skus)))
+
+        return skus
+
+    def _fragment_search(self, fragment: str, limit: int, exclude: set) -> List[str]:
+        """
+        SKUs whose SKU or brand contains a fragment, through the trigram indexes.
+
+        Args:
+            fragment: Query text (FRAGMENT_MIN_LENGTH characters or more)
+            limit: Maximum results
+            exclude: SKUs already found
+
+        Returns:
+            SKUs in SKU order
+        """
+        if len(fragment) < FRAGMENT_MIN_LENGTH or not _fragment_state.get(self.db.get_bind()):
+            return []
+
+        if self.dialect == "sqlite":
+            rows = self.db.execute(
+                text(
+                    f"SELECT s.sku FROM {self.IDS_FTS_TABLE} f JOIN product_search s ON s.id = f.rowid "
+                    f"WHERE {self.IDS_FTS_TABLE} MATCH :match ORDER BY s.sku LIMIT :limit"
+                ),
+                {"match": '"' + fragment.replace('"', '""') + '"', "limit": limit + len(exclude)}
+            )
+        else:
+            pattern = like_pattern(fragment)
+            rows = self.db.execute(
+                select(ProductSheet.sku)
+                .where(or_(
+                    ProductSheet.sku.ilike(pattern, escape="\\"),
+                    ProductSheet.brand.ilike(pattern, escape="\\")
+                ))
+                .order_by(ProductSheet.sku)
+                .limit(limit + len(exclude))
+            )
+
+        return [sku for (sku,) in rows if sku not in exclude][:limit]
+
+    def index_product(self, product: ProductSheet):
+        """
+        Write the search document of a product (not committed).
+
+        Args:
+            product: ProductSheet instance
+        """
+        if not self.available:
+            return
+
+        entry = self.db.query(ProductSearchEntry).filter(ProductSearchEntry.sku == product.sku).first()
+        if entry is None:
+            entry = ProductSearchEntry(sku=product.sku)
+            self.db.add(entry)
+            self.db.flush()
+        entry.indexed_date = datetime.utcnow()
+
+        if self.dialect == "sqlite":
+            values = {"id": entry.id, **self._fts_values(product)}
+            for table in (self.FTS_TABLE, self.IDS_FTS_TABLE):
+                self.db.execute(text(f"DELETE FROM {table} WHERE rowid = :id"), {"id": entry.id})
+            self.db.execute(
+                text(
+                    f"INSERT INTO {self.FTS_TABLE} (rowid, sku, eans, brand, title, description, inci) "
+                    "VALUES (:id, :sku, :eans, :brand, :title, :description, :inci)"
+                ),
+                values
+            )
+            self.db.execute(
+                text(f"INSERT INTO {self.IDS_FTS_TABLE} (rowid, sku, brand) VALUES (:id, :sku, :brand)"),
+                values
+            )
+        else:
+            document, params = self._tsvector(product)
+            self.db.execute(
+                text(f"UPDATE product_search SET document = {document} WHERE id = :id"),
+                {"id": entry.id, **params}
+            )
+
+    def index_products(self, products: List[ProductSheet]):
+        """
+        Write the search documents of many products (not committed).
+
+        Entries are created in one batch and, on SQLite, the FTS rows are
+        replaced with one DELETE and one executemany INSERT.
+
+        Args:
+            products: ProductSheet instances (may be transient)
+        """
+        if not self.available or not products:
+            return
+
+        skus = [product.sku for product in products]
+        now = datetime.utcnow()
+        entry_ids = select(ProductSearchEntry.sku, ProductSearchEntry.id).where(ProductSearchEntry.sku.in_(skus))
+        ids = dict(self.db.execute(entry_ids).all())
+
+        new_entries = [{"sku": sku, "indexed_date": now} for sku in skus if sku not in ids]
+        if new_entries:
+            self.db.execute(insert(ProductSearchEntry), new_entries)
+            ids = dict(self.db.execute(entry_ids).all())
+        self.db.execute(
+            update(ProductSearchEntry).where(ProductSearchEntry.sku.in_(skus)).values(indexed_date=now)
+        )
+
+        if self.dialect == "sqlite":
+            rowids = ', '.join(str(ids[sku]) for sku in skus)
+            for table in (self.FTS_TABLE, self.IDS_FTS_TABLE):
+                self.db.execute(text(f"DELETE FROM {table} WHERE rowid IN ({rowids})"))
+            values = [{"id": ids[product.sku], **self._fts_values(product)} for product in products]
+            self.db.execute(
+                text(
+                    f"INSERT INTO {self.FTS_TABLE} (rowid, sku, eans, brand, title, description, inci) "
+                    "VALUES (:id, :sku, :eans, :brand, :title, :description, :inci)"
+                ),
+                values
+            )
+            self.db.execute(
+                text(f"INSERT INTO {self.IDS_FTS_TABLE} (rowid, sku, brand) VALUES (:id, :sku, :brand)"),
+                values
+            )
+        else:
+            for product in products:
+                document, params = self._tsvector(product)
+                self.db.execute(
+                    text(f"UPDATE product_search SET document = {document} WHERE id = :id"),
+                    {"id": ids[product.sku], **params}
+                )
+
+    def remove_product(self, sku: str):
+        """
+        Delete the search document of a product (not committed).
+
+        Args:
+            sku: Product SKU
+        """
+        if not self.available:
+            return
+
+        if self.dialect == "sqlite":
+            for table in (self.FTS_TABLE, self.IDS_FTS_TABLE):
+                self.db.execute(
+                    text(f"DELETE FROM {table} WHERE rowid IN (SELECT id FROM product_search WHERE sku = :sku)"),
+                    {"sku": sku}
+                )
+        self.db.execute(delete(ProductSearchEntry).where(ProductSearchEntry.sku == sku))
+
+    def sync(self, chunk_size: int = 500) -> int:
+        """
+        Index products that are missing or changed since they were indexed,
+        and drop entries of deleted products.
+
+        Args:
+            chunk_size: Products per chunk
+
+        Returns:
+            Number of products (re)indexed
+        """
+        if not self.available:
+            return 0
+
+        # Entries of products deleted outside ProductSheetManager
+        orphaned = ~exists().where(ProductSheet.sku == ProductSearchEntry.sku)
+        self.db.execute(delete(ProductSearchEntry).where(orphaned).execution_options(synchronize_session=False))
+        if self.dialect == "sqlite":
+            for table in (self.FTS_TABLE, self.IDS_FTS_TABLE):
+                self.db.execute(text(f"DELETE FROM {table} WHERE rowid NOT IN (SELECT id FROM product_search)"))
+        self.db.commit()
+
+        is_current = exists().where(
+            ProductSearchEntry.sku == ProductSheet.sku,
+            or_(ProductSheet.updated_date.is_(None), ProductSearchEntry.indexed_date >= ProductSheet.updated_date)
+        )
+        columns = [getattr(ProductSheet, field) for field in SEARCH_FIELDS if field != "sku"]
+        query = self.db.query(ProductSheet).options(load_only(ProductSheet.sku, *columns)).filter(~is_current)
+        last_sku = None
+        total = 0
+
+        while True:
+            chunk_query = query.filter(ProductSheet.sku > last_sku) if last_sku is not None else query
+            chunk = chunk_query.order_by(ProductSheet.sku).limit(chunk_size).all()
+
+            if not chunk:
+                break
+
+            last_sku = chunk[-1].sku
+            for product in chunk:
+                self.index_product(product)
+
+            self.db.commit()
+            self.db.expunge_all()
+
+            total += len(chunk)
+
+        return total
+
+    def _fts_values(self, product: ProductSheet) -> Dict[str, str]:
+        """Column values of the SQLite FTS row of a product."""
+        return {
+            "sku": product.sku,
+            "eans": " ".join(str(ean) for ean in product.ean_list or []),
+            "brand": product.brand or "",
+            "title": " ".join(self._texts(product.title_short).values()),
+            "description": " ".join(self._texts(product.description_detailed).values()),
+            "inci": product.inci_ingredients or "",
+        }
+
+    def _tsvector(self, product: ProductSheet):
+        """Build the weighted PostgreSQL tsvector expression and its parameters."""
+        params = {
+            "ids": " ".join([product.sku, *(str(ean) for ean in product.ean_list or []), product.brand or ""]),
+            "inci": product.inci_ingredients or "",
+        }
+        parts = ["setweight(to_tsvector('simple', :ids), 'A')"]
+
+        for field, weight in (("title_short", "B"), ("description_detailed", "C")):
+            by_config: Dict[str, List[str]] = {}
+            for lang, value in self._texts(getattr(product, field)).items():
+                by_config.setdefault(TEXT_SEARCH_CONFIGS.get(lang.lower(), "simple"), []).append(value)
+
+            for i, (config, values) in enumerate(sorted(by_config.items())):
+                param = f"{field}_{i}"
+                params[param] = " ".join(values)
+                parts.append(f"setweight(to_tsvector('{config}', :{param}), '{weight}')")
+
+        parts.append("setweight(to_tsvector('simple', :inci), 'D')")
+
+        return " || ".join(parts), params
+
+    @staticmethod
+    def _stem(term: str) -> str:
+        """
+        Light stemming for FTS5 (no per-language stemmers in SQLite).
+
+        Drops the plural/gender ending of words of 5+ letters so the prefix
+        query also matches other inflections ("cremas" -> "crem*" matches
+        crema, creme, cremas).
+        """
+        if len(term) < 5 or not term.isalpha():
+            return term
+        return _SUFFIX_RE.sub("", term, count=1) or term
+
+    @staticmethod
+    def _texts(value) -> Dict[str, str]:
+        """Multilingual JSON field -> {lang: text} (non-text values skipped)."""
+        if isinstance(value, dict):
+            return {str(lang): v for lang, v in value.items() if isinstance(v, str) and v.strip()}
+        if isinstance(value, str) and value.strip():
+            return {"": value}
+        return {}
+
+    @classmethod
+    def start_background_sync(cls, session_factory) -> threading.Thread:
+        """
+        Run sync() in a daemon thread with its own session.
+
+        Args:
+            session_factory: Callable returning a new database session
+
+        Returns:
+            The started thread
+        """
+        def run():
+            db = session_factory()
+            try:
+                indexed = cls(db).sync()
+                if indexed:
+                    print(f"Search index synced: {indexed} products")
+            except Exception as e:
+                print(f"Error syncing search index: {e}")
+            finally:
+                db.close()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
@@ -1,17 +1,78 @@
 """Product Sheet Manager - Business logic for product CRUD operations."""
-from typing import List, Dict, Optional, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from models.product_sheet import ProductSheet
+import base64
+import json
+import threading
+import time
+from collections import Counter
+from typing import List, Dict, Optional, Any, Iterator, Tuple
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import or_, and_, select, tuple_, insert, update, bindparam
+from models.product_sheet import ProductSheet, ProductCompliance
+from core.compliance_status_manager import ComplianceStatusManager
+from core.product_search_index import ProductSearchIndex, like_pattern
+from core.ean_index import EanIndex
+from core.product_completion import ProductCompletion
+from core.catalog_counters import CatalogCounters
 from datetime import datetime
 
 
+# All product columns (valid names for `fields` projections); completion_fields is internal
+PRODUCT_FIELDS = tuple(key for key in ProductSheet.__table__.columns.keys() if key != "completion_fields")
+
+# Compact shape for list views: no heavy JSON columns
+LIST_VIEW_FIELDS = (
+    "sku", "brand", "family", "status", "title_short",
+    "current_version", "completion_percentage", "updated_date",
+)
+
+# Columns bulk items cannot set (audit / computed)
+BULK_READ_ONLY_FIELDS = (
+    "created_date", "created_by", "updated_date", "updated_by",
+    "current_version", "completion_percentage",
+)
+
+# Columns a new product must set (NOT NULL without default)
+BULK_REQUIRED_FIELDS = tuple(
+    column.key for column in ProductSheet.__table__.columns
+    if not column.nullable and column.default is None and column.key not in BULK_READ_ONLY_FIELDS
+)
+
+# Columns kept on conflict when a bulk item updates an existing product
+BULK_INSERT_ONLY_FIELDS = ("sku", "created_date", "created_by")
+
+# Accepted Python types per column type for bulk items
+BULK_VALUE_TYPES = {
+    "String": str,
+    "Text": str,
+    "Integer": int,
+    "Float": (int, float),
+    "Boolean": bool,
+    "JSON": (dict, list),
+    "CompressedJSON": (dict, list),
+}
+
+# Sort fields usable with cursors: non-null and indexed together with sku
+CURSOR_SORT_FIELDS = ("created_date", "updated_date", "completion_percentage", "sku")
+
+# Cached list totals per filter combination: {key: (expires_at, total)}
+_count_cache: Dict[str, Tuple[float, int]] = {}
+_count_cache_lock = threading.Lock()
+
+
 class ProductSheetManager:
     """Manager for product sheet operations."""
     
+    # Seconds a cached total is reused (writes in this process clear it)
+    COUNT_CACHE_TTL = 30
+    
     def __init__(self, db: Session):
         """Initialize manager with database session."""
         self.db = db
+        self.compliance = ComplianceStatusManager(db)
+        self.search_index = ProductSearchIndex(db)
+        self.ean_index = EanIndex(db)
+        self.completion = ProductCompletion(db)
+        self.counters = CatalogCounters(db)
     
     def create_sheet(self, data: Dict[str, Any], created_by: Optional[str] = None) -> ProductSheet:
         """
@@ -23,9 +84,11 @@ class ProductSheetManager:
             
         Returns:
             Created ProductSheet instance
+            
+        Raises:
+            ValueError: If an EAN is already assigned to another product
         """
-        # Calculate completion percentage
-        completion = self._calculate_completion(data)
+        self.ean_index.check_available(data.get('sku'), data.get('ean_list', []))
         
         # Create product sheet
         product = ProductSheet(
@@ -78,14 +141,20 @@ class ProductSheetManager:
             product_images=data.get('product_images', []),
             current_version="1.0",
             status=data.get('status', 'draft'),
-            completion_percentage=completion,
             created_by=created_by,
             updated_by=created_by,
         )
         
+        self.completion.apply(product)
+        
         self.db.add(product)
+        self.counters.apply([], self.counters.product_keys(product))
+        self.ean_index.set_product_eans(product.sku, product.ean_list)
+        self.compliance.refresh_product(product)
+        self.search_index.index_product(product)
         self.db.commit()
         self.db.refresh(product)
+        self.invalidate_counts()
         
         return product
     
@@ -101,6 +170,21 @@ class ProductSheetManager:
         """
         return self.db.query(ProductSheet).filter(ProductSheet.sku == sku).first()
     
+    def get_row(self, sku: str, columns: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get product data by SKU as a plain dict (read-only, no ORM object).
+        
+        Args:
+            sku: Product SKU
+            columns: Only these columns (default: all)
+            
+        Returns:
+            Dictionary {column: value} or None
+        """
+        row = self._query(columns, as_rows=True).filter(ProductSheet.sku == sku).first()
+        
+        return self._rows([row], columns, True)[0] if row else None
+    
     def update_sheet(
         self,
         sku: str,
@@ -117,24 +201,50 @@ class ProductSheetManager:
             
         Returns:
             Updated ProductSheet instance or None
+            
+        Raises:
+            ValueError: If an EAN is already assigned to another product
         """
         product = self.get_sheet(sku)
         if not product:
             return None
         
+        if 'ean_list' in data:
+            self.ean_index.check_available(sku, data['ean_list'])
+        
+        old_counter_keys = self.counters.product_keys(product)
+        
         # Update fields
+        changed_fields = []
         for key, value in data.items():
             if hasattr(product, key) and key not in ['sku', 'created_date', 'created_by']:
+                if getattr(product, key) != value:
+                    changed_fields.append(key)
                 setattr(product, key, value)
         
-        # Recalculate completion
-        product.completion_percentage = self._calculate_completion(data)
+        if 'ean_list' in changed_fields:
+            self.ean_index.set_product_eans(sku, product.ean_list)
+        
+        # Revalidate only countries whose rules reference a changed field
+        affected_countries = self.compliance.affected_countries(changed_fields)
+        if affected_countries:
+            self.compliance.refresh_product(product, affected_countries)
+        
+        # Update completion bits of the changed fields only
+        self.completion.apply(product, changed_fields)
+        self.counters.apply(old_counter_keys, self.counters.product_keys(product))
         product.updated_by = updated_by
         product.updated_date = datetime.utcnow()
         
+        if self.search_index.affects(changed_fields):
+            self.search_index.index_product(product)
+        
         self.db.commit()
         self.db.refresh(product)
         
+        if changed_fields:
+            self.invalidate_counts()
+        
         return product
     
     def delete_sheet(self, sku: str) -> bool:
@@ -151,11 +261,300 @@ class ProductSheetManager:
         if not product:
             return False
         
+        self.counters.apply(self.counters.product_keys(product), [])
         self.db.delete(product)
+        self.compliance.remove_product(sku)
+        self.search_index.remove_product(sku)
+        self.ean_index.remove_product(sku)
         self.db.commit()
+        self.invalidate_counts()
         
         return True
     
+    def bulk_upsert(
+        self,
+        items: List[Dict[str, Any]],
+        updated_by: Optional[str] = None,
+        chunk_size: int = 500,
+    ) -> Dict[str, Any]:
+        """
+        Create or update many product sheets.
+        
+        Every item is validated before anything is written; invalid items are
+        reported and skipped. Valid items are written with one batched
+        INSERT ... ON CONFLICT (SKU) DO UPDATE per chunk (executemany
+        elsewhere), along with their EAN, compliance and search index rows,
+        and each chunk is committed.
+        
+        Items hold a SKU plus the columns to set; columns not given keep
+        their current value (or the default for new products).
+        
+        Args:
+            items: Product data dictionaries
+            updated_by: Username of creator/updater
+            chunk_size: Products per batch and transaction
+            
+        Returns:
+            Dictionary with summary counts {created, updated, unchanged, errors}
+            and per-item results [{index, sku, status, error?}] (status is
+            created, updated, unchanged or error)
+        """
+        results: List[Dict[str, Any]] = [{"index": i, "sku": None, "status": None} for i in range(len(items))]
+        valid: List[int] = []
+        seen: Dict[str, int] = {}
+        
+        for i, item in enumerate(items):
+            error = self._validate_bulk_item(item)
+            if error is None and item['sku'] in seen:
+                error = f"Duplicate SKU in request (item {seen[item['sku']]})"
+            
+            if isinstance(item, dict):
+                results[i]["sku"] = item.get('sku')
+            
+            if error:
+                results[i].update(status="error", error=error)
+            else:
+                seen[item['sku']] = i
+                valid.append(i)
+        
+        # New products must set every required column without a default
+        existing = set()
+        for start in range(0, len(valid), chunk_size):
+            skus = [items[i]['sku'] for i in valid[start:start + chunk_size]]
+            existing.update(sku for (sku,) in self.db.query(ProductSheet.sku).filter(ProductSheet.sku.in_(skus)))
+        
+        for i in list(valid):
+            if items[i]['sku'] not in existing:
+                missing = [field for field in BULK_REQUIRED_FIELDS if items[i].get(field) is None]
+                if missing:
+                    results[i].update(status="error", error=f"Required for new products: {', '.join(missing)}")
+                    valid.remove(i)
+        
+        # EANs: must not belong to another product nor to another item
+        ean_owners = self.ean_index.resolve_many(
+            ean for i in valid if 'ean_list' in items[i] for ean in items[i]['ean_list']
+        )
+        claimed: Dict[str, str] = {}
+        for i in list(valid):
+            sku = items[i]['sku']
+            conflicts = []
+            for ean in EanIndex.normalize(items[i].get('ean_list')):
+                owner = claimed.setdefault(ean, ean_owners.get(ean, sku))
+                if owner != sku:
+                    conflicts.append(f"{ean} ({owner})")
+            if conflicts:
+                results[i].update(status="error", error=f"EAN already assigned to another product: {', '.join(conflicts)}")
+                valid.remove(i)
+        
+        for start in range(0, len(valid), chunk_size):
+            self._bulk_upsert_chunk(items, valid[start:start + chunk_size], results, updated_by)
+        
+        if any(result["status"] in ("created", "updated") for result in results):
+            self.invalidate_counts()
+        
+        summary = {"created": 0, "updated": 0, "unchanged": 0, "errors": 0}
+        for result in results:
+            summary["errors" if result["status"] == "error" else result["status"]] += 1
+        
+        return {"summary": summary, "results": results}
+    
+    def _bulk_upsert_chunk(
+        self,
+        items: List[Dict[str, Any]],
+        indexes: List[int],
+        results: List[Dict[str, Any]],
+        updated_by: Optional[str],
+    ):
+        """Write one chunk of validated items and commit it."""
+        skus = [items[i]['sku'] for i in indexes]
+        existing = {row['sku']: row for row in self._rows(
+            self._query(None, as_rows=True).filter(ProductSheet.sku.in_(skus)).all(), None, True
+        )}
+        
+        now = datetime.utcnow()
+        rows, changes = [], []
+        
+        for i in indexes:
+            item = items[i]
+            current = existing.get(item['sku'])
+            
+            if current is None:
+                row = self._default_row()
+                row.update(item)
+                row.update(created_date=now, created_by=updated_by)
+                changed_fields = list(row)
+                status = "created"
+            else:
+                changed_fields = [key for key, value in item.items() if current.get(key) != value]
+                if not changed_fields:
+                    results[i]["status"] = "unchanged"
+                    continue
+                row = {**current, **item}
+                status = "updated"
+            
+            row.update(updated_date=now, updated_by=updated_by)
+            rows.append(row)
+            changes.append((i, status, changed_fields))
+        
+        if not rows:
+            return
+        
+        for row, bits in zip(rows, ProductCompletion.bits_many(rows)):
+            row.update(completion_fields=bits, completion_percentage=ProductCompletion.percentage(bits))
+        
+        try:
+            self._upsert_rows(rows, created=[status == "created" for _, status, _ in changes])
+            
+            # Side indexes, batched per chunk
+            self.ean_index.set_many({
+                row['sku']: row['ean_list']
+                for row, (_, _, changed_fields) in zip(rows, changes) if 'ean_list' in changed_fields
+            })
+            
+            refresh = [
+                (row, None if status == "created" else self.compliance.affected_countries(changed_fields))
+                for row, (_, status, changed_fields) in zip(rows, changes)
+            ]
+            refresh = [(row, countries) for row, countries in refresh if countries is None or countries]
+            self.compliance.refresh_products([row for row, _ in refresh], [countries for _, countries in refresh])
+            
+            counter_deltas = Counter()
+            for row in rows:
+                counter_deltas.update(self.counters.keys(row))
+                counter_deltas.subtract(self.counters.keys(existing.get(row['sku'])))
+            self.counters.apply_deltas(counter_deltas)
+            
+            # Transient instances (never added to the session)
+            self.search_index.index_products([
+                ProductSheet(**row)
+                for row, (_, _, changed_fields) in zip(rows, changes) if self.search_index.affects(changed_fields)
+            ])
+            
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            print(f"Error in bulk upsert chunk: {e}")
+            for i, _, _ in changes:
+                results[i].update(status="error", error=str(getattr(e, 'orig', e)))
+            return
+        
+        for i, status, _ in changes:
+            results[i]["status"] = status
+    
+    def _upsert_rows(self, rows: List[Dict[str, Any]], created: List[bool]):
+        """Batched INSERT ... ON CONFLICT DO UPDATE (executemany insert/update elsewhere)."""
+        table = ProductSheet.__table__
+        update_columns = [c.key for c in table.columns if c.key not in BULK_INSERT_ONLY_FIELDS]
+        dialect = self.db.get_bind().dialect.name
+        
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            
+            stmt = dialect_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.sku],
+                set_={column: stmt.excluded[column] for column in update_columns}
+            )
+            self.db.execute(stmt, rows)
+            return
+        
+        new_rows = [row for row, is_new in zip(rows, created) if is_new]
+        updated_rows = [
+            {**{column: row[column] for column in update_columns}, 'b_sku': row['sku']}
+            for row, is_new in zip(rows, created) if not is_new
+        ]
+        
+        if new_rows:
+            self.db.execute(insert(table), new_rows)
+        if updated_rows:
+            self.db.execute(
+                update(table).where(table.c.sku == bindparam('b_sku')),
+                updated_rows
+            )
+    
+    @staticmethod
+    def _default_row() -> Dict[str, Any]:
+        """Column values of a new product before applying the item (column defaults)."""
+        row = {}
+        
+        for column in ProductSheet.__table__.columns:
+            default = column.default
+            if default is None:
+                row[column.key] = None
+            elif default.is_callable:
+                row[column.key] = default.arg(None)
+            else:
+                row[column.key] = default.arg
+        
+        return row
+    
+    @staticmethod
+    def _validate_bulk_item(item: Any) -> Optional[str]:
+        """
+        Validate one bulk item against the products table.
+        
+        Returns:
+            Error message or None if valid
+        """
+        if not isinstance(item, dict):
+            return "Item must be an object"
+        
+        sku = item.get('sku')
+        if not isinstance(sku, str) or not sku.strip():
+            return "sku is required"
+        
+        unknown = [key for key in item if key not in PRODUCT_FIELDS or key in BULK_READ_ONLY_FIELDS]
+        if unknown:
+            return f"Unknown or read-only fields: {', '.join(unknown)}"
+        
+        columns = ProductSheet.__table__.columns
+        for key, value in item.items():
+            column = columns[key]
+            
+            if value is None:
+                if not column.nullable:
+                    return f"{key} cannot be null"
+                continue
+            
+            python_type = BULK_VALUE_TYPES.get(type(column.type).__name__)
+            if python_type and (not isinstance(value, python_type) or isinstance(value, bool) and python_type != bool):
+                return f"{key}: invalid type {type(value).__name__}"
+            
+            length = getattr(column.type, 'length', None)
+            if length and isinstance(value, str) and len(value) > length:
+                return f"{key}: longer than {length} characters"
+        
+        return None
+    
+    def get_sheet_by_ean(self, ean: str) -> Optional[ProductSheet]:
+        """
+        Get product sheet by EAN.
+        
+        Args:
+            ean: Barcode
+            
+        Returns:
+            ProductSheet instance or None
+        """
+        sku = self.ean_index.resolve(ean)
+        
+        return self.get_sheet(sku) if sku else None
+    
+    def resolve_eans(self, eans: List[str]) -> Dict[str, str]:
+        """
+        Resolve several EANs to SKUs.
+        
+        Args:
+            eans: Barcodes
+            
+        Returns:
+            Dictionary {ean: sku} with the EANs found
+        """
+        return self.ean_index.resolve_many(eans)
+    
     def list_sheets(
         self,
         filters: Optional[Dict[str, Any]] = None,
@@ -163,128 +562,422 @@ class ProductSheetManager:
         per_page: int = 30,
         sort_by: str = "created_date",
         sort_desc: bool = True,
-    ) -> tuple[List[ProductSheet], int]:
+        with_total: bool = True,
+        columns: Optional[List[str]] = None,
+        as_rows: bool = False,
+    ) -> tuple[List[Any], Optional[int]]:
         """
         List product sheets with filters and pagination.
         
+        Offset pagination: deep pages get slower, prefer list_sheets_cursor.
+        
         Args:
             filters: Dictionary of filters (family, brand, status, etc.)
             page: Page number (1-indexed)
             per_page: Results per page
             sort_by: Field to sort by
             sort_desc: Sort descending if True
+            with_total: Include the total count (cached, see count_sheets_cached)
+            columns: Only load these columns (see resolve_fields)
+            as_rows: Return plain dicts built from result tuples instead of
+                ProductSheet instances (read-only endpoints)
             
         Returns:
-            Tuple of (list of products, total count)
+            Tuple of (list of products, total count or None)
         """
-        query = self.db.query(ProductSheet)
-        
-        # Apply filters
-        if filters:
-            if 'family' in filters and filters['family']:
-                query = query.filter(ProductSheet.family == filters['family'])
-            
-            if 'brand' in filters and filters['brand']:
-                query = query.filter(ProductSheet.brand.ilike(f"%{filters['brand']}%"))
-            
-            if 'status' in filters and filters['status']:
-                query = query.filter(ProductSheet.status == filters['status'])
-            
-            if 'language' in filters and filters['language']:
-                # Filter products that have content in specified language
-                lang = filters['language']
-                query = query.filter(
-                    or_(
-                        ProductSheet.title_short[lang].isnot(None),
-                        ProductSheet.packaging_languages.contains([lang])
-                    )
-                )
+        query = self._apply_filters(self._query(columns, as_rows), filters)
         
         # Get total count
-        total = query.count()
+        total = self.count_sheets_cached(filters) if with_total else None
         
-        # Apply sorting
+        # Apply sorting (sku as tie-breaker keeps pages stable)
         if hasattr(ProductSheet, sort_by):
             sort_field = getattr(ProductSheet, sort_by)
             if sort_desc:
-                query = query.order_by(sort_field.desc())
+                query = query.order_by(sort_field.desc(), ProductSheet.sku.desc())
             else:
-                query = query.order_by(sort_field.asc())
+                query = query.order_by(sort_field.asc(), ProductSheet.sku.asc())
         
         # Apply pagination
         offset = (page - 1) * per_page
         query = query.offset(offset).limit(per_page)
         
-        products = query.all()
+        products = self._rows(query.all(), columns, as_rows)
         
         return products, total
     
-    def search_sheets(self, query_str: str) -> List[ProductSheet]:
+    def list_sheets_cursor(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        cursor: Optional[str] = None,
+        per_page: int = 30,
+        sort_by: str = "created_date",
+        sort_desc: bool = True,
+        columns: Optional[List[str]] = None,
+        as_rows: bool = False,
+    ) -> tuple[List[Any], Optional[str]]:
+        """
+        List product sheets with keyset (cursor) pagination.
+        
+        Each page seeks on the (sort field, sku) index, so its cost does
+        not depend on how deep it is.
+        
+        Args:
+            filters: Dictionary of filters (same as list_sheets)
+            cursor: Opaque cursor from the previous page (None for the first)
+            per_page: Results per page
+            sort_by: One of CURSOR_SORT_FIELDS
+            sort_desc: Sort descending if True
+            columns: Only load these columns (see resolve_fields)
+            as_rows: Return plain dicts instead of ProductSheet instances
+            
+        Returns:
+            Tuple of (list of products, cursor of the next page or None)
+            
+        Raises:
+            ValueError: If the sort field or the cursor is not valid
+        """
+        if sort_by not in CURSOR_SORT_FIELDS:
+            raise ValueError(f"Cursor pagination supports sort_by in {', '.join(CURSOR_SORT_FIELDS)}")
+        
+        sort_field = getattr(ProductSheet, sort_by)
+        query = self._apply_filters(self._query(columns, as_rows, extra=(sort_by,)), filters)
+        
+        if cursor:
+            last_value, last_sku = self._decode_cursor(cursor, sort_by, sort_desc)
+            if sort_by == "sku":
+                position = ProductSheet.sku < last_sku if sort_desc else ProductSheet.sku > last_sku
+            else:
+                key = tuple_(sort_field, ProductSheet.sku)
+                position = key < (last_value, last_sku) if sort_desc else key > (last_value, last_sku)
+            query = query.filter(position)
+        
+        if sort_by == "sku":
+            order = [ProductSheet.sku.desc() if sort_desc else ProductSheet.sku.asc()]
+        elif sort_desc:
+            order = [sort_field.desc(), ProductSheet.sku.desc()]
+        else:
+            order = [sort_field.asc(), ProductSheet.sku.asc()]
+        
+        # One extra row tells whether there is a next page
+        products = query.order_by(*order).limit(per_page + 1).all()
+        
+        next_cursor = None
+        if len(products) > per_page:
+            products = products[:per_page]
+            last = products[-1]
+            next_cursor = self._encode_cursor(sort_by, sort_desc, getattr(last, sort_by), last.sku)
+        
+        return self._rows(products, columns, as_rows), next_cursor
+    
+    def count_sheets_cached(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Count product sheets matching filters, cached per filter combination.
+        
+        The total may be up to COUNT_CACHE_TTL seconds old for writes made
+        by other processes.
+        
+        Args:
+            filters: Dictionary of filters (same as list_sheets)
+            
+        Returns:
+            Number of matching products
+        """
+        key = json.dumps(filters or {}, sort_keys=True, default=str)
+        now = time.monotonic()
+        
+        with _count_cache_lock:
+            cached = _count_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+        
+        total = self.count_sheets(filters)
+        
+        with _count_cache_lock:
+            _count_cache[key] = (now + self.COUNT_CACHE_TTL, total)
+        
+        return total
+    
+    @staticmethod
+    def invalidate_counts():
+        """Clear cached list totals and dashboard aggregates (after writes)."""
+        with _count_cache_lock:
+            _count_cache.clear()
+        CatalogCounters.invalidate()
+    
+    @staticmethod
+    def _encode_cursor(sort_by: str, sort_desc: bool, value: Any, sku: str) -> str:
+        """Build an opaque cursor pointing after (value, sku)."""
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        
+        payload = json.dumps({"s": sort_by, "d": sort_desc, "v": value, "k": sku}, separators=(",", ":"))
+        
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+    
+    @staticmethod
+    def _decode_cursor(cursor: str, sort_by: str, sort_desc: bool) -> Tuple[Any, str]:
+        """Decode a cursor into (value, sku), checking it matches the requested order."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            value, sku = payload["v"], payload["k"]
+            matches = payload["s"] == sort_by and payload["d"] == sort_desc
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Invalid cursor")
+        
+        if not matches:
+            raise ValueError("Cursor does not match sort_by/sort_desc")
+        
+        if sort_by in ("created_date", "updated_date"):
+            try:
+                value = datetime.fromisoformat(value)
+            except (ValueError, TypeError):
+                raise ValueError("Invalid cursor")
+        
+        return value, sku
+    
+    def iter_sheets(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        skus: Optional[List[str]] = None,
+        chunk_size: int = 200,
+        columns: Optional[List[str]] = None,
+    ) -> Iterator[List[ProductSheet]]:
         """
-        Search product sheets by SKU, EAN, or title.
+        Iterate over product sheets in keyset-paginated chunks ordered by SKU.
+        
+        Each chunk is detached from the session before the next one is loaded,
+        so memory stays bounded by chunk_size regardless of catalog size.
+        
+        Args:
+            filters: Dictionary of filters (same as list_sheets)
+            skus: Restrict to these SKUs (optional)
+            chunk_size: Products per chunk
+            columns: Only load these columns (SKU is always loaded)
+            
+        Yields:
+            Lists of ProductSheet instances
+        """
+        query = self._apply_filters(self._query(columns), filters)
+        
+        if skus is not None:
+            query = query.filter(ProductSheet.sku.in_(skus))
+        
+        query = query.order_by(ProductSheet.sku)
+        last_sku = None
+        
+        while True:
+            chunk_query = query.filter(ProductSheet.sku > last_sku) if last_sku is not None else query
+            chunk = chunk_query.limit(chunk_size).all()
+            
+            if not chunk:
+                break
+            
+            last_sku = chunk[-1].sku
+            yield chunk
+            
+            self.db.expunge_all()
+            
+            if len(chunk) < chunk_size:
+                break
+    
+    def count_sheets(self, filters: Optional[Dict[str, Any]] = None, skus: Optional[List[str]] = None) -> int:
+        """
+        Count product sheets matching filters.
+        
+        Args:
+            filters: Dictionary of filters (same as list_sheets)
+            skus: Restrict to these SKUs (optional)
+            
+        Returns:
+            Number of matching products
+        """
+        query = self._apply_filters(self.db.query(ProductSheet), filters)
+        
+        if skus is not None:
+            query = query.filter(ProductSheet.sku.in_(skus))
+        
+        return query.count()
+    
+    def search_sheets(
+        self,
+        query_str: str,
+        limit: int = 50,
+        columns: Optional[List[str]] = None,
+        as_rows: bool = False,
+    ) -> List[Any]:
+        """
+        Search product sheets by SKU, EAN, brand, title, description or INCI.
+        
+        Uses the full-text index (ranked by relevance, then SKU / brand
+        fragment matches); databases without full-text support fall back to
+        substring matching on SKU and brand.
         
         Args:
             query_str: Search query
+            limit: Maximum results
+            columns: Only load these columns (see resolve_fields)
+            as_rows: Return plain dicts instead of ProductSheet instances
             
         Returns:
-            List of matching products
-        """
-        # Search in SKU, EAN list, and titles
-        results = self.db.query(ProductSheet).filter(
-            or_(
-                ProductSheet.sku.ilike(f"%{query_str}%"),
-                ProductSheet.brand.ilike(f"%{query_str}%"),
-                ProductSheet.ean_list.contains([query_str])
-            )
-        ).limit(50).all()
+            List of matching products, best matches first
+        """
+        # Scanned barcodes: exact EAN lookup first
+        ean = query_str.strip()
+        if ean.isdigit():
+            owner = self.ean_index.resolve(ean)
+            product = self._query(columns, as_rows).filter(ProductSheet.sku == owner).first() if owner else None
+            if product:
+                return self._rows([product], columns, as_rows)
+        
+        skus = self.search_index.search(query_str, limit)
+        
+        if skus is None:
+            pattern = like_pattern(query_str)
+            return self._rows(self._query(columns, as_rows).filter(
+                or_(
+                    ProductSheet.sku.ilike(pattern, escape="\\"),
+                    ProductSheet.brand.ilike(pattern, escape="\\"),
+                    ProductSheet.ean_list.contains([query_str])
+                )
+            ).limit(limit).all(), columns, as_rows)
         
-        return results
+        if not skus:
+            return []
+        
+        products = {p.sku: p for p in self._query(columns, as_rows).filter(ProductSheet.sku.in_(skus))}
+        
+        return self._rows([products[sku] for sku in skus if sku in products], columns, as_rows)
     
-    def _calculate_completion(self, data: Dict[str, Any]) -> int:
+    @staticmethod
+    def resolve_fields(fields: Optional[str], default: Optional[tuple] = LIST_VIEW_FIELDS) -> Optional[List[str]]:
         """
-        Calculate completion percentage of a product sheet.
+        Parse a `fields` projection parameter.
         
         Args:
-            data: Product data dictionary
+            fields: Comma-separated column names, "list" (LIST_VIEW_FIELDS)
+                or "all" (every column); None uses `default`
+            default: Fields when none are requested (None = every column)
             
         Returns:
-            Completion percentage (0-100)
-        """
-        # Define required/important fields with weights
-        required_fields = {
-            'sku': 5,
-            'family': 5,
-            'title_short': 10,
-            'brand': 5,
-            'inci_ingredients': 10,
-            'mode_of_use': 10,
-            'general_warnings': 10,
-            'made_in': 5,
-            'distributor': 5,
-            'packaging_languages': 5,
-            'net_weight_value': 5,
-            'format_type': 5,
-            'pao': 5,
-            'allergens_present': 5,
-            'product_images': 5,
-            'description_detailed': 10,
-        }
-        
-        total_weight = sum(required_fields.values())
-        current_weight = 0
-        
-        for field, weight in required_fields.items():
-            value = data.get(field)
-            
-            # Check if field has value
-            if value:
-                if isinstance(value, (dict, list)):
-                    if len(value) > 0:
-                        current_weight += weight
-                elif isinstance(value, str):
-                    if value.strip():
-                        current_weight += weight
-                else:
-                    current_weight += weight
-        
-        return int((current_weight / total_weight) * 100)
+            Column names to load and serialize, or None for every column
+            
+        Raises:
+            ValueError: If a field is not a product column
+        """
+        if fields is None or not fields.strip():
+            return list(default) if default is not None else None
+        
+        if fields.strip() == "all":
+            return None
+        
+        if fields.strip() == "list":
+            return list(LIST_VIEW_FIELDS)
+        
+        requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [f for f in requested if f not in PRODUCT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        
+        return requested
+    
+    def _query(self, columns: Optional[List[str]] = None, as_rows: bool = False, extra: tuple = ()):
+        """
+        Query over ProductSheet loading only `columns` (None = all).
+        
+        SKU and `extra` columns are always loaded. With as_rows the query
+        selects plain column tuples (requested columns first) instead of
+        ORM entities.
+        """
+        if as_rows:
+            names = list(columns or PRODUCT_FIELDS)
+            names += [name for name in ('sku', *extra) if name not in names]
+            return self.db.query(*[getattr(ProductSheet, name) for name in names])
+        
+        query = self.db.query(ProductSheet)
+        
+        if columns:
+            attributes = [getattr(ProductSheet, c) for c in [*columns, *extra] if c != 'sku' and hasattr(ProductSheet, c)]
+            query = query.options(load_only(ProductSheet.sku, *attributes))
+        
+        return query
+    
+    @staticmethod
+    def _rows(results: List[Any], columns: Optional[List[str]], as_rows: bool) -> List[Any]:
+        """Result tuples of an as_rows query -> dicts of the requested columns."""
+        if not as_rows:
+            return results
+        
+        names = columns or PRODUCT_FIELDS
+        
+        return [dict(zip(names, row)) for row in results]
+    
+    def _apply_filters(self, query, filters: Optional[Dict[str, Any]]):
+        """
+        Apply list filters to a query.
+        
+        Supported: family, brand, status, language, min_completion and
+        max_completion (completion_percentage) and the compliance filters
+        compliance_country, compliance_status (str or list), min_compliance
+        and max_compliance (percentage).
+        
+        Args:
+            query: SQLAlchemy query over ProductSheet
+            filters: Dictionary of filters
+            
+        Returns:
+            Filtered query
+        """
+        if not filters:
+            return query
+        
+        if 'family' in filters and filters['family']:
+            query = query.filter(ProductSheet.family == filters['family'])
+        
+        if 'brand' in filters and filters['brand']:
+            query = query.filter(ProductSheet.brand.ilike(f"%{filters['brand']}%"))
+        
+        if 'status' in filters and filters['status']:
+            query = query.filter(ProductSheet.status == filters['status'])
+        
+        if filters.get('min_completion') is not None:
+            query = query.filter(ProductSheet.completion_percentage >= filters['min_completion'])
+        
+        if filters.get('max_completion') is not None:
+            query = query.filter(ProductSheet.completion_percentage <= filters['max_completion'])
+        
+        # Compliance filters, served from the product_compliance index
+        compliance_conditions = []
+        
+        if filters.get('compliance_country'):
+            compliance_conditions.append(ProductCompliance.country == filters['compliance_country'].upper())
+        
+        if filters.get('compliance_status'):
+            statuses = filters['compliance_status']
+            if isinstance(statuses, str):
+                statuses = [statuses]
+            compliance_conditions.append(ProductCompliance.status.in_([s.upper() for s in statuses]))
+        
+        if filters.get('min_compliance') is not None:
+            compliance_conditions.append(ProductCompliance.percentage >= filters['min_compliance'])
+        
+        if filters.get('max_compliance') is not None:
+            compliance_conditions.append(ProductCompliance.percentage <= filters['max_compliance'])
+        
+        if compliance_conditions:
+            query = query.filter(
+                ProductSheet.sku.in_(select(ProductCompliance.sku).where(*compliance_conditions))
+            )
+        
+        if 'language' in filters and filters['language']:
+            # Filter products that have content in specified language
+            lang = filters['language']
+            query = query.filter(
+                or_(
+                    ProductSheet.title_short[lang].isnot(None),
+                    ProductSheet.packaging_languages.contains([lang])
+                )
+            )
+        
+        return query
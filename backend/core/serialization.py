@@ -0,0 +1,67 @@
+"""Serialization - Fast JSON encoding for API responses."""
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # Optional: stdlib json is used instead
+    orjson = None
+
+
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# orjson encodes naive datetimes like isoformat(); allow int keys like json does
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def _default(value: Any) -> Any:
+    """Encode values the stdlib encoder does not support."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Encode an object as compact UTF-8 JSON.
+
+    Uses orjson when installed, the stdlib encoder otherwise. Datetimes are
+    encoded as ISO 8601 strings by both.
+
+    Args:
+        obj: JSON-compatible object (dicts, lists, scalars, datetimes)
+
+    Returns:
+        Encoded bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def dumps_line(obj: Any) -> bytes:
+    """Encode an object as one NDJSON line."""
+    return dumps(obj) + b"\n"
+
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Build a pre-encoded JSON response.
+
+    Skips FastAPI's response_model validation and jsonable_encoder pass.
+
+    Args:
+        content: JSON-compatible object
+        status_code: HTTP status code
+        headers: Extra response headers
+
+    Returns:
+        Response with the encoded body
+    """
+    return Response(content=dumps(content), status_code=status_code, headers=headers, media_type=JSON_MEDIA_TYPE)
@@ -0,0 +1,304 @@
+"""Snapshot Blob Store - Content-addressed, deduplicated version snapshot payloads."""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Tuple
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.product_sheet import ProductVersion, SnapshotBlob
+
+
+# Audit fields that change on every snapshot: kept in the version row, not hashed
+VOLATILE_FIELDS = ("updated_date", "updated_by", "current_version")
+
+# Field values at least this large (JSON bytes) get their own blob, shared across products
+VALUE_BLOB_MIN_BYTES = 256
+
+# Reference to a value blob inside a state payload
+BLOB_REF = "$blob"
+
+# Blobs never change once written: hash -> payload, shared by every session
+_blob_cache: "OrderedDict[str, Any]" = OrderedDict()
+_blob_cache_lock = threading.Lock()
+_BLOB_CACHE_SIZE = 2048
+
+
+def _is_ref(value: Any) -> bool:
+    """Check if a payload value is a value blob reference."""
+    return isinstance(value, dict) and len(value) == 1 and BLOB_REF in value
+
+
+class SnapshotBlobStore:
+    """
+    Content-addressed store for version snapshots.
+
+    A snapshot minus VOLATILE_FIELDS is hashed (SHA-256 of its canonical
+    JSON: sorted keys, no whitespace) and stored once as a "state" blob, so
+    identical states across versions (e.g. after a restore) share one row.
+    Large field values (multilingual texts, preset-derived warnings) are
+    stored as "value" blobs referenced from states, so products sharing
+    them store them once.
+
+    Refcounts are updated in the caller's transaction (not committed); a
+    blob is deleted when its refcount drops to zero.
+    """
+
+    def __init__(self, db: Session):
+        """Initialize store with database session."""
+        self.db = db
+        # Payload bytes inserted / deleted through this instance
+        self.bytes_written = 0
+        self.bytes_freed = 0
+
+    @staticmethod
+    def canonical(value: Any) -> str:
+        """Canonical JSON of a value (hash input)."""
+        return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+    @staticmethod
+    def digest(canonical: str) -> str:
+        """SHA-256 hex digest of a canonical JSON string."""
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def split(snapshot: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Separate volatile audit fields from a snapshot.
+
+        Args:
+            snapshot: Complete snapshot
+
+        Returns:
+            Tuple (state without volatile fields, volatile fields)
+        """
+        state = {key: value for key, value in snapshot.items() if key not in VOLATILE_FIELDS}
+        volatile = {key: snapshot[key] for key in VOLATILE_FIELDS if key in snapshot}
+        return state, volatile
+
+    def state_hash(self, state: Dict[str, Any]) -> str:
+        """Hash a state would be stored under (nothing is written)."""
+        return self._encode(state)[0]
+
+    def put(self, state: Dict[str, Any]) -> str:
+        """
+        Store a state (or add a reference to the identical stored one).
+
+        Args:
+            state: Snapshot without volatile fields (see split)
+
+        Returns:
+            Hash of the state blob
+        """
+        state_hash, payload, values = self._encode(state)
+        
+        if self._add_reference(state_hash, "state", payload, len(json.dumps(state))):
+            # New state: reference its value blobs
+            for value_hash, value in values.items():
+                self._add_reference(value_hash, "value", value, len(json.dumps(value)))
+        
+        return state_hash
+    
+    def get(self, state_hash: str) -> Dict[str, Any]:
+        """
+        Load a state with its value blobs expanded.
+
+        Args:
+            state_hash: Hash returned by put()
+
+        Returns:
+            State dictionary (values are shared with the cache: do not modify)
+
+        Raises:
+            ValueError: If a blob is missing
+        """
+        payload = self._load([state_hash])[state_hash]
+        values = self._load({value[BLOB_REF] for value in payload.values() if _is_ref(value)})
+
+        return {
+            key: values[value[BLOB_REF]] if _is_ref(value) else value
+            for key, value in payload.items()
+        }
+
+    def release(self, state_hash: str):
+        """
+        Drop one reference to a state, deleting blobs no longer referenced.
+
+        Args:
+            state_hash: Hash returned by put()
+        """
+        self._release([state_hash])
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Storage and deduplication statistics.
+
+        Returns:
+            Dictionary with version counts by storage format, blob counts and
+            bytes, logical_bytes (what the blob-stored versions would take as
+            separate copies) and dedup_ratio (logical_bytes / stored_bytes)
+        """
+        by_format = {
+            snapshot_format or "full": count
+            for snapshot_format, count in self.db.execute(
+                select(ProductVersion.snapshot_format, func.count()).group_by(ProductVersion.snapshot_format)
+            )
+        }
+
+        blobs = {
+            kind: {"count": count, "bytes": int(size or 0)}
+            for kind, count, size in self.db.execute(
+                select(SnapshotBlob.kind, func.count(), func.sum(SnapshotBlob.size)).group_by(SnapshotBlob.kind)
+            )
+        }
+
+        blob_versions, logical_bytes = self.db.execute(
+            select(func.count(), func.sum(SnapshotBlob.logical_size))
+            .select_from(ProductVersion)
+            .join(SnapshotBlob, SnapshotBlob.hash == ProductVersion.blob_hash)
+        ).one()
+        logical_bytes = int(logical_bytes or 0)
+        stored_bytes = sum(kind["bytes"] for kind in blobs.values())
+
+        return {
+            "versions": by_format,
+            "blob_versions": blob_versions,
+            "state_blobs": blobs.get("state", {"count": 0, "bytes": 0}),
+            "value_blobs": blobs.get("value", {"count": 0, "bytes": 0}),
+            "stored_bytes": stored_bytes,
+            "logical_bytes": logical_bytes,
+            "dedup_ratio": round(logical_bytes / stored_bytes, 2) if stored_bytes else None,
+            "generated_date": datetime.utcnow().isoformat(),
+        }
+
+    def _encode(self, state: Dict[str, Any]) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+        """
+        Build the state blob payload.
+
+        Returns:
+            Tuple (state hash, payload with value references, {value hash: value})
+        """
+        payload = {}
+        values = {}
+
+        for key, value in state.items():
+            canonical = self.canonical(value)
+            # Values that look like references are always stored as blobs
+            if len(canonical) >= VALUE_BLOB_MIN_BYTES or _is_ref(value):
+                value_hash = self.digest(canonical)
+                values[value_hash] = value
+                payload[key] = {BLOB_REF: value_hash}
+            else:
+                payload[key] = value
+
+        return self.digest(self.canonical(payload)), payload, values
+
+    def _add_reference(self, blob_hash: str, kind: str, payload: Any, logical_size: int) -> bool:
+        """
+        Add a reference to a blob, inserting it with refcount 1 if missing.
+        
+        Concurrent writers of the same blob (identical states, values shared
+        across products) are resolved by the database: INSERT ... ON CONFLICT
+        on SQLite/PostgreSQL, a savepoint and retry elsewhere.
+        
+        Returns:
+            True if the blob was inserted
+        """
+        table = SnapshotBlob.__table__
+        increment = update(table).where(table.c.hash == blob_hash).values(refcount=table.c.refcount + 1)
+        
+        # Existing blob: the common case, no payload encoding
+        if self.db.execute(increment).rowcount:
+            return False
+        
+        size = len(json.dumps(payload))
+        row = {
+            "hash": blob_hash,
+            "kind": kind,
+            "payload": payload,
+            "size": size,
+            "logical_size": logical_size,
+            "refcount": 1,
+            "created_date": datetime.utcnow()
+        }
+        dialect = self.db.get_bind().dialect.name
+        
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            
+            stmt = dialect_insert(table).values(row).on_conflict_do_update(
+                index_elements=[table.c.hash],
+                set_={"refcount": table.c.refcount + 1}
+            ).returning(table.c.refcount)
+            created = self.db.execute(stmt).scalar_one() == 1
+        else:
+            try:
+                with self.db.begin_nested():
+                    self.db.execute(insert(table).values(row))
+                created = True
+            except IntegrityError:
+                self.db.execute(increment)
+                created = False
+        
+        if created:
+            self.bytes_written += size
+        return created
+    
+    def _load(self, hashes: Iterable[str]) -> Dict[str, Any]:
+        """Get blob payloads by hash (cache first, then one query)."""
+        found = {}
+        missing = []
+
+        with _blob_cache_lock:
+            for blob_hash in hashes:
+                if blob_hash in _blob_cache:
+                    _blob_cache.move_to_end(blob_hash)
+                    found[blob_hash] = _blob_cache[blob_hash]
+                else:
+                    missing.append(blob_hash)
+
+        if missing:
+            rows = self.db.execute(
+                select(SnapshotBlob.hash, SnapshotBlob.payload).where(SnapshotBlob.hash.in_(missing))
+            ).all()
+            loaded = dict(rows)
+
+            for blob_hash in missing:
+                if blob_hash not in loaded:
+                    raise ValueError(f"Snapshot blob {blob_hash} not found")
+
+            with _blob_cache_lock:
+                for blob_hash, payload in loaded.items():
+                    _blob_cache[blob_hash] = payload
+                while len(_blob_cache) > _BLOB_CACHE_SIZE:
+                    _blob_cache.popitem(last=False)
+
+            found.update(loaded)
+
+        return found
+
+    def _release(self, hashes: List[str]):
+        """Decrement refcounts; delete unreferenced blobs and release what they reference."""
+        table = SnapshotBlob.__table__
+
+        for blob_hash in hashes:
+            self.db.execute(
+                update(table).where(table.c.hash == blob_hash).values(refcount=table.c.refcount - 1)
+            )
+            row = self.db.execute(
+                select(table.c.refcount, table.c.kind, table.c.payload, table.c.size).where(table.c.hash == blob_hash)
+            ).first()
+
+            if row is None or row.refcount > 0:
+                continue
+
+            self.db.execute(delete(table).where(table.c.hash == blob_hash))
+            self.bytes_freed += row.size
+
+            if row.kind == "state":
+                self._release(list({value[BLOB_REF] for value in row.payload.values() if _is_ref(value)}))
@@ -1,13 +1,94 @@
 """Version Manager - Business logic for version control and snapshots."""
-from typing import List, Dict, Optional, Any
-from sqlalchemy.orm import Session
+import base64
+import copy
+import difflib
+import json
+from typing import List, Dict, Optional, Any, Tuple
+from sqlalchemy import bindparam, func, select, tuple_, update
+from sqlalchemy.orm import Session, load_only
 from models.product_sheet import ProductSheet, ProductVersion, ProductChangelog
+from config import settings
+from core.json_patch import make_patch, apply_patch
+from core.snapshot_blob_store import SnapshotBlobStore
+from core.compliance_status_manager import ComplianceStatusManager
+from core.product_search_index import ProductSearchIndex
+from core.ean_index import EanIndex
+from core.product_completion import ProductCompletion
+from core.catalog_counters import CatalogCounters
 from datetime import datetime
 import uuid
 
 
+SNAPSHOT_FULL = "full"
+SNAPSHOT_DELTA = "delta"
+SNAPSHOT_BLOB = "blob"
+
+# Columns loaded for version listings: everything but the snapshot payload
+# (they precede complete_snapshot in the table, so SQLite does not walk its overflow pages)
+METADATA_COLUMNS = (
+    ProductVersion.version_id,
+    ProductVersion.sku,
+    ProductVersion.version_number,
+    ProductVersion.version_type,
+    ProductVersion.status,
+    ProductVersion.snapshot_date,
+    ProductVersion.created_by,
+    ProductVersion.change_summary,
+)
+
+# Fields whose changes matter for compliance (dotted paths; nested fields included)
+CRITICAL_FIELDS = (
+    'title_short',
+    'inci_ingredients',
+    'allergens_present',
+    'mode_of_use',
+    'general_warnings',
+    'made_in',
+    'distributor',
+    'responsible_person',
+    'pao',
+)
+
+SEVERITY_ORDER = {"critical": 0, "important": 1, "minor": 2}
+
+
+def _build_field_trie(paths) -> Dict[str, Any]:
+    """Build a path segment trie: {segment: subtrie, or True for a critical subtree}."""
+    trie: Dict[str, Any] = {}
+    for path in paths:
+        node = trie
+        segments = path.split('.')
+        for segment in segments[:-1]:
+            child = node.setdefault(segment, {})
+            if child is True:
+                break
+            node = child
+        else:
+            node[segments[-1]] = True
+    return trie
+
+
+CRITICAL_FIELD_TRIE = _build_field_trie(CRITICAL_FIELDS)
+
+
+def _is_scalar_list(values: List[Any]) -> bool:
+    """Check if a list holds only strings/numbers (diffed element by element)."""
+    return all(isinstance(value, (str, int, float)) for value in values)
+
+
 class VersionManager:
-    """Manager for product version control operations."""
+    """
+    Manager for product version control operations.
+    
+    With VERSION_STORAGE=delta, every VERSION_KEYFRAME_INTERVAL-th version of
+    a product stores the complete snapshot (keyframe) and the others store
+    JSON patch operations against the previous version. With
+    VERSION_SNAPSHOT_DEDUP, keyframes are stored in the content-addressed
+    SnapshotBlobStore (the row keeps the volatile audit fields only).
+    Snapshots are reconstructed transparently by get_snapshot,
+    compare_versions, restore_version and to_dicts; compact_history
+    converts existing history.
+    """
     
     def __init__(self, db: Session):
         """Initialize manager with database session."""
@@ -43,6 +124,11 @@ class VersionManager:
         current_version = product.current_version or "1.0"
         new_version = self._calculate_next_version(current_version, version_type)
         
+        # Latest version: base of a delta
+        previous = self.db.query(ProductVersion).filter(
+            ProductVersion.sku == sku
+        ).order_by(ProductVersion.snapshot_date.desc()).first()
+        
         # Archive previous current version
         self.db.query(ProductVersion).filter(
             ProductVersion.sku == sku,
@@ -54,7 +140,7 @@ class VersionManager:
         
         # Create new version
         version = ProductVersion(
-            version_id=uuid.uuid4(),
+            version_id=str(uuid.uuid4()),
             sku=sku,
             version_number=new_version,
             version_type=version_type,
@@ -62,7 +148,7 @@ class VersionManager:
             snapshot_date=datetime.utcnow(),
             created_by=created_by,
             change_summary=change_summary,
-            complete_snapshot=snapshot_data
+            **self._encode_snapshot(snapshot_data, previous)
         )
         
         self.db.add(version)
@@ -75,7 +161,7 @@ class VersionManager:
             changes = self.calculate_diff(old_state, snapshot_data)
             if changes:
                 changelog = ProductChangelog(
-                    change_id=uuid.uuid4(),
+                    change_id=str(uuid.uuid4()),
                     sku=sku,
                     version_from=current_version,
                     version_to=new_version,
@@ -110,23 +196,137 @@ class VersionManager:
         if not version:
             return None
         
-        return version.to_dict()
+        return self.to_dicts([version])[0]
     
-    def get_versions(self, sku: str) -> List[ProductVersion]:
+    def get_versions(
+        self,
+        sku: str,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        created_by: Optional[str] = None,
+        include_snapshots: bool = True
+    ) -> List[ProductVersion]:
         """
-        Get all versions for a product.
+        Get all versions for a product, newest first.
         
         Args:
             sku: Product SKU
+            date_from: Only versions taken at or after this date
+            date_to: Only versions taken at or before this date
+            created_by: Only versions created by this user
+            include_snapshots: Load complete_snapshot (False: metadata only, see METADATA_COLUMNS)
             
         Returns:
             List of ProductVersion instances
         """
-        versions = self.db.query(ProductVersion).filter(
-            ProductVersion.sku == sku
-        ).order_by(ProductVersion.snapshot_date.desc()).all()
+        query = self._versions_query(sku, date_from, date_to, created_by, include_snapshots)
+        
+        return query.order_by(ProductVersion.snapshot_date.desc(), ProductVersion.version_id.desc()).all()
+    
+    def list_versions_cursor(
+        self,
+        sku: str,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        created_by: Optional[str] = None,
+        include_snapshots: bool = False
+    ) -> Tuple[List[ProductVersion], Optional[str]]:
+        """
+        Get a page of versions for a product, newest first, with keyset (cursor) pagination.
+        
+        Each page seeks on idx_versions_sku_date, so its cost does not
+        depend on how deep it is.
+        
+        Args:
+            sku: Product SKU
+            cursor: Opaque cursor from the previous page (None for the first)
+            limit: Versions per page
+            date_from: Only versions taken at or after this date
+            date_to: Only versions taken at or before this date
+            created_by: Only versions created by this user
+            include_snapshots: Load complete_snapshot (default: metadata only)
+            
+        Returns:
+            Tuple of (list of ProductVersion instances, cursor of the next page or None)
+            
+        Raises:
+            ValueError: If the cursor is not valid
+        """
+        query = self._versions_query(sku, date_from, date_to, created_by, include_snapshots)
+        
+        if cursor:
+            last_date, last_id = self._decode_cursor(cursor)
+            query = query.filter(
+                tuple_(ProductVersion.snapshot_date, ProductVersion.version_id) < (last_date, last_id)
+            )
+        
+        # One extra row tells whether there is a next page
+        versions = query.order_by(
+            ProductVersion.snapshot_date.desc(), ProductVersion.version_id.desc()
+        ).limit(limit + 1).all()
         
-        return versions
+        next_cursor = None
+        if len(versions) > limit:
+            versions = versions[:limit]
+            next_cursor = self._encode_cursor(versions[-1].snapshot_date, versions[-1].version_id)
+        
+        return versions, next_cursor
+    
+    def count_versions(
+        self,
+        sku: str,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        created_by: Optional[str] = None
+    ) -> int:
+        """
+        Count versions for a product (same filters as get_versions).
+        
+        Returns:
+            Number of matching versions
+        """
+        query = self._apply_version_filters(
+            self.db.query(func.count(ProductVersion.version_id)).filter(ProductVersion.sku == sku),
+            date_from, date_to, created_by
+        )
+        return query.scalar()
+    
+    def _versions_query(self, sku, date_from, date_to, created_by, include_snapshots: bool):
+        """Build the filtered versions query (metadata columns only unless include_snapshots)."""
+        query = self.db.query(ProductVersion).filter(ProductVersion.sku == sku)
+        if not include_snapshots:
+            query = query.options(load_only(*METADATA_COLUMNS))
+        return self._apply_version_filters(query, date_from, date_to, created_by)
+    
+    @staticmethod
+    def _apply_version_filters(query, date_from, date_to, created_by):
+        """Apply date range and author filters."""
+        if date_from is not None:
+            query = query.filter(ProductVersion.snapshot_date >= date_from)
+        if date_to is not None:
+            query = query.filter(ProductVersion.snapshot_date <= date_to)
+        if created_by:
+            query = query.filter(ProductVersion.created_by == created_by)
+        return query
+    
+    @staticmethod
+    def _encode_cursor(snapshot_date: datetime, version_id: str) -> str:
+        """Build an opaque cursor pointing after (snapshot_date, version_id)."""
+        payload = json.dumps({"d": snapshot_date.isoformat(), "v": version_id}, separators=(",", ":"))
+        
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+        """Decode a cursor into (snapshot_date, version_id)."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            return datetime.fromisoformat(payload["d"]), str(payload["v"])
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Invalid cursor")
     
     def compare_versions(
         self,
@@ -163,10 +363,11 @@ class VersionManager:
                 "version_to": version_to
             }
         
-        # Calculate differences
+        # Calculate differences (shared cache: both usually have the same keyframe)
+        cache: Dict[str, Dict[str, Any]] = {}
         changes = self.calculate_diff(
-            v_from.complete_snapshot,
-            v_to.complete_snapshot
+            self.resolve_snapshot(v_from, cache),
+            self.resolve_snapshot(v_to, cache)
         )
         
         # Count changes by type
@@ -215,16 +416,40 @@ class VersionManager:
         
         # Save current state for changelog
         old_state = product.to_dict()
+        counters = CatalogCounters(self.db)
+        old_counter_keys = counters.product_keys(product)
         
         # Restore data from snapshot (excluding metadata)
-        snapshot = version.complete_snapshot
+        snapshot = self.resolve_snapshot(version)
+        ean_index = EanIndex(self.db)
+        if 'ean_list' in snapshot:
+            ean_index.check_available(sku, snapshot['ean_list'])
+        
+        restored_fields = []
         for key, value in snapshot.items():
-            if key not in ['created_date', 'created_by', 'current_version'] and hasattr(product, key):
-                setattr(product, key, value)
+            if key not in ['created_date', 'created_by', 'updated_date', 'updated_by', 'current_version'] and hasattr(product, key):
+                setattr(product, key, copy.deepcopy(value))
+                restored_fields.append(key)
+        
+        if 'ean_list' in restored_fields:
+            ean_index.set_product_eans(sku, product.ean_list)
+        
+        # Snapshots carry completion_percentage but not its field bits
+        ProductCompletion(self.db).apply(product)
+        counters.apply(old_counter_keys, counters.product_keys(product))
+        
+        compliance = ComplianceStatusManager(self.db)
+        affected_countries = compliance.affected_countries(restored_fields)
+        if affected_countries:
+            compliance.refresh_product(product, affected_countries)
         
         product.updated_by = restored_by
         product.updated_date = datetime.utcnow()
         
+        search_index = ProductSearchIndex(self.db)
+        if search_index.affects(restored_fields):
+            search_index.index_product(product)
+        
         # Create new snapshot for the restoration
         new_version = self._calculate_next_version(product.current_version, "major")
         self.create_snapshot(
@@ -237,9 +462,250 @@ class VersionManager:
         
         self.db.commit()
         self.db.refresh(product)
+        CatalogCounters.invalidate()
         
         return product
     
+    def resolve_snapshot(self, version: ProductVersion, cache: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Get the complete snapshot of a version, applying deltas to its keyframe.
+        
+        Args:
+            version: ProductVersion instance
+            cache: Snapshots already reconstructed, by version_id (filled in)
+            
+        Returns:
+            Snapshot data (shares unchanged values with other snapshots: do not modify)
+            
+        Raises:
+            ValueError: If a delta's base version is missing
+        """
+        cache = {} if cache is None else cache
+        
+        # Walk back to a keyframe or an already reconstructed version
+        chain = []
+        current = version
+        while current.version_id not in cache and current.snapshot_format == SNAPSHOT_DELTA:
+            chain.append(current)
+            base = self.db.get(ProductVersion, current.base_version_id)
+            if base is None:
+                raise ValueError(
+                    f"Base version of {current.sku} {current.version_number} not found: snapshot cannot be rebuilt"
+                )
+            current = base
+        
+        if current.version_id in cache:
+            snapshot = cache[current.version_id]
+        elif current.snapshot_format == SNAPSHOT_BLOB:
+            snapshot = {**SnapshotBlobStore(self.db).get(current.blob_hash), **current.complete_snapshot}
+        else:
+            snapshot = current.complete_snapshot
+        cache[current.version_id] = snapshot
+        
+        for delta in reversed(chain):
+            snapshot = apply_patch(snapshot, delta.complete_snapshot)
+            cache[delta.version_id] = snapshot
+        
+        return snapshot
+    
+    def to_dicts(self, versions: List[ProductVersion]) -> List[Dict[str, Any]]:
+        """
+        Convert versions to dictionaries with their complete snapshots.
+        
+        Args:
+            versions: ProductVersion instances
+            
+        Returns:
+            List of version dictionaries (ProductVersion.to_dict format)
+        """
+        cache: Dict[str, Dict[str, Any]] = {}
+        
+        # Oldest first, so each delta is applied once
+        for version in sorted(versions, key=lambda v: v.snapshot_date):
+            self.resolve_snapshot(version, cache)
+        
+        result = []
+        for version in versions:
+            data = version.to_dict()
+            data['complete_snapshot'] = cache[version.version_id]
+            result.append(data)
+        
+        return result
+    
+    def compact_history(
+        self,
+        keyframe_interval: Optional[int] = None,
+        full: bool = False,
+        skus: Optional[List[str]] = None,
+        dry_run: bool = False,
+        chunk_size: int = 100
+    ) -> Dict[str, Any]:
+        """
+        Re-encode stored version history (keyframes + deltas, or all full).
+        
+        Products are processed in chunks of SKUs, each committed separately.
+        Keyframes go to the blob store when VERSION_SNAPSHOT_DEDUP is on.
+        
+        Args:
+            keyframe_interval: Versions per keyframe (default VERSION_KEYFRAME_INTERVAL)
+            full: Store every version as a full snapshot (undo delta storage)
+            skus: Only these products (default: all)
+            dry_run: Compute the report without writing
+            chunk_size: Products per transaction
+            
+        Returns:
+            Report with products, versions, rewritten, keyframes, deltas,
+            bytes_before, bytes_after, bytes_saved and saved_percent (bytes:
+            payloads in product_versions, plus blobs written minus blobs
+            freed for bytes_after)
+        """
+        interval = 1 if full else max(1, keyframe_interval or settings.version_keyframe_interval)
+        table = ProductVersion.__table__
+        stmt = (
+            update(table)
+            .where(table.c.version_id == bindparam('b_version_id'))
+            .values(
+                complete_snapshot=bindparam('b_payload'),
+                snapshot_format=bindparam('b_format'),
+                base_version_id=bindparam('b_base'),
+                delta_depth=bindparam('b_depth'),
+                blob_hash=bindparam('b_blob')
+            )
+        )
+        store = SnapshotBlobStore(self.db)
+        report = {
+            "products": 0, "versions": 0, "rewritten": 0, "keyframes": 0, "deltas": 0,
+            "bytes_before": 0, "bytes_after": 0,
+        }
+        blob_bytes = 0
+        
+        sku_query = select(ProductVersion.sku).distinct()
+        if skus:
+            sku_query = sku_query.where(ProductVersion.sku.in_(skus))
+        last_sku = None
+        
+        while True:
+            chunk_query = sku_query.where(ProductVersion.sku > last_sku) if last_sku is not None else sku_query
+            chunk_skus = self.db.execute(chunk_query.order_by(ProductVersion.sku).limit(chunk_size)).scalars().all()
+            
+            if not chunk_skus:
+                break
+            
+            last_sku = chunk_skus[-1]
+            versions = self.db.query(ProductVersion).filter(
+                ProductVersion.sku.in_(chunk_skus)
+            ).order_by(ProductVersion.sku, ProductVersion.snapshot_date).all()
+            
+            by_sku: Dict[str, List[ProductVersion]] = {}
+            for version in versions:
+                by_sku.setdefault(version.sku, []).append(version)
+            
+            params = []
+            for history in by_sku.values():
+                cache: Dict[str, Dict[str, Any]] = {}
+                previous = None
+                
+                for i, version in enumerate(history):
+                    snapshot = self.resolve_snapshot(version, cache)
+                    
+                    if i % interval == 0:
+                        encoded = {"b_payload": snapshot, "b_format": SNAPSHOT_FULL, "b_base": None, "b_depth": 0, "b_blob": None}
+                        if settings.version_snapshot_dedup:
+                            state, volatile = store.split(snapshot)
+                            encoded.update(b_payload=volatile, b_format=SNAPSHOT_BLOB, b_blob=store.state_hash(state))
+                        report["keyframes"] += 1
+                    else:
+                        encoded = {
+                            "b_payload": make_patch(cache[previous.version_id], snapshot),
+                            "b_format": SNAPSHOT_DELTA,
+                            "b_base": previous.version_id,
+                            "b_depth": i % interval,
+                            "b_blob": None,
+                        }
+                        report["deltas"] += 1
+                    
+                    report["bytes_before"] += len(json.dumps(version.complete_snapshot))
+                    report["bytes_after"] += len(json.dumps(encoded["b_payload"]))
+                    
+                    if (
+                        version.snapshot_format != encoded["b_format"]
+                        or version.base_version_id != encoded["b_base"]
+                        or version.delta_depth != encoded["b_depth"]
+                        or version.blob_hash != encoded["b_blob"]
+                    ):
+                        # New reference first: the old state may share value blobs with it
+                        if encoded["b_blob"]:
+                            store.put(state)
+                        if version.blob_hash:
+                            store.release(version.blob_hash)
+                        params.append({"b_version_id": version.version_id, **encoded})
+                    
+                    previous = version
+            
+            report["products"] += len(by_sku)
+            report["versions"] += len(versions)
+            report["rewritten"] += len(params)
+            
+            blob_bytes += store.bytes_written - store.bytes_freed
+            store.bytes_written = store.bytes_freed = 0
+            
+            if params and not dry_run:
+                self.db.execute(stmt, params)
+                self.db.commit()
+            else:
+                self.db.rollback()
+            
+            # Rows of the chunk are no longer needed
+            self.db.expunge_all()
+        
+        report["bytes_after"] += blob_bytes
+        report["bytes_saved"] = report["bytes_before"] - report["bytes_after"]
+        report["saved_percent"] = (
+            round(report["bytes_saved"] / report["bytes_before"] * 100, 1) if report["bytes_before"] else 0.0
+        )
+        
+        return report
+    
+    def _encode_snapshot(self, snapshot: Dict[str, Any], previous: Optional[ProductVersion]) -> Dict[str, Any]:
+        """
+        Choose how to store a new snapshot: keyframe or delta against the previous version.
+        
+        Args:
+            snapshot: Complete snapshot of the new version
+            previous: Latest existing version of the product (None: first version)
+            
+        Returns:
+            ProductVersion column values (complete_snapshot, snapshot_format,
+            base_version_id, delta_depth, blob_hash)
+        """
+        depth = (previous.delta_depth or 0) + 1 if previous is not None else 0
+        
+        if (
+            settings.version_storage != SNAPSHOT_DELTA
+            or previous is None
+            or depth >= max(1, settings.version_keyframe_interval)
+        ):
+            columns = {
+                "complete_snapshot": snapshot,
+                "snapshot_format": SNAPSHOT_FULL,
+                "base_version_id": None,
+                "delta_depth": 0,
+                "blob_hash": None,
+            }
+            if settings.version_snapshot_dedup:
+                store = SnapshotBlobStore(self.db)
+                state, volatile = store.split(snapshot)
+                columns.update(complete_snapshot=volatile, snapshot_format=SNAPSHOT_BLOB, blob_hash=store.put(state))
+            return columns
+        
+        return {
+            "complete_snapshot": make_patch(self.resolve_snapshot(previous), snapshot),
+            "snapshot_format": SNAPSHOT_DELTA,
+            "base_version_id": previous.version_id,
+            "delta_depth": depth,
+            "blob_hash": None,
+        }
+    
     def get_changelog(self, sku: str, limit: int = 50) -> List[ProductChangelog]:
         """
         Get changelog history for a product.
@@ -261,81 +727,107 @@ class VersionManager:
         """
         Calculate field-level differences between two states.
         
+        Both states are walked once, skipping equal subtrees (snapshots
+        resolved from deltas share unchanged values, so most are skipped by
+        identity). Lists of scalars (ean_list, allergens_present...) are
+        diffed element by element with "field[index]" paths; other lists are
+        compared as a whole.
+        
         Args:
             old_state: Previous state dictionary
             new_state: New state dictionary
             
         Returns:
-            List of changes with field paths and values
+            List of changes with field paths and values, sorted by severity
+            (critical > important > minor) then by field path
         """
-        changes = []
-        
-        # Flatten both dictionaries for comparison
-        old_flat = self._flatten_dict(old_state)
-        new_flat = self._flatten_dict(new_state)
+        changes: List[Dict[str, Any]] = []
+        self._diff_value("", old_state, new_state, CRITICAL_FIELD_TRIE, changes)
         
-        # Find all unique keys
-        all_keys = set(old_flat.keys()) | set(new_flat.keys())
-        
-        for key in all_keys:
-            old_value = old_flat.get(key)
-            new_value = new_flat.get(key)
-            
-            # Skip if values are identical
-            if old_value == new_value:
-                continue
-            
-            # Determine change type
-            if old_value is None and new_value is not None:
-                change_type = "added"
-                severity = "important" if self._is_critical_field(key) else "minor"
-            elif old_value is not None and new_value is None:
-                change_type = "deleted"
-                severity = "important"
-            else:
-                change_type = "updated"
-                severity = "critical" if self._is_critical_field(key) else "minor"
-            
-            changes.append({
-                "field_path": key,
-                "field_display_name": self._format_field_name(key),
-                "old_value": old_value,
-                "new_value": new_value,
-                "change_type": change_type,
-                "severity": severity
-            })
-        
-        # Sort by severity (critical > important > minor) then by field name
-        severity_order = {"critical": 0, "important": 1, "minor": 2}
-        changes.sort(key=lambda x: (severity_order.get(x["severity"], 3), x["field_path"]))
+        changes.sort(key=lambda x: (SEVERITY_ORDER.get(x["severity"], 3), x["field_path"]))
         
         return changes
     
-    def _flatten_dict(self, d: Dict[str, Any], parent_key: str = '', sep: str = '.') -> Dict[str, Any]:
+    def _diff_value(self, path: str, old: Any, new: Any, node: Any, changes: List[Dict[str, Any]]):
         """
-        Flatten a nested dictionary.
+        Append the changes between two values at a field path.
         
         Args:
-            d: Dictionary to flatten
-            parent_key: Parent key prefix
-            sep: Separator for keys
-            
-        Returns:
-            Flattened dictionary
+            path: Field path of the values ("" for the root)
+            old: Previous value (None if missing)
+            new: New value (None if missing)
+            node: CRITICAL_FIELD_TRIE node of the path (True: critical subtree, None: not critical)
+            changes: List the changes are appended to
         """
-        items = []
-        for k, v in d.items():
-            new_key = f"{parent_key}{sep}{k}" if parent_key else k
+        if old is new or old == new:
+            return
+        
+        old_branch = isinstance(old, dict) and bool(old)
+        new_branch = isinstance(new, dict) and bool(new)
+        
+        if old_branch or new_branch:
+            # A non-empty dict replacing a scalar (or vice versa): the scalar is a change of its own
+            if not old_branch:
+                self._add_change(path, old, None, node, changes)
+            if not new_branch:
+                self._add_change(path, None, new, node, changes)
             
-            if isinstance(v, dict) and v:
-                items.extend(self._flatten_dict(v, new_key, sep=sep).items())
-            elif isinstance(v, list) and v:
-                # Convert list to string representation for comparison
-                items.append((new_key, str(v)))
-            else:
-                items.append((new_key, v))
+            old_dict = old if old_branch else {}
+            new_dict = new if new_branch else {}
+            for key in old_dict.keys() | new_dict.keys():
+                self._diff_value(
+                    f"{path}.{key}" if path else key,
+                    old_dict.get(key),
+                    new_dict.get(key),
+                    node.get(key) if isinstance(node, dict) else node,
+                    changes
+                )
+        elif isinstance(old, list) and isinstance(new, list) and _is_scalar_list(old) and _is_scalar_list(new):
+            self._diff_list(path, old, new, node, changes)
+        else:
+            self._add_change(path, old, new, node, changes)
+    
+    def _diff_list(self, path: str, old: List[Any], new: List[Any], node: Any, changes: List[Dict[str, Any]]):
+        """Append element-level changes between two lists of scalars."""
+        matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
         
-        return dict(items)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            
+            # Replaced elements pair up as updates, the rest are deletions/additions
+            paired = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+            for offset in range(paired):
+                self._add_change(f"{path}[{j1 + offset}]", old[i1 + offset], new[j1 + offset], node, changes)
+            for i in range(i1 + paired, i2):
+                self._add_change(f"{path}[{i}]", old[i], None, node, changes)
+            for j in range(j1 + paired, j2):
+                self._add_change(f"{path}[{j}]", None, new[j], node, changes)
+    
+    def _add_change(self, path: str, old_value: Any, new_value: Any, node: Any, changes: List[Dict[str, Any]]):
+        """Append one leaf change (missing and None values are the same)."""
+        if old_value is None and new_value is None:
+            return
+        
+        critical = node is True
+        if old_value is None:
+            change_type = "added"
+            severity = "important" if critical else "minor"
+        elif new_value is None:
+            change_type = "deleted"
+            severity = "important"
+        else:
+            change_type = "updated"
+            severity = "critical" if critical else "minor"
+        
+        changes.append({
+            "field_path": path,
+            "field_display_name": self._format_field_name(path),
+            "old_value": old_value,
+            "new_value": new_value,
+            "change_type": change_type,
+            "severity": severity
+        })
     
     def _calculate_next_version(self, current: str, version_type: str) -> str:
         """
@@ -373,30 +865,6 @@ class VersionManager:
         else:
             return f"{major}.{minor}"
     
-    def _is_critical_field(self, field_path: str) -> bool:
-        """
-        Determine if a field is critical for compliance.
-        
-        Args:
-            field_path: Flattened field path
-            
-        Returns:
-            True if field is critical
-        """
-        critical_fields = [
-            'title_short',
-            'inci_ingredients',
-            'allergens_present',
-            'mode_of_use',
-            'general_warnings',
-            'made_in',
-            'distributor',
-            'responsible_person',
-            'pao',
-        ]
-        
-        return any(cf in field_path for cf in critical_fields)
-    
     def _format_field_name(self, field_path: str) -> str:
         """
         Format field path to human-readable name.
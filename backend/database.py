@@ -1,47 +1,82 @@
 """Database connection and session management."""
-from sqlalchemy import create_engine
+import itertools
+import time
+from fastapi import Request
+from sqlalchemy import LargeBinary, create_engine, event, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.types import TypeDecorator
 # Use absolute import so launcher works when executed from repo root
 from backend.config import settings
+from backend.pool_monitor import MonitoredQueuePool, PoolStats
+
+# Cookie set after a successful write (value: epoch seconds of the write)
+LAST_WRITE_COOKIE = "last_write"
+# Request header forcing get_read_db to use the primary
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
+
+def _create_engine(database_url: str):
+    """
+    Create an engine configured for its database type.
+
+    Args:
+        database_url: SQLAlchemy database URL
+
+    Returns:
+        SQLAlchemy engine
+    """
+    if database_url.startswith("sqlite"):
+        # SQLite specific configuration
+        # WARNING: SQLite with check_same_thread=False allows sharing connections across threads,
+        # but SQLite has limited write concurrency. Multiple simultaneous writes may result in
+        # "database is locked" errors. For production or high-concurrency environments,
+        # use PostgreSQL instead by setting DATABASE_URL environment variable.
+        connect_args = {"check_same_thread": False}
+        # File databases use a QueuePool (in-memory ones keep SQLAlchemy's default)
+        pool_args = {} if ":memory:" in database_url else {"poolclass": MonitoredQueuePool}
+        sqlite_engine = create_engine(
+            database_url,
+            echo=settings.debug,
+            connect_args=connect_args,
+            **pool_args
+        )
+        # Enable WAL mode to improve SQLite concurrency
+        @event.listens_for(sqlite_engine, "connect")
+        def set_sqlite_pragma(dbapi_conn, connection_record):
+            try:
+                cursor = dbapi_conn.cursor()
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.close()
+            except Exception as e:
+                # WAL mode may fail on read-only or networked filesystems
+                # Log the error but don't fail the connection
+                import logging
+                logging.warning(f"Could not enable WAL mode for SQLite: {e}")
+        return sqlite_engine
 
-# Configure engine based on database type
-connect_args = {}
-if settings.database_url.startswith("sqlite"):
-    # SQLite specific configuration
-    # WARNING: SQLite with check_same_thread=False allows sharing connections across threads,
-    # but SQLite has limited write concurrency. Multiple simultaneous writes may result in
-    # "database is locked" errors. For production or high-concurrency environments, 
-    # use PostgreSQL instead by setting DATABASE_URL environment variable.
-    connect_args = {"check_same_thread": False}
-    engine = create_engine(
-        settings.database_url,
-        echo=settings.debug,
-        connect_args=connect_args
-    )
-    # Enable WAL mode to improve SQLite concurrency
-    from sqlalchemy import event
-    @event.listens_for(engine, "connect")
-    def set_sqlite_pragma(dbapi_conn, connection_record):
-        try:
-            cursor = dbapi_conn.cursor()
-            cursor.execute("PRAGMA journal_mode=WAL")
-            cursor.close()
-        except Exception as e:
-            # WAL mode may fail on read-only or networked filesystems
-            # Log the error but don't fail the connection
-            import logging
-            logging.warning(f"Could not enable WAL mode for SQLite: {e}")
-else:
     # PostgreSQL or other databases
-    engine = create_engine(
-        settings.database_url,
+    return create_engine(
+        database_url,
         echo=settings.debug,
         pool_pre_ping=True,
         pool_size=10,
-        max_overflow=20
+        max_overflow=20,
+        poolclass=MonitoredQueuePool
     )
 
+
+engine = _create_engine(settings.database_url)
+
+# Read replicas (DATABASE_READ_URL), used by get_read_db
+read_engines = [_create_engine(url) for url in settings.read_urls_list]
+
+# Pool statistics (GET /api/admin/db-pool); this module may be loaded as
+# both "database" and "backend.database", each with its own engines
+PoolStats.attach(engine, name=__name__, long_held_seconds=settings.db_pool_long_held_seconds)
+for i, read_engine in enumerate(read_engines):
+    PoolStats.attach(read_engine, name=f"{__name__}.read{i}", long_held_seconds=settings.db_pool_long_held_seconds)
+
 # Create sessionmaker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -49,6 +84,52 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+class ReadOnlySession(Session):
+    """Session of get_read_db: flushing ORM changes raises RuntimeError."""
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _reject_flush(session, flush_context, instances):
+    """Refuse writes on read sessions (replicas reject them, the primary must not get them here)."""
+    raise RuntimeError("Read-only session: use get_db for routes that write")
+
+
+class ReadSessionMaker:
+    """Factory of read-only sessions, round-robin over the read replicas."""
+
+    def __init__(self, primary_engine, replica_engines):
+        """
+        Initialize session factories.
+
+        Args:
+            primary_engine: Engine used when there are no replicas or the primary is requested
+            replica_engines: Read replica engines
+        """
+        self.primary = sessionmaker(autocommit=False, autoflush=False, bind=primary_engine, class_=ReadOnlySession)
+        self.replicas = [
+            sessionmaker(autocommit=False, autoflush=False, bind=replica_engine, class_=ReadOnlySession)
+            for replica_engine in replica_engines
+        ]
+        self._counter = itertools.count()
+
+    def __call__(self, primary: bool = False) -> ReadOnlySession:
+        """
+        Create a read-only session.
+
+        Args:
+            primary: Read from the primary even if there are replicas
+
+        Returns:
+            New session bound to the primary or the next replica
+        """
+        if primary or not self.replicas:
+            return self.primary()
+        return self.replicas[next(self._counter) % len(self.replicas)]()
+
+
+ReadSessionLocal = ReadSessionMaker(engine, read_engines)
+
+
 def get_db():
     """Dependency for FastAPI to get database session."""
     db = SessionLocal()
@@ -58,6 +139,80 @@ def get_db():
         db.close()
 
 
+def reads_from_primary(request: Request) -> bool:
+    """
+    Check if a request must read from the primary (read-your-writes).
+
+    True when there are no replicas, the request has the X-Read-Primary
+    header, or its last_write cookie is younger than READ_YOUR_WRITES_SECONDS
+    (replicas may not have applied the client's last write yet).
+
+    Args:
+        request: Incoming request
+
+    Returns:
+        True to use the primary
+    """
+    if not read_engines:
+        return True
+
+    if request.headers.get(READ_PRIMARY_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        return False
+    return time.time() - last_write < settings.read_your_writes_seconds
+
+
+def get_read_db(request: Request):
+    """
+    Dependency for FastAPI to get a read-only session.
+
+    Uses a read replica (DATABASE_READ_URL) unless reads_from_primary().
+    The source is stored in request.state.db_source ("primary"/"replica").
+    """
+    primary = reads_from_primary(request)
+    request.state.db_source = "primary" if primary else "replica"
+
+    db = ReadSessionLocal(primary=primary)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def init_db():
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
+    
+    # create_all skips existing tables: add nullable columns declared after they were created
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                with engine.begin() as conn:
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                    ))
+    
+    # Columns switched to a binary-backed type (JSON_COMPRESSED_COLUMNS) need bytea on
+    # PostgreSQL: converted explicitly by compress_json_columns.py, never at startup
+    if engine.dialect.name == "postgresql":
+        inspector = inspect(engine)
+        for table in Base.metadata.sorted_tables:
+            existing = {column['name']: column['type'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                binary = isinstance(column.type, TypeDecorator) and isinstance(column.type.impl_instance, LargeBinary)
+                if binary and column.name in existing and not isinstance(existing[column.name], LargeBinary):
+                    print(
+                        f"Warning: {table.name}.{column.name} is compressed but stored as "
+                        f"{existing[column.name]}: run compress_json_columns.py"
+                    )
+    
+    # ... and indexes
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
@@ -26,6 +26,11 @@ sys.path.append(str(Path(__file__).parent.parent))
 from models.product_sheet import ProductSheet
 from core.preset_manager import PresetManager
 from core.version_manager import VersionManager
+from core.compliance_status_manager import ComplianceStatusManager
+from core.product_search_index import ProductSearchIndex
+from core.ean_index import EanIndex
+from core.product_completion import ProductCompletion
+from core.catalog_counters import CatalogCounters
 
 
 class ImportExportManager:
@@ -150,7 +155,7 @@ class ImportExportManager:
             session: Sesión SQLAlchemy
         """
         self.session = session
-        self.preset_manager = PresetManager()
+        self.preset_manager = PresetManager(session)
         self.version_manager = VersionManager(session)
     
     def generate_excel_template(self) -> bytes:
@@ -326,6 +331,9 @@ class ImportExportManager:
         imported = 0
         skipped = 0
         imported_sheets = []
+        ean_index = EanIndex(self.session)
+        completion = ProductCompletion(self.session)
+        counters = CatalogCounters(self.session)
         
         # Iterar filas (skip header row 1 y ejemplo row 2, start from row 3)
         for row_idx, row in enumerate(ws.iter_rows(min_row=3, values_only=True), start=3):
@@ -355,6 +363,13 @@ class ImportExportManager:
                     skipped += 1
                     continue
                 
+                # Validar que el EAN no pertenezca a otro SKU
+                ean_owner = ean_index.resolve(ean) if ean else None
+                if ean_owner and ean_owner != sku:
+                    errors.append({"row": row_idx, "sku": sku, "error": f"EAN ya asignado a {ean_owner}"})
+                    skipped += 1
+                    continue
+                
                 # Validar FAMILY
                 family = row_data.get("FAMILY")
                 if not family or family not in self.VALID_FAMILIES:
@@ -375,17 +390,20 @@ class ImportExportManager:
                 
                 # Aplicar preset
                 self.preset_manager.apply_preset(sheet, family)
+                completion.apply(sheet)
                 
                 # Guardar en DB
                 self.session.add(sheet)
+                counters.apply([], counters.product_keys(sheet))
                 self.session.flush()
+                ean_index.set_product_eans(sheet.sku, sheet.ean_list)
                 
                 # Crear v1.0 snapshot
                 self.version_manager.create_snapshot(
                     sku=sku,
                     version_type="major",
                     change_summary="Imported from Excel",
-                    user_id=current_user_id
+                    created_by=current_user_id
                 )
                 
                 imported += 1
@@ -398,7 +416,14 @@ class ImportExportManager:
         
         # Commit si hay importaciones exitosas
         if imported > 0:
+            # Índices de compliance y de búsqueda de los productos importados
+            compliance = ComplianceStatusManager(self.session)
+            search_index = ProductSearchIndex(self.session)
+            for sheet in imported_sheets:
+                compliance.refresh_product(sheet)
+                search_index.index_product(sheet)
             self.session.commit()
+            CatalogCounters.invalidate()
         
         # Calcular completion percentage
         if imported > 0:
@@ -1,27 +1,268 @@
 """Compliance Validator - Validates products against legal requirements."""
-from typing import Dict, List, Any, Optional
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, List, Any, Optional, NamedTuple, Set, Tuple
 import yaml
 from pathlib import Path
 
 
+# Top-level keys of a rules YAML that are country metadata, not families
+COUNTRY_METADATA_KEYS = ('country', 'code', 'authority', 'authority_url')
+
+
+class CompiledRequirement(NamedTuple):
+    """One requirement with its field path split once at load time."""
+    field: str
+    path: Tuple[str, ...]
+    translation_mandatory: bool
+    issue: Dict[str, Any]  # Pre-built issue/warning entry returned when unmet
+
+
+class CompiledFamily(NamedTuple):
+    """Requirements of one product family in one country."""
+    critical: Tuple[CompiledRequirement, ...]
+    optional: Tuple[CompiledRequirement, ...]
+    regulations: List[str]
+    mandatory_translations: Dict[str, Tuple[str, ...]]  # {field: languages}
+
+
+class CompiledCountry(NamedTuple):
+    """Parsed rules YAML plus its compiled families."""
+    rules: Dict[str, Any]
+    families: Dict[str, CompiledFamily]
+    version: str  # SHA-1 of the YAML file content
+
+
+class RuleRegistry:
+    """
+    Process-wide cache of compiled rules for one rules directory.
+    
+    YAML files are parsed and compiled once; a file is re-read only when its
+    (mtime, size) changes. The directory is re-checked at most once every
+    CHECK_INTERVAL seconds.
+    """
+    
+    CHECK_INTERVAL = 2.0
+    
+    _registries: Dict[Path, "RuleRegistry"] = {}
+    _registries_lock = threading.Lock()
+    
+    @classmethod
+    def for_dir(cls, rules_dir: Path) -> "RuleRegistry":
+        """
+        Get the shared registry for a rules directory.
+        
+        Args:
+            rules_dir: Directory containing *_rules.yaml files
+            
+        Returns:
+            RuleRegistry instance (one per directory per process)
+        """
+        rules_dir = Path(rules_dir).resolve()
+        
+        with cls._registries_lock:
+            if rules_dir not in cls._registries:
+                cls._registries[rules_dir] = cls(rules_dir)
+            return cls._registries[rules_dir]
+    
+    def __init__(self, rules_dir: Path):
+        """
+        Initialize registry and compile every rules file.
+        
+        Args:
+            rules_dir: Directory containing *_rules.yaml files
+        """
+        self.rules_dir = Path(rules_dir)
+        self._countries: Dict[str, CompiledCountry] = {}
+        self._signatures: Dict[Path, Tuple[int, int]] = {}
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Set[str]], None]] = []
+        self.refresh(force=True)
+    
+    def add_listener(self, callback: Callable[[Set[str]], None]):
+        """
+        Register a callback invoked with the changed country codes after a reload.
+        
+        Args:
+            callback: Function receiving a set of country codes
+        """
+        self._listeners.append(callback)
+    
+    def countries(self) -> Dict[str, CompiledCountry]:
+        """
+        Get compiled rules by country code, reloading changed files if due.
+        
+        Returns:
+            Dictionary {country_code: CompiledCountry}
+        """
+        if time.monotonic() - self._last_check >= self.CHECK_INTERVAL:
+            self.refresh()
+        return self._countries
+    
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload rules files whose signature changed (or were added/removed).
+        
+        Args:
+            force: Check now even if CHECK_INTERVAL has not elapsed
+            
+        Returns:
+            True if the compiled rules changed
+        """
+        changed = self._reload(force)
+        
+        if changed:
+            for callback in list(self._listeners):
+                try:
+                    callback(changed)
+                except Exception as e:
+                    print(f"Error in rules change listener: {e}")
+        
+        return bool(changed)
+    
+    def _reload(self, force: bool) -> Set[str]:
+        """Reload changed files and return the country codes whose rules changed."""
+        with self._lock:
+            if not force and time.monotonic() - self._last_check < self.CHECK_INTERVAL:
+                return set()
+            
+            current = {}
+            for rules_file in self.rules_dir.glob("*_rules.yaml"):
+                try:
+                    stat = rules_file.stat()
+                except FileNotFoundError:
+                    continue
+                current[rules_file] = (stat.st_mtime_ns, stat.st_size)
+            
+            self._last_check = time.monotonic()
+            
+            if current == self._signatures:
+                return set()
+            
+            countries = dict(self._countries)
+            changed = set()
+            
+            for rules_file in self._signatures:
+                if rules_file not in current:
+                    countries.pop(self._country_code(rules_file), None)
+                    changed.add(self._country_code(rules_file))
+            
+            for rules_file, signature in current.items():
+                if self._signatures.get(rules_file) == signature:
+                    continue
+                
+                try:
+                    content = rules_file.read_bytes()
+                    rules = yaml.safe_load(content.decode('utf-8'))
+                    version = hashlib.sha1(content).hexdigest()
+                    code = self._country_code(rules_file)
+                    
+                    previous = countries.get(code)
+                    if previous is None or previous.version != version:
+                        countries[code] = self._compile_country(rules or {}, version)
+                        changed.add(code)
+                except Exception as e:
+                    print(f"Error loading {rules_file}: {e}")
+            
+            # Publish with a single assignment: readers never see a partial reload
+            self._countries = countries
+            self._signatures = current
+            return changed
+    
+    @staticmethod
+    def _country_code(rules_file: Path) -> str:
+        """Country key for a rules file (e.g., portugal_rules.yaml -> PORTUGAL)."""
+        return rules_file.stem.split('_')[0].upper()
+    
+    @classmethod
+    def _compile_country(cls, rules: Dict[str, Any], version: str) -> CompiledCountry:
+        """Compile every family section of a country rules dictionary."""
+        families = {
+            key: cls._compile_family(section)
+            for key, section in rules.items()
+            if key not in COUNTRY_METADATA_KEYS and isinstance(section, dict)
+        }
+        
+        return CompiledCountry(rules=rules, families=families, version=version)
+    
+    @staticmethod
+    def _compile_family(section: Dict[str, Any]) -> CompiledFamily:
+        """Compile the critical/optional requirements of one family."""
+        critical = []
+        mandatory_translations: Dict[str, set] = {}
+        
+        for requirement in section.get('critical_requirements', []) or []:
+            field = requirement['field']
+            path = tuple(field.split('.'))
+            translation_mandatory = requirement.get('translation_mandatory', False)
+            
+            critical.append(CompiledRequirement(
+                field=field,
+                path=path,
+                translation_mandatory=translation_mandatory,
+                issue={
+                    "field": field,
+                    "name": requirement['name'],
+                    "tag": requirement['tag'],
+                    "error_message": requirement['error_message'],
+                    "description": requirement.get('description', ''),
+                    "example": requirement.get('example', '')
+                }
+            ))
+            
+            if translation_mandatory and len(path) == 2:
+                mandatory_translations.setdefault(path[0], set()).add(path[1])
+        
+        optional = []
+        
+        for requirement in section.get('optional_requirements', []) or []:
+            field = requirement['field']
+            optional.append(CompiledRequirement(
+                field=field,
+                path=tuple(field.split('.')),
+                translation_mandatory=False,
+                issue={
+                    "field": field,
+                    "name": requirement['name'],
+                    "tag": requirement['tag'],
+                    "description": requirement.get('description', '')
+                }
+            ))
+        
+        return CompiledFamily(
+            critical=tuple(critical),
+            optional=tuple(optional),
+            regulations=section.get('regulations', []),
+            mandatory_translations={
+                field: tuple(sorted(langs)) for field, langs in mandatory_translations.items()
+            }
+        )
+
+
 class ComplianceValidator:
-    """Validator for legal compliance of product sheets."""
-    
-    def __init__(self):
-        """Initialize validator and load legal rules."""
-        self.rules_dir = Path(__file__).parent
-        self.rules = {}
-        self._load_all_rules()
-    
-    def _load_all_rules(self):
-        """Load all legal framework YAML files."""
-        for rules_file in self.rules_dir.glob("*_rules.yaml"):
-            country_code = rules_file.stem.split('_')[0].upper()
-            try:
-                with open(rules_file, 'r', encoding='utf-8') as f:
-                    self.rules[country_code] = yaml.safe_load(f)
-            except Exception as e:
-                print(f"Error loading {rules_file}: {e}")
+    """
+    Validator for legal compliance of product sheets.
+    
+    Cheap to construct: rules are compiled once per process and shared
+    through RuleRegistry.
+    """
+    
+    def __init__(self, rules_dir: Optional[Path] = None):
+        """
+        Initialize validator with the shared compiled rules.
+        
+        Args:
+            rules_dir: Directory with *_rules.yaml files (default: this package)
+        """
+        self.rules_dir = Path(rules_dir) if rules_dir else Path(__file__).parent
+        self.registry = RuleRegistry.for_dir(self.rules_dir)
+    
+    @property
+    def rules(self) -> Dict[str, Dict[str, Any]]:
+        """Raw rules dictionaries by country code."""
+        return {code: country.rules for code, country in self.registry.countries().items()}
     
     def validate_for_country(
         self,
@@ -39,8 +280,9 @@ class ComplianceValidator:
             Validation result with status, percentage, issues, warnings
         """
         country_upper = country.upper()
+        compiled = self.registry.countries().get(country_upper)
         
-        if country_upper not in self.rules:
+        if compiled is None:
             return {
                 "status": "ERROR",
                 "message": f"No rules found for country: {country}",
@@ -49,62 +291,35 @@ class ComplianceValidator:
                 "warnings": []
             }
         
-        country_rules = self.rules[country_upper]
-        family = product_data.get('family', '').lower()
+        family = self._resolve_family(compiled.rules, product_data.get('family', ''))
+        family_rules = compiled.families.get(family) if family is not None else None
         
         # Get family-specific rules
-        if family not in country_rules:
-            # Try to find the closest match
-            available_families = [k for k in country_rules.keys() if k not in ['country', 'code', 'authority', 'authority_url']]
-            if available_families:
-                family = available_families[0]  # Use first available
-            else:
-                return {
-                    "status": "ERROR",
-                    "message": f"No rules found for family: {product_data.get('family')}",
-                    "percentage": 0,
-                    "critical_issues": [],
-                    "warnings": []
-                }
-        
-        family_rules = country_rules[family]
+        if family_rules is None:
+            return {
+                "status": "ERROR",
+                "message": f"No rules found for family: {product_data.get('family')}",
+                "percentage": 0,
+                "critical_issues": [],
+                "warnings": []
+            }
         
         # Validate critical requirements
-        critical_issues = []
-        critical_requirements = family_rules.get('critical_requirements', [])
-        
-        for requirement in critical_requirements:
-            field = requirement['field']
-            translation_mandatory = requirement.get('translation_mandatory', False)
-            
-            # Check if field exists and has value
-            if not self._validate_field(product_data, field, translation_mandatory):
-                critical_issues.append({
-                    "field": field,
-                    "name": requirement['name'],
-                    "tag": requirement['tag'],
-                    "error_message": requirement['error_message'],
-                    "description": requirement.get('description', ''),
-                    "example": requirement.get('example', '')
-                })
+        critical_issues = [
+            dict(requirement.issue)
+            for requirement in family_rules.critical
+            if not self._has_value(product_data, requirement.path)
+        ]
         
         # Validate optional requirements (warnings)
-        warnings = []
-        optional_requirements = family_rules.get('optional_requirements', [])
-        
-        for requirement in optional_requirements:
-            field = requirement['field']
-            
-            if not self._validate_field(product_data, field, False):
-                warnings.append({
-                    "field": field,
-                    "name": requirement['name'],
-                    "tag": requirement['tag'],
-                    "description": requirement.get('description', '')
-                })
+        warnings = [
+            dict(requirement.issue)
+            for requirement in family_rules.optional
+            if not self._has_value(product_data, requirement.path)
+        ]
         
         # Calculate compliance percentage
-        total_requirements = len(critical_requirements)
+        total_requirements = len(family_rules.critical)
         met_requirements = total_requirements - len(critical_issues)
         percentage = int((met_requirements / total_requirements) * 100) if total_requirements > 0 else 0
         
@@ -120,15 +335,38 @@ class ComplianceValidator:
             "status": status,
             "country": country_upper,
             "family": family,
-            "authority": country_rules.get('authority', ''),
+            "authority": compiled.rules.get('authority', ''),
             "percentage": percentage,
             "total_requirements": total_requirements,
             "met_requirements": met_requirements,
             "critical_issues": critical_issues,
             "warnings": warnings,
-            "regulations": family_rules.get('regulations', [])
+            "regulations": family_rules.regulations
         }
     
+    def _resolve_family(self, country_rules: Dict[str, Any], family: str) -> Optional[str]:
+        """
+        Resolve the rules key for a product family in a country.
+        
+        Args:
+            country_rules: Rules dictionary for one country
+            family: Product family (e.g., COSMETICS_FACIAL)
+            
+        Returns:
+            Family key in country_rules, or None if the country has no families
+        """
+        family = (family or '').lower()
+        
+        if family in country_rules:
+            return family
+        
+        # Try to find the closest match
+        available_families = [k for k in country_rules.keys() if k not in COUNTRY_METADATA_KEYS]
+        if available_families:
+            return available_families[0]  # Use first available
+        
+        return None
+    
     def _validate_field(
         self,
         product_data: Dict[str, Any],
@@ -146,12 +384,23 @@ class ComplianceValidator:
         Returns:
             True if field is valid, False otherwise
         """
-        # Split nested field path
-        parts = field_path.split('.')
+        return self._has_value(product_data, tuple(field_path.split('.')))
+    
+    @staticmethod
+    def _has_value(product_data: Dict[str, Any], path: Tuple[str, ...]) -> bool:
+        """
+        Check that a pre-split field path exists and is not empty.
         
+        Args:
+            product_data: Product data dictionary
+            path: Field path parts (e.g., ("title_short", "pt"))
+            
+        Returns:
+            True if field is valid, False otherwise
+        """
         # Navigate through nested structure
         current = product_data
-        for part in parts:
+        for part in path:
             if isinstance(current, dict):
                 current = current.get(part)
             else:
@@ -182,7 +431,8 @@ class ComplianceValidator:
         Returns:
             Country rules dictionary or None
         """
-        return self.rules.get(country.upper())
+        compiled = self.registry.countries().get(country.upper())
+        return compiled.rules if compiled else None
     
     def get_family_requirements(
         self,
@@ -199,9 +449,101 @@ class ComplianceValidator:
         Returns:
             Family requirements dictionary
         """
-        country_rules = self.rules.get(country.upper(), {})
+        country_rules = self.get_country_rules(country) or {}
         return country_rules.get(family.lower(), {})
     
+    def get_mandatory_translations(
+        self,
+        family: str,
+        countries: Optional[List[str]] = None
+    ) -> Dict[str, List[str]]:
+        """
+        Get multilingual fields and the languages they must be translated into.
+        
+        Collected from critical requirements with translation_mandatory and a
+        language-suffixed field path (e.g., "title_short.pt").
+        
+        Args:
+            family: Product family
+            countries: Country codes to consider (default: all available)
+            
+        Returns:
+            Dictionary {field: [languages]}, e.g. {"title_short": ["es", "it", "pt"]}
+        """
+        mandatory: Dict[str, set] = {}
+        compiled_countries = self.registry.countries()
+        
+        for country in countries or list(compiled_countries):
+            compiled = compiled_countries.get(country.upper())
+            if compiled is None:
+                continue
+            
+            family_rules = compiled.families.get(self._resolve_family(compiled.rules, family))
+            if family_rules is None:
+                continue
+            
+            for field, langs in family_rules.mandatory_translations.items():
+                mandatory.setdefault(field, set()).update(langs)
+        
+        return {field: sorted(langs) for field, langs in mandatory.items()}
+    
+    def get_rule_fields(self, countries: Optional[List[str]] = None) -> List[str]:
+        """
+        Get top-level product fields referenced by any requirement.
+        
+        Args:
+            countries: Country codes to consider (default: all available)
+            
+        Returns:
+            Sorted list of field names (e.g., ["allergens_present", "title_short"])
+        """
+        fields = set()
+        compiled_countries = self.registry.countries()
+        
+        for country in countries or list(compiled_countries):
+            compiled = compiled_countries.get(country.upper())
+            if compiled is None:
+                continue
+            
+            for family_rules in compiled.families.values():
+                for requirement in family_rules.critical + family_rules.optional:
+                    fields.add(requirement.path[0])
+        
+        return sorted(fields)
+    
+    def get_field_dependencies(self) -> Dict[str, Set[str]]:
+        """
+        Map each product field to the countries whose rules reference it.
+        
+        "family" maps to every country, since it selects the ruleset.
+        
+        Returns:
+            Dictionary {field: {country_code, ...}}
+        """
+        dependencies: Dict[str, Set[str]] = {}
+        compiled_countries = self.registry.countries()
+        
+        for country, compiled in compiled_countries.items():
+            dependencies.setdefault('family', set()).add(country)
+            for family_rules in compiled.families.values():
+                for requirement in family_rules.critical + family_rules.optional:
+                    dependencies.setdefault(requirement.path[0], set()).add(country)
+        
+        return dependencies
+    
+    def get_rules_version(self, country: str) -> Optional[str]:
+        """
+        Get the content hash of a country's rules file.
+        
+        Args:
+            country: Country code
+            
+        Returns:
+            SHA-1 hex digest, or None if the country has no rules
+        """
+        compiled = self.registry.countries().get(country.upper())
+        return compiled.version if compiled else None
+    
     def get_available_countries(self) -> List[str]:
         """
         Get list of available countries.
@@ -209,7 +551,7 @@ class ComplianceValidator:
         Returns:
             List of country codes
         """
-        return list(self.rules.keys())
+        return list(self.registry.countries().keys())
     
     def validate_multiple_countries(
         self,
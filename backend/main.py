@@ -1,10 +1,12 @@
 """Main FastAPI application for Revisiones-Traducciones-Ultimate."""
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+import math
 import os
 import sys
+import time
 
 # Add parent directory to path if running from backend directory
 # This allows running the backend standalone from within the backend/ folder
@@ -17,7 +19,7 @@ if current_file.parent.name == "backend" and (current_file.parent.parent / "back
         sys.path.insert(0, str(parent_dir))
 
 from backend.config import settings
-from backend.database import init_db
+from backend.database import init_db, SessionLocal, read_engines, LAST_WRITE_COOKIE
 
 
 @asynccontextmanager
@@ -33,10 +35,33 @@ async def lifespan(app: FastAPI):
     init_db()
     print("✅ Database initialized")
     
+    # Bring the compliance index up to date and follow rules file changes
+    ComplianceStatusManager.watch_rules(SessionLocal)
+    ComplianceStatusManager.start_background_sync(SessionLocal)
+    
+    # Create the full-text search index and index products missing from it
+    ProductSearchIndex.start_background_sync(SessionLocal)
+    
+    # Index EANs of products created outside ProductSheetManager (seed data)
+    EanIndex.start_background_sync(SessionLocal)
+    
+    # Completion bits of products created before they existed (seed data)
+    completion_rebuild = ProductCompletion.start_background_rebuild(SessionLocal)
+    
+    # Dashboard counters (first start only), once completion percentages are final
+    CatalogCounters.start_background_rebuild(SessionLocal, after=completion_rebuild)
+    
+    # Pick up glossary / translation memory edits without restarting
+    routes_translations.translation_engine.start_auto_reload(settings.translation_reload_interval)
+    
     yield
     
     # Shutdown
     print("👋 Shutting down Revisiones-Traducciones-Ultimate...")
+    
+    # Compact translation memory journal into the JSON snapshot
+    routes_translations.translation_engine.stop_auto_reload()
+    routes_translations.translation_engine.flush()
 
 
 # Create FastAPI application
@@ -58,6 +83,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """
+    Mark clients that just wrote so get_read_db sends their reads to the primary.
+    
+    Successful non-GET requests set the last_write cookie (lasting
+    READ_YOUR_WRITES_SECONDS), except read-only ones served by get_read_db
+    (e.g. compliance validation); responses of routes using get_read_db
+    carry X-DB-Source: primary|replica.
+    """
+    response = await call_next(request)
+    db_source = getattr(request.state, "db_source", None)
+    
+    if (read_engines and db_source is None and response.status_code < 400
+            and request.method not in ("GET", "HEAD", "OPTIONS")):
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            f"{time.time():.3f}",
+            max_age=max(1, math.ceil(settings.read_your_writes_seconds)),
+            httponly=True,
+            samesite="lax",
+        )
+    
+    if db_source:
+        response.headers["X-DB-Source"] = db_source
+    
+    return response
+
+
 # Serve uploaded files
 if os.path.exists(settings.upload_dir):
     app.mount("/uploads", StaticFiles(directory=settings.upload_dir), name="uploads")
@@ -90,8 +145,14 @@ from api import (
     routes_legal, 
     routes_translations,
     routes_import_export,
-    routes_images
+    routes_images,
+    routes_admin
 )
+from core.compliance_status_manager import ComplianceStatusManager
+from core.product_search_index import ProductSearchIndex
+from core.ean_index import EanIndex
+from core.product_completion import ProductCompletion
+from core.catalog_counters import CatalogCounters
 
 app.include_router(routes_products.router, prefix="/api/products", tags=["products"])
 app.include_router(routes_versions.router, prefix="/api", tags=["versions"])
@@ -99,6 +160,7 @@ app.include_router(routes_legal.router, prefix="/api/legal", tags=["legal"])
 app.include_router(routes_translations.router)  # Ya tiene prefix en el router
 app.include_router(routes_import_export.router)  # Ya tiene prefix en el router
 app.include_router(routes_images.router)  # Ya tiene prefix en el router
+app.include_router(routes_admin.router, prefix="/api/admin", tags=["admin"])
 
 
 if __name__ == "__main__":
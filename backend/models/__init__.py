@@ -4,7 +4,13 @@ from .product_sheet import (
     ProductVersion,
     ProductChangelog,
     LegalRule,
-    Preset
+    Preset,
+    ProductCompliance,
+    ProductEan,
+    ProductSearchEntry,
+    ProductCounter,
+    SnapshotBlob,
+    TranslationMemoryEntry
 )
 
 __all__ = [
@@ -13,4 +19,10 @@ __all__ = [
     "ProductChangelog",
     "LegalRule",
     "Preset",
+    "ProductCompliance",
+    "ProductEan",
+    "ProductSearchEntry",
+    "ProductCounter",
+    "SnapshotBlob",
+    "TranslationMemoryEntry",
 ]
@@ -3,6 +3,7 @@ from datetime import datetime
 from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, JSON, Index
 import uuid
 from backend.database import Base
+from models.types import json_column
 
 
 def generate_uuid():
@@ -29,7 +30,7 @@ class ProductSheet(Base):
     
     # Multilingual Titles and Descriptions
     title_short = Column(JSON, default=dict)  # {es, pt, it, en, fr, br}
-    description_detailed = Column(JSON, default=dict)  # {es, pt, it, en, fr, br}
+    description_detailed = Column(json_column("products.description_detailed"), default=dict)  # {es, pt, it, en, fr, br}
     
     # Regulatory Metadata
     made_in = Column(JSON, default=dict)  # {country_code, made_in_text{es,pt,it,en,br}}
@@ -53,7 +54,7 @@ class ProductSheet(Base):
     packaging_languages = Column(JSON, default=list)  # [ES, PT, IT, EN]
     
     # Label Positions (6 positions with multilingual content)
-    label_positions = Column(JSON, default=dict)  # {frontal, trasera, lateral_izq, lateral_dcha, superior, inferior}
+    label_positions = Column(json_column("products.label_positions"), default=dict)  # {frontal, trasera, lateral_izq, lateral_dcha, superior, inferior}
     
     # Pictograms and PAO
     pictograms = Column(JSON, default=list)  # Array of pictogram IDs
@@ -67,20 +68,20 @@ class ProductSheet(Base):
     allergens_free_from = Column(JSON, default=list)
     
     # Mode of Use
-    mode_of_use = Column(JSON, default=dict)  # {es, pt, it}
+    mode_of_use = Column(json_column("products.mode_of_use"), default=dict)  # {es, pt, it}
     application_frequency = Column(String(100))
     application_area = Column(String(200))
     
     # Warnings and Precautions
-    general_warnings = Column(JSON, default=dict)  # {es, pt, it}
-    specific_warnings = Column(JSON, default=dict)  # {pregnancy, lactation, children}
-    storage_conditions = Column(JSON, default=dict)  # {es, pt, it}
+    general_warnings = Column(json_column("products.general_warnings"), default=dict)  # {es, pt, it}
+    specific_warnings = Column(json_column("products.specific_warnings"), default=dict)  # {pregnancy, lactation, children}
+    storage_conditions = Column(json_column("products.storage_conditions"), default=dict)  # {es, pt, it}
     storage_temperature_min = Column(Integer)
     storage_temperature_max = Column(Integer)
     
     # Marketing
-    key_benefits = Column(JSON, default=dict)  # {es, pt, it}
-    marketing_claims = Column(JSON, default=dict)  # {es, pt, it}
+    key_benefits = Column(json_column("products.key_benefits"), default=dict)  # {es, pt, it}
+    marketing_claims = Column(json_column("products.marketing_claims"), default=dict)  # {es, pt, it}
     validated_claims = Column(Boolean, default=False)
     scientific_backing = Column(JSON, default=list)  # Array of URLs
     
@@ -96,6 +97,7 @@ class ProductSheet(Base):
     # Status and Completion
     status = Column(String(20), default="draft", index=True)  # draft, in_review, approved, published
     completion_percentage = Column(Integer, default=0)
+    completion_fields = Column(Integer)  # Filled-field bits (see core.product_completion)
     
     # Audit Fields
     created_date = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -107,10 +109,22 @@ class ProductSheet(Base):
     __table_args__ = (
         Index('idx_products_created_date', 'created_date'),
         Index('idx_products_family_status', 'family', 'status'),
+        # Keyset pagination (sort field, sku)
+        Index('idx_products_created_sku', 'created_date', 'sku'),
+        Index('idx_products_updated_sku', 'updated_date', 'sku'),
+        Index('idx_products_completion_sku', 'completion_percentage', 'sku'),
     )
     
-    def to_dict(self):
-        """Convert model to dictionary."""
+    def to_dict(self, fields=None):
+        """
+        Convert model to dictionary.
+        
+        Args:
+            fields: Only serialize these columns (others may be deferred)
+        """
+        if fields is not None:
+            return {field: self._serialize(getattr(self, field)) for field in fields}
+        
         return {
             'sku': self.sku,
             'ean_list': self.ean_list,
@@ -167,6 +181,11 @@ class ProductSheet(Base):
             'updated_date': self.updated_date.isoformat() if self.updated_date else None,
             'updated_by': self.updated_by,
         }
+    
+    @staticmethod
+    def _serialize(value):
+        """Serialize a column value (datetimes as ISO strings)."""
+        return value.isoformat() if isinstance(value, datetime) else value
 
 
 class ProductVersion(Base):
@@ -186,16 +205,24 @@ class ProductVersion(Base):
     # PostgreSQL's JSONB provides better performance with indexing and efficient querying.
     # For production deployments with complex JSON queries, consider using PostgreSQL.
     # SQLite's JSON support is less feature-rich and may impact query performance.
-    complete_snapshot = Column(JSON, nullable=False)  # Complete state of product at this version
+    # Never queried with JSON operators: can be stored compressed (JSON_COMPRESSED_COLUMNS).
+    complete_snapshot = Column(json_column("product_versions.complete_snapshot"), nullable=False)  # Complete state of product at this version
+    # Delta storage: "delta" rows keep JSON patch operations against base_version_id
+    # in complete_snapshot (see VersionManager); "full"/"blob"/NULL rows are keyframes
+    snapshot_format = Column(String(10))
+    base_version_id = Column(String(36))
+    delta_depth = Column(Integer)  # Deltas since the last keyframe (0 for keyframes)
+    # "blob" rows keep only volatile audit fields in complete_snapshot, the rest in SnapshotBlob
+    blob_hash = Column(String(64))
     
     __table_args__ = (
         Index('idx_versions_sku_number', 'sku', 'version_number'),
         Index('idx_versions_sku_date', 'sku', 'snapshot_date'),
     )
     
-    def to_dict(self):
-        """Convert model to dictionary."""
-        return {
+    def to_dict(self, include_snapshot: bool = True):
+        """Convert model to dictionary (include_snapshot=False: metadata only)."""
+        data = {
             'version_id': str(self.version_id),
             'sku': self.sku,
             'version_number': self.version_number,
@@ -204,8 +231,10 @@ class ProductVersion(Base):
             'snapshot_date': self.snapshot_date.isoformat() if self.snapshot_date else None,
             'created_by': self.created_by,
             'change_summary': self.change_summary,
-            'complete_snapshot': self.complete_snapshot,
         }
+        if include_snapshot:
+            data['complete_snapshot'] = self.complete_snapshot
+        return data
 
 
 class ProductChangelog(Base):
@@ -219,7 +248,7 @@ class ProductChangelog(Base):
     version_to = Column(String(20), nullable=False)
     changed_by = Column(String(100))
     changed_date = Column(DateTime, default=datetime.utcnow, nullable=False)
-    changes_array = Column(JSON, nullable=False)  # Array of field-level changes
+    changes_array = Column(json_column("product_changelog.changes_array"), nullable=False)  # Array of field-level changes
     change_summary = Column(Text)
     
     __table_args__ = (
@@ -275,6 +304,149 @@ class LegalRule(Base):
         }
 
 
+class ProductCompliance(Base):
+    """Persisted compliance status of a product in one country."""
+    
+    __tablename__ = "product_compliance"
+    
+    sku = Column(String(50), primary_key=True)
+    country = Column(String(20), primary_key=True)  # Rules key (PORTUGAL, ITALY, SPAIN)
+    family = Column(String(100))  # Rules family the product was validated against
+    status = Column(String(20), nullable=False)  # COMPLIANT, WARNING, NON_COMPLIANT, ERROR
+    percentage = Column(Integer, nullable=False, default=0)
+    critical_issues = Column(Integer, nullable=False, default=0)
+    warnings = Column(Integer, nullable=False, default=0)
+    missing_fields = Column(JSON, default=list)
+    rules_version = Column(String(40), nullable=False)  # SHA-1 of the rules YAML used
+    validated_date = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_compliance_country_status', 'country', 'status'),
+        Index('idx_compliance_country_percentage', 'country', 'percentage'),
+        Index('idx_compliance_country_version', 'country', 'rules_version'),
+    )
+    
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'sku': self.sku,
+            'country': self.country,
+            'family': self.family,
+            'status': self.status,
+            'percentage': self.percentage,
+            'critical_issues': self.critical_issues,
+            'warnings': self.warnings,
+            'missing_fields': self.missing_fields,
+            'rules_version': self.rules_version,
+            'validated_date': self.validated_date.isoformat() if self.validated_date else None,
+        }
+
+
+class ProductEan(Base):
+    """EAN -> SKU lookup row (one per EAN in ProductSheet.ean_list)."""
+
+    __tablename__ = "product_eans"
+
+    ean = Column(String(20), primary_key=True)  # Unique: an EAN identifies one product
+    sku = Column(String(50), nullable=False, index=True)
+    position = Column(Integer, nullable=False, default=0)  # Index in ean_list (0 = primary)
+
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'ean': self.ean,
+            'sku': self.sku,
+            'position': self.position,
+        }
+
+
+class ProductSearchEntry(Base):
+    """
+    Full-text search index entry of a product.
+
+    The searchable document lives next to it: the product_search_fts FTS5
+    table (rowid = id) on SQLite, a tsvector `document` column with a GIN
+    index on PostgreSQL. Both are created by ProductSearchIndex.ensure_schema.
+    """
+
+    __tablename__ = "product_search"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    sku = Column(String(50), nullable=False, unique=True, index=True)
+    indexed_date = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ProductCounter(Base):
+    """
+    Materialized catalog counter (see core.catalog_counters).
+
+    dimension: total, family_status, completion or language; key: the
+    counted value ("family\tstatus" for family_status).
+    """
+
+    __tablename__ = "product_counters"
+
+    dimension = Column(String(20), primary_key=True)
+    key = Column(String(150), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class SnapshotBlob(Base):
+    """
+    Content-addressed version snapshot payload (see core.snapshot_blob_store).
+
+    kind "state": a product state without volatile audit fields, with large
+    field values replaced by {"$blob": hash} references; refcount counts
+    the versions using it. kind "value": one large field value; refcount
+    counts the state blobs using it.
+    """
+
+    __tablename__ = "snapshot_blobs"
+
+    hash = Column(String(64), primary_key=True)  # SHA-256 of the canonical JSON
+    kind = Column(String(10), nullable=False)
+    payload = Column(json_column("snapshot_blobs.payload"), nullable=False)
+    size = Column(Integer, nullable=False)  # Bytes of the canonical payload
+    logical_size = Column(Integer, nullable=False)  # Bytes with references expanded
+    refcount = Column(Integer, nullable=False, default=0)
+    created_date = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class TranslationMemoryEntry(Base):
+    """Translation memory entry shared by every worker process."""
+    
+    __tablename__ = "translation_memory"
+    
+    entry_id = Column(String(36), primary_key=True, default=generate_uuid)
+    lang_pair = Column(String(10), nullable=False)  # es-pt, es-it
+    # SHA-256 of source_text: unique key that stays within index size limits for long texts
+    source_hash = Column(String(64), nullable=False)
+    source_text = Column(Text, nullable=False)
+    translations = Column(JSON, nullable=False, default=list)
+    count = Column(Integer, nullable=False, default=1)
+    confidence = Column(Float, nullable=False, default=0.95)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_tm_pair_hash', 'lang_pair', 'source_hash', unique=True),
+        Index('idx_tm_updated_at', 'updated_at'),
+    )
+    
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'entry_id': str(self.entry_id),
+            'lang_pair': self.lang_pair,
+            'source_text': self.source_text,
+            'translations': list(self.translations or []),
+            'count': self.count,
+            'confidence': self.confidence,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
 class Preset(Base):
     """Preset values for product families."""
     
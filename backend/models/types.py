@@ -0,0 +1,164 @@
+"""Custom column types."""
+import json
+import zlib
+from typing import Any, Optional
+from sqlalchemy import JSON, LargeBinary
+from sqlalchemy.types import TypeDecorator
+from backend.config import settings
+
+try:
+    import zstandard
+except ImportError:  # Optional: zlib is used instead
+    zstandard = None
+
+
+# Header of compressed values: NUL never starts a JSON text, so values
+# without it are plain JSON (uncompressed or written before compression)
+MAGIC = b"\x00CJ"
+CODEC_ZLIB = b"z"
+CODEC_ZSTD = b"s"
+CODEC_NAMES = {CODEC_ZLIB: "zlib", CODEC_ZSTD: "zstd"}
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 6
+
+# "table.column" of every column declared with json_column()
+COMPRESSIBLE_COLUMNS = []
+
+
+def preferred_codec() -> Optional[bytes]:
+    """
+    Codec used for new values according to JSON_COMPRESSION.
+
+    Returns:
+        CODEC_ZSTD, CODEC_ZLIB or None (store plain JSON)
+    """
+    mode = settings.json_compression.lower()
+    if mode == "none":
+        return None
+    if mode in ("zstd", "auto") and zstandard is not None:
+        return CODEC_ZSTD
+    return CODEC_ZLIB
+
+
+def encoded_codec(raw: Any) -> Optional[bytes]:
+    """
+    Codec of a stored value.
+
+    Args:
+        raw: Column value as returned by the driver (bytes, memoryview or legacy str)
+
+    Returns:
+        CODEC_ZSTD, CODEC_ZLIB or None (plain JSON)
+    """
+    if isinstance(raw, str):
+        return None
+    raw = bytes(raw)
+    return raw[len(MAGIC):len(MAGIC) + 1] if raw.startswith(MAGIC) else None
+
+
+def plain_json(value: Any) -> bytes:
+    """Encode a value as compact UTF-8 JSON (uncompressed)."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_json(value: Any, codec: Optional[bytes] = None, min_bytes: Optional[int] = None) -> bytes:
+    """
+    Encode a value as (possibly compressed) JSON bytes.
+
+    Args:
+        value: JSON-compatible value
+        codec: Codec to use (default preferred_codec())
+        min_bytes: Smaller JSON is stored uncompressed (default JSON_COMPRESSION_MIN_BYTES)
+
+    Returns:
+        MAGIC + codec + compressed JSON, or plain UTF-8 JSON (small or
+        incompressible values)
+    """
+    data = plain_json(value)
+    codec = preferred_codec() if codec is None else codec
+    min_bytes = settings.json_compression_min_bytes if min_bytes is None else min_bytes
+
+    if codec is None or len(data) < min_bytes:
+        return data
+    if codec == CODEC_ZSTD:
+        compressed = MAGIC + CODEC_ZSTD + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    else:
+        compressed = MAGIC + CODEC_ZLIB + zlib.compress(data, ZLIB_LEVEL)
+
+    # Incompressible values are kept plain
+    return compressed if len(compressed) < len(data) else data
+
+
+def decode_json(raw: Any) -> Any:
+    """
+    Decode a stored value written by encode_json or by the plain JSON type.
+
+    Args:
+        raw: Column value as returned by the driver (bytes, memoryview or legacy str)
+
+    Returns:
+        Decoded value
+
+    Raises:
+        ValueError: If the value uses zstd and zstandard is not installed
+    """
+    if isinstance(raw, str):
+        return json.loads(raw)
+
+    raw = bytes(raw)
+    if not raw.startswith(MAGIC):
+        return json.loads(raw)
+
+    codec = raw[len(MAGIC):len(MAGIC) + 1]
+    payload = raw[len(MAGIC) + 1:]
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("Value compressed with zstd: install zstandard to read it")
+        return json.loads(zstandard.ZstdDecompressor().decompress(payload))
+    return json.loads(zlib.decompress(payload))
+
+
+class CompressedJSON(TypeDecorator):
+    """
+    JSON column stored compressed (zlib, or zstd when zstandard is installed).
+
+    Drop-in replacement for JSON on columns that are never queried with
+    JSON operators in SQL, enabled per column (see json_column). Values of
+    JSON_COMPRESSION_MIN_BYTES or more are stored as MAGIC + codec +
+    compressed data, smaller ones as plain JSON bytes. Plain JSON written
+    before the column was switched (TEXT on SQLite, bytea converted by
+    compress_json_columns.py on PostgreSQL) is still read. Existing rows are
+    compressed by core.json_reencoder.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        """Encode on write (None stays NULL)."""
+        if value is None:
+            return None
+        return encode_json(value)
+
+    def process_result_value(self, value, dialect):
+        """Decode on read."""
+        if value is None:
+            return None
+        return decode_json(value)
+
+
+def json_column(key: str):
+    """
+    Type of a JSON column that can be stored compressed.
+    
+    Args:
+        key: "table.column"; compressed if listed in JSON_COMPRESSED_COLUMNS
+        
+    Returns:
+        CompressedJSON instance if enabled, else JSON
+    """
+    COMPRESSIBLE_COLUMNS.append(key)
+    enabled = settings.json_compressed_columns_list
+    
+    return CompressedJSON() if key in enabled or "*" in enabled else JSON()
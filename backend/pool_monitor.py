@@ -0,0 +1,196 @@
+"""Connection pool instrumentation: checkout wait and hold times per engine."""
+import bisect
+import threading
+import time
+from typing import List, Dict, Optional, Any
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+# Histogram bucket upper bounds, in milliseconds (last bucket: above the last bound)
+HISTOGRAM_BOUNDS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000, 30000)
+
+# Engine name -> PoolStats (engines attached with PoolStats.attach)
+_registry: Dict[str, "PoolStats"] = {}
+_registry_lock = threading.Lock()
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (thread safe)."""
+
+    def __init__(self, bounds_ms=HISTOGRAM_BOUNDS_MS):
+        """Initialize empty histogram with bucket upper bounds in ms."""
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """Record one duration."""
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+            self.total += 1
+            self.sum_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Bucket counts keyed by upper bound ("le_<ms>", "gt_<ms>" for the last one)."""
+        with self._lock:
+            buckets = {f"le_{bound}ms": count for bound, count in zip(self.bounds_ms, self.counts)}
+            buckets[f"gt_{self.bounds_ms[-1]}ms"] = self.counts[-1]
+            return {
+                "count": self.total,
+                "avg_ms": round(self.sum_ms / self.total, 3) if self.total else 0.0,
+                "max_ms": round(self.max_ms, 3),
+                "buckets": buckets,
+            }
+
+
+class PoolStats:
+    """
+    Statistics of one engine's connection pool.
+
+    - wait: time spent waiting for a connection (MonitoredQueuePool only)
+    - hold: time between checkout and checkin
+    - open checkouts with their thread, to spot connections held longer
+      than long_held_seconds (leaked sessions, slow requests)
+    """
+
+    def __init__(self, name: str, engine, long_held_seconds: float):
+        """
+        Initialize statistics for an engine.
+
+        Args:
+            name: Engine label shown in the report
+            engine: SQLAlchemy engine
+            long_held_seconds: Hold time above which a checkout is reported
+        """
+        self.name = name
+        self.engine = engine
+        self.long_held_seconds = long_held_seconds
+        self.wait = Histogram()
+        self.hold = Histogram()
+        self.timeouts = 0
+        self.long_held_total = 0
+        self._open: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def attach(cls, engine, name: str, long_held_seconds: float = 5.0) -> "PoolStats":
+        """
+        Start collecting statistics for an engine's pool.
+
+        Args:
+            engine: SQLAlchemy engine
+            name: Engine label (one PoolStats per name)
+            long_held_seconds: Hold time above which a checkout is reported
+
+        Returns:
+            The PoolStats instance
+        """
+        stats = cls(name, engine, long_held_seconds)
+        engine.pool._pool_stats = stats
+
+        event.listen(engine, "checkout", stats._on_checkout)
+        event.listen(engine, "checkin", stats._on_checkin)
+
+        with _registry_lock:
+            _registry[name] = stats
+
+        return stats
+
+    @staticmethod
+    def all() -> List["PoolStats"]:
+        """Get statistics of every attached engine."""
+        with _registry_lock:
+            return list(_registry.values())
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        """Remember when and by which thread a connection was checked out."""
+        with self._lock:
+            self._open[id(connection_record)] = {
+                "since": time.monotonic(),
+                "thread": threading.current_thread().name,
+            }
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        """Record hold time of a returned connection."""
+        with self._lock:
+            checkout = self._open.pop(id(connection_record), None)
+        if checkout is None:
+            return
+
+        held = time.monotonic() - checkout["since"]
+        self.hold.observe(held)
+        if held > self.long_held_seconds:
+            self.long_held_total += 1
+            print(f"Warning: connection of pool '{self.name}' held {held:.1f}s by thread {checkout['thread']}")
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Current pool state and accumulated statistics.
+
+        Returns:
+            Dictionary with pool gauges (overflow is negative while the pool
+            has not opened pool_size connections yet), wait/hold histograms
+            and the connections currently held longer than long_held_seconds
+        """
+        pool = self.engine.pool
+        now = time.monotonic()
+
+        with self._lock:
+            open_checkouts = list(self._open.values())
+
+        long_held = sorted(
+            (
+                {"thread": checkout["thread"], "held_seconds": round(now - checkout["since"], 3)}
+                for checkout in open_checkouts
+                if now - checkout["since"] > self.long_held_seconds
+            ),
+            key=lambda checkout: -checkout["held_seconds"]
+        )
+
+        return {
+            "name": self.name,
+            "pool_class": type(pool).__name__,
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else len(open_checkouts),
+            "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "max_overflow": getattr(pool, "_max_overflow", None),
+            "timeouts": self.timeouts,
+            "wait": self.wait.to_dict(),
+            "hold": self.hold.to_dict(),
+            "long_held_seconds": self.long_held_seconds,
+            "long_held_total": self.long_held_total,
+            "long_held": long_held,
+        }
+
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        """Check out a connection, timing the wait."""
+        start = time.monotonic()
+        stats: Optional[PoolStats] = getattr(self, "_pool_stats", None)
+
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if stats is not None:
+                stats.timeouts += 1
+            raise
+        finally:
+            if stats is not None:
+                stats.wait.observe(time.monotonic() - start)
+
+    def recreate(self):
+        """Keep statistics across pool recreation (engine.dispose())."""
+        pool = super().recreate()
+        pool._pool_stats = getattr(self, "_pool_stats", None)
+        return pool
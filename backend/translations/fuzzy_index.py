@@ -0,0 +1,217 @@
+"""
+Fuzzy Index - Índice de candidatos para fuzzy matching en translation memory
+
+Evita ejecutar difflib.SequenceMatcher contra todas las entradas de un par de
+idiomas. Cada entrada se indexa una sola vez con:
+- Forma en minúsculas precalculada
+- Bucket por longitud
+- Conteo de caracteres (cota superior equivalente a quick_ratio)
+- Índice invertido de n-gramas de caracteres
+
+Los filtros son cotas superiores exactas del ratio de SequenceMatcher, por lo
+que los resultados son idénticos a comparar contra toda la memoria.
+"""
+
+import difflib
+import math
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+
+class FuzzyMatchIndex:
+    """
+    Índice de poda de candidatos para un par de idiomas (ej: "es-pt").
+
+    Funcionalidades:
+    - add(): Indexar un texto origen (idempotente), solo mientras se construye
+    - extended(): Índice nuevo con más textos, sin modificar este
+    - search(): Devolver (texto, ratio) con ratio >= threshold
+
+    Un índice ya publicado (visible para búsquedas) no se modifica: los
+    textos nuevos se añaden con extended() y se publica el resultado, así que
+    search() puede ejecutarse en paralelo sin copias ni locks.
+    """
+
+    # Tamaño de n-grama. Con bigramas la cota mínima de n-gramas compartidos
+    # ya es útil a partir de threshold > 2/3 (el valor por defecto es 0.75).
+    NGRAM_SIZE = 2
+
+    def __init__(self):
+        """Inicializar índice vacío."""
+        self._texts: List[str] = []
+        self._lowered: List[str] = []
+        self._char_counts: List[Counter] = []
+        self._ids: Dict[str, int] = {}
+        self._by_length: Dict[int, List[int]] = defaultdict(list)
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, text: str) -> bool:
+        return text in self._ids
+
+    def same_texts(self, texts: List[str]) -> bool:
+        """Comprobar si el índice contiene exactamente estos textos (mismo orden)."""
+        return self._texts == texts
+
+    def add(self, text: str):
+        """
+        Indexar un texto origen.
+
+        Los ids se asignan en orden de inserción para reproducir el orden de
+        iteración del dict de memory en caso de empate de ratio.
+
+        Args:
+            text: Texto origen tal como está guardado en memory
+        """
+        if text in self._ids:
+            return
+
+        entry_id = len(self._texts)
+        lowered = text.lower()
+
+        self._ids[text] = entry_id
+        self._texts.append(text)
+        self._lowered.append(lowered)
+        self._char_counts.append(Counter(lowered))
+        self._by_length[len(lowered)].append(entry_id)
+
+        for gram, count in self._ngrams(lowered).items():
+            self._postings[gram][entry_id] = count
+
+    def extended(self, texts: Iterable[str]) -> "FuzzyMatchIndex":
+        """
+        Devolver un índice nuevo con los textos añadidos (copy-on-write).
+
+        Este índice no se modifica. Las listas de entradas y los ids se
+        copian; los buckets de longitud y los postings solo si los textos
+        nuevos los tocan (el resto se comparte entre ambos índices).
+
+        Args:
+            texts: Textos origen a añadir
+
+        Returns:
+            Índice nuevo, o este mismo si ya contenía todos los textos
+        """
+        new_texts = [text for text in dict.fromkeys(texts) if text not in self._ids]
+        if not new_texts:
+            return self
+
+        index = FuzzyMatchIndex.__new__(FuzzyMatchIndex)
+        index._texts = list(self._texts)
+        index._lowered = list(self._lowered)
+        index._char_counts = list(self._char_counts)
+        index._ids = dict(self._ids)
+        index._by_length = defaultdict(list, self._by_length)
+        index._postings = defaultdict(dict, self._postings)
+
+        # Copiar lo compartido antes de que add() lo modifique
+        copied_lengths = set()
+        copied_grams = set()
+        for text in new_texts:
+            lowered = text.lower()
+            if len(lowered) not in copied_lengths:
+                index._by_length[len(lowered)] = list(self._by_length.get(len(lowered), []))
+                copied_lengths.add(len(lowered))
+            for gram in self._ngrams(lowered):
+                if gram not in copied_grams:
+                    index._postings[gram] = dict(self._postings.get(gram, {}))
+                    copied_grams.add(gram)
+            index.add(text)
+
+        return index
+
+    def search(self, text: str, threshold: float) -> List[Tuple[str, float]]:
+        """
+        Buscar textos indexados con similitud >= threshold.
+
+        Args:
+            text: Texto a buscar
+            threshold: Umbral mínimo de similitud
+
+        Returns:
+            Lista de tuplas (texto_original, ratio) en orden de inserción
+        """
+        query = text.lower()
+        query_len = len(query)
+        query_chars = Counter(query)
+
+        # Contar n-gramas compartidos solo para entradas que comparten alguno
+        shared_ngrams: Dict[int, int] = defaultdict(int)
+        for gram, query_count in self._ngrams(query).items():
+            for entry_id, entry_count in self._postings.get(gram, {}).items():
+                shared_ngrams[entry_id] += min(query_count, entry_count)
+
+        candidates = []
+
+        for length, entry_ids in self._by_length.items():
+            total_len = query_len + length
+
+            if total_len == 0:
+                candidates.extend(entry_ids)
+                continue
+
+            # Cota por longitud: matches <= min(len_a, len_b)
+            if 2.0 * min(query_len, length) / total_len < threshold:
+                continue
+
+            min_shared = self._min_shared_ngrams(total_len, threshold)
+
+            if min_shared <= 0:
+                candidates.extend(entry_ids)
+            else:
+                candidates.extend(
+                    entry_id for entry_id in entry_ids
+                    if shared_ngrams.get(entry_id, 0) >= min_shared
+                )
+
+        matches = []
+
+        for entry_id in sorted(candidates):
+            total_len = query_len + len(self._lowered[entry_id])
+
+            # Cota por caracteres comunes (equivalente a quick_ratio)
+            if total_len:
+                common = sum((query_chars & self._char_counts[entry_id]).values())
+                if 2.0 * common / total_len < threshold:
+                    continue
+
+            ratio = difflib.SequenceMatcher(None, query, self._lowered[entry_id]).ratio()
+
+            if ratio >= threshold:
+                matches.append((self._texts[entry_id], ratio))
+
+        return matches
+
+    def _ngrams(self, text: str) -> Counter:
+        """Multiconjunto de n-gramas de caracteres de un texto."""
+        n = self.NGRAM_SIZE
+        return Counter(text[i:i + n] for i in range(len(text) - n + 1))
+
+    def _min_shared_ngrams(self, total_len: int, threshold: float) -> int:
+        """
+        Mínimo de n-gramas compartidos que exige un ratio >= threshold.
+
+        SequenceMatcher agrupa los matches (M caracteres) en k bloques comunes
+        no adyacentes, así que k - 1 <= total_len - 2M y cada bloque de
+        longitud L aporta L - (n - 1) n-gramas compartidos:
+
+            compartidos >= M - (n - 1) * k >= M - (n - 1) * (total_len - 2M + 1)
+
+        Args:
+            total_len: len(a) + len(b)
+            threshold: Umbral mínimo de similitud
+
+        Returns:
+            Cota inferior (puede ser <= 0, en cuyo caso no poda nada)
+        """
+        # Menor M entero con 2.0 * M / total_len >= threshold
+        min_matches = max(0, math.ceil(threshold * total_len / 2))
+        while min_matches > 0 and 2.0 * (min_matches - 1) / total_len >= threshold:
+            min_matches -= 1
+        while min_matches <= total_len and 2.0 * min_matches / total_len < threshold:
+            min_matches += 1
+
+        n = self.NGRAM_SIZE
+        return min_matches - (n - 1) * (total_len - 2 * min_matches + 1)
@@ -0,0 +1,254 @@
+"""
+Glossary Index - Glossaries compilados para búsqueda en O(1) y por contenido
+
+Al cargar los glossaries se construye, por (familia, idioma destino):
+- Un dict plano término -> traducciones (todas las subfamilias aplanadas)
+- Un autómata Aho-Corasick que detecta los términos del glossary dentro de un
+  texto largo en una sola pasada lineal (ej: "uso externo" dentro de un
+  párrafo de advertencias)
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+
+@lru_cache(maxsize=256)
+def normalize_family(family: str) -> str:
+    """Normalizar family name (COSMETICS_FACIAL -> cosmetics)."""
+    return family.lower().split("_")[0] if "_" in family else family.lower()
+
+
+class TermMatcher:
+    """
+    Autómata Aho-Corasick para búsqueda multi-patrón sin distinguir mayúsculas.
+
+    Solo se aceptan coincidencias de palabra completa (sin caracteres
+    alfanuméricos pegados a izquierda o derecha).
+    """
+
+    def __init__(self, terms: List[str]):
+        """
+        Construir el autómata.
+
+        Args:
+            terms: Términos a detectar (se comparan en minúsculas)
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str]]] = [[]]
+
+        for term in terms:
+            self._add(term)
+
+        self._build_failure_links()
+
+    def _add(self, term: str):
+        """Añadir un término al trie."""
+        pattern = term.lower()
+        if not pattern:
+            return
+
+        node = 0
+        for ch in pattern:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][ch] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+
+        self._output[node].append((len(pattern), term))
+
+    def _build_failure_links(self):
+        """Calcular failure links por BFS y propagar outputs."""
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+
+                candidate = self._goto[fail].get(ch, 0)
+                self._fail[child] = candidate if candidate != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Buscar términos dentro de un texto.
+
+        Args:
+            text: Texto donde buscar
+
+        Returns:
+            Lista de (inicio, fin, término) sin solapamientos, eligiendo la
+            coincidencia más a la izquierda y, a igualdad, la más larga
+        """
+        matches = []
+        positions = []  # posición en minúsculas -> índice en el texto original
+        node = 0
+
+        for index, original_ch in enumerate(text):
+            for ch in original_ch.lower():
+                positions.append(index)
+
+                while node and ch not in self._goto[node]:
+                    node = self._fail[node]
+                node = self._goto[node].get(ch, 0)
+
+                for length, term in self._output[node]:
+                    start = positions[len(positions) - length]
+                    end = index + 1
+                    if self._is_word_boundary(text, start, end):
+                        matches.append((start, end, term))
+
+        matches.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+
+        selected = []
+        last_end = 0
+        for start, end, term in matches:
+            if start >= last_end:
+                selected.append((start, end, term))
+                last_end = end
+
+        return selected
+
+    @staticmethod
+    def _is_word_boundary(text: str, start: int, end: int) -> bool:
+        """Comprobar que la coincidencia no está pegada a otra palabra."""
+        if start > 0 and text[start - 1].isalnum():
+            return False
+        if end < len(text) and text[end].isalnum():
+            return False
+        return True
+
+
+class GlossaryIndex:
+    """
+    Glossaries compilados por (familia normalizada, idioma destino).
+
+    Funcionalidades:
+    - lookup(): Traducciones de un término exacto
+    - terms(): Dict plano término -> traducciones
+    - find_terms(): Términos del glossary contenidos en un texto largo
+    - updated(): Nuevo índice recompilando solo los glossaries modificados
+
+    El índice no se modifica tras construirse: una recarga crea uno nuevo y lo
+    sustituye con una única asignación.
+    """
+
+    def __init__(self, glossaries: Dict, previous: Optional["GlossaryIndex"] = None,
+                 changed_keys: Optional[set] = None):
+        """
+        Compilar glossaries.
+
+        Args:
+            glossaries: Dict {family: {lang: {subfamily: {term: translation}}}}
+            previous: Índice anterior cuyas entradas no modificadas se reutilizan
+            changed_keys: Claves (family, lang) a recompilar cuando hay previous
+        """
+        self.glossaries = glossaries
+        self._terms: Dict[Tuple[str, str], Dict[str, List[str]]] = {}
+        self._matchers: Dict[Tuple[str, str], TermMatcher] = {}
+
+        for family, langs in glossaries.items():
+            for lang, glossary in (langs or {}).items():
+                key = (family, lang)
+
+                if previous is not None and key not in (changed_keys or set()) and key in previous._terms:
+                    self._terms[key] = previous._terms[key]
+                    self._matchers[key] = previous._matchers[key]
+                    continue
+
+                flat = self._flatten(glossary or {})
+                self._terms[key] = flat
+                self._matchers[key] = TermMatcher([t for t in flat if isinstance(t, str)])
+
+    def updated(self, glossaries: Dict, changed_keys: set) -> "GlossaryIndex":
+        """
+        Crear un índice nuevo recompilando solo las claves modificadas.
+
+        Args:
+            glossaries: Dict completo de glossaries tras la recarga
+            changed_keys: Claves (family, lang) añadidas, modificadas o eliminadas
+
+        Returns:
+            Nuevo GlossaryIndex
+        """
+        return GlossaryIndex(glossaries, previous=self, changed_keys=changed_keys)
+
+    def lookup(self, source_text: str, family: str, target_lang: str) -> List[str]:
+        """
+        Traducciones de un término exacto.
+
+        Args:
+            source_text: Término a buscar
+            family: Familia de producto (COSMETICS_FACIAL, cosmetics, etc.)
+            target_lang: Idioma destino
+
+        Returns:
+            Lista de traducciones en orden de subfamilia
+        """
+        return list(self.terms(family, target_lang).get(source_text, []))
+
+    def terms(self, family: str, target_lang: str) -> Dict[str, List[str]]:
+        """
+        Dict plano término -> traducciones para familia e idioma.
+
+        Args:
+            family: Familia de producto
+            target_lang: Idioma destino
+
+        Returns:
+            Dict {término: [traducciones]} (vacío si no hay glossary)
+        """
+        return self._terms.get((normalize_family(family), target_lang), {})
+
+    def find_terms(self, text: str, family: str, target_lang: str) -> List[Dict]:
+        """
+        Detectar términos del glossary dentro de un texto.
+
+        Args:
+            text: Texto origen (puede ser un párrafo completo)
+            family: Familia de producto
+            target_lang: Idioma destino
+
+        Returns:
+            Lista de dicts {term, matched_text, translations, start, end}
+        """
+        key = (normalize_family(family), target_lang)
+        matcher: Optional[TermMatcher] = self._matchers.get(key)
+
+        if matcher is None:
+            return []
+
+        terms = self._terms[key]
+
+        return [
+            {
+                "term": term,
+                "matched_text": text[start:end],
+                "translations": list(terms[term]),
+                "start": start,
+                "end": end,
+            }
+            for start, end, term in matcher.find(text)
+        ]
+
+    @staticmethod
+    def _flatten(glossary: Dict) -> Dict[str, List[str]]:
+        """Aplanar subfamilias en término -> traducciones (orden de subfamilia)."""
+        flat: Dict[str, List[str]] = {}
+
+        for subfamily, terms in glossary.items():
+            if isinstance(terms, dict):
+                for term, translation in terms.items():
+                    flat.setdefault(term, []).append(translation)
+
+        return flat
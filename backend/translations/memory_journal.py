@@ -0,0 +1,220 @@
+"""
+Memory Journal - Persistencia incremental de translation memory
+
+En lugar de reescribir translation_memory.json en cada guardado:
+- append(): Añade la entrada modificada al journal (JSONL, fsync)
+- replay(): Aplica el journal sobre el snapshot al arrancar
+- compact(): Escribe un snapshot atómico (temp + rename) y recorta el journal
+
+Cada línea del journal contiene el estado completo de la entrada, por lo que
+aplicar el journal varias veces sobre el mismo snapshot es idempotente.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+
+class MemoryJournal:
+    """
+    Write-ahead journal para translation memory.
+
+    Estructura en disco:
+    backend/translations/
+        ├── translation_memory.json            (snapshot)
+        └── translation_memory.journal.jsonl   (guardados posteriores)
+    """
+
+    def __init__(self,
+                 snapshot_path: Path,
+                 memory_provider: Callable[[], Dict],
+                 compact_every: int = 500,
+                 compact_in_background: bool = True):
+        """
+        Inicializar MemoryJournal.
+
+        Args:
+            snapshot_path: Ruta al snapshot JSON de memory
+            memory_provider: Devuelve el dict de memory vigente (para compactar)
+            compact_every: Número de entradas de journal que disparan compactación
+            compact_in_background: Compactar en un hilo en lugar de en el guardado
+        """
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = self.snapshot_path.with_suffix(".journal.jsonl")
+        self.memory_provider = memory_provider
+        self.compact_every = compact_every
+        self.compact_in_background = compact_in_background
+        self.pending_entries = 0
+
+        # Firma (mtime, tamaño) del último snapshot leído o escrito por este proceso
+        self.snapshot_signature = file_signature(self.snapshot_path)
+
+        self.lock = threading.RLock()
+        self._compaction_thread: Optional[threading.Thread] = None
+
+    def replay(self, memory: Dict) -> int:
+        """
+        Aplicar las entradas del journal sobre memory (in place).
+
+        Una última línea truncada (caída durante el append) se descarta.
+
+        Args:
+            memory: Dict de memory cargado desde el snapshot
+
+        Returns:
+            Número de entradas aplicadas
+        """
+        if not self.journal_path.exists():
+            return 0
+
+        applied = 0
+
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+
+                try:
+                    record = json.loads(line)
+                    memory.setdefault(record["lang_pair"], {})[record["source_text"]] = record["entry"]
+                    applied += 1
+                except (ValueError, KeyError) as e:
+                    print(f"Skipping corrupt journal line {line_number}: {e}")
+
+        self.pending_entries = applied
+        return applied
+
+    def append(self, lang_pair: str, source_text: str, entry: Dict):
+        """
+        Añadir una entrada al journal y compactar si se supera el umbral.
+
+        Args:
+            lang_pair: Par de idiomas (ej: "es-pt")
+            source_text: Texto origen
+            entry: Estado completo de la entrada tras el guardado
+        """
+        record = {"lang_pair": lang_pair, "source_text": source_text, "entry": entry}
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+
+        with self.lock:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+
+            with open(self.journal_path, 'a', encoding='utf-8', newline='') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+            self.pending_entries += 1
+            should_compact = self.pending_entries >= self.compact_every
+
+        if should_compact:
+            self.schedule_compaction()
+
+    def schedule_compaction(self):
+        """Lanzar compactación (en background si está configurado)."""
+        if not self.compact_in_background:
+            self.compact()
+            return
+
+        with self.lock:
+            if self._compaction_thread and self._compaction_thread.is_alive():
+                return
+
+            self._compaction_thread = threading.Thread(
+                target=self.compact, daemon=True
+            )
+            self._compaction_thread.start()
+
+    def compact(self):
+        """
+        Escribir snapshot atómico y eliminar del journal lo ya incluido.
+
+        El snapshot se serializa bajo lock (estado consistente); la escritura
+        a disco se hace fuera del lock para no bloquear los guardados. Si el
+        snapshot fue modificado por otro proceso, se aplaza hasta la recarga.
+        """
+        with self.lock:
+            if file_signature(self.snapshot_path) != self.snapshot_signature:
+                # El snapshot cambió fuera de este proceso: no pisarlo hasta recargarlo
+                print("Translation memory snapshot changed on disk; compaction deferred until reload")
+                return
+
+            content = json.dumps(self.memory_provider(), ensure_ascii=False, indent=2)
+            journal_offset = self.journal_path.stat().st_size if self.journal_path.exists() else 0
+            compacted_entries = self.pending_entries
+
+        try:
+            write_atomic(self.snapshot_path, content)
+        except Exception as e:
+            print(f"Error writing translation memory snapshot: {e}")
+            return
+
+        with self.lock:
+            self.snapshot_signature = file_signature(self.snapshot_path)
+            self._truncate_journal(journal_offset)
+            self.pending_entries -= compacted_entries
+
+    def wait(self):
+        """Esperar a que termine una compactación en curso."""
+        thread = self._compaction_thread
+        if thread and thread.is_alive():
+            thread.join()
+
+    def _truncate_journal(self, offset: int):
+        """Eliminar los primeros `offset` bytes del journal (ya en el snapshot)."""
+        if not self.journal_path.exists():
+            return
+
+        with open(self.journal_path, 'rb') as f:
+            f.seek(offset)
+            tail = f.read()
+
+        if tail:
+            write_atomic(self.journal_path, tail.decode('utf-8'))
+        else:
+            self.journal_path.unlink()
+
+
+def write_atomic(path: Path, content: str):
+    """
+    Escribir un archivo de forma atómica (temp file + fsync + rename).
+
+    Args:
+        path: Ruta destino
+        content: Contenido de texto
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """
+    Firma barata de un archivo para detectar cambios sin leerlo.
+
+    Args:
+        path: Ruta del archivo
+
+    Returns:
+        (mtime_ns, tamaño) o None si no existe
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,274 @@
+"""
+Memory Store - Almacenamiento intercambiable de translation memory
+
+TranslationEngine no accede directamente al JSON: delega en un store.
+- JsonMemoryStore: snapshot JSON + journal JSONL (un solo proceso)
+- SqlMemoryStore (sql_memory_store.py): tabla SQL compartida por todos los
+  workers, con caché LRU por proceso
+
+Formato de una entrada (igual en todos los stores):
+{
+    "translations": ["Creme Hidratante"],
+    "count": 5,
+    "confidence": 0.98,
+    "created_at": "2024-01-01T00:00:00",
+    "updated_at": "2024-01-01T00:00:00"
+}
+"""
+
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .memory_journal import MemoryJournal, file_signature
+
+
+class MemoryChanges(NamedTuple):
+    """
+    Cambios detectados por MemoryStore.poll_changes().
+
+    replaced=True: `texts` es el contenido completo por par de idiomas (los
+    pares ausentes ya no existen). replaced=False: `texts` solo contiene los
+    textos origen añadidos o modificados desde la última comprobación.
+    """
+    replaced: bool
+    texts: Dict[str, List[str]]
+
+
+class MemoryStore(ABC):
+    """
+    Interfaz de almacenamiento de translation memory.
+
+    Los stores son seguros para usar desde varios hilos.
+    """
+
+    @abstractmethod
+    def get(self, lang_pair: str, source_text: str) -> Optional[Dict]:
+        """
+        Obtener la entrada de un texto origen.
+
+        Args:
+            lang_pair: Par de idiomas (ej: "es-pt")
+            source_text: Texto origen exacto
+
+        Returns:
+            Entrada de memory o None
+        """
+
+    def get_many(self, lang_pair: str, source_texts: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Obtener varias entradas de un par de idiomas.
+
+        Returns:
+            Dict {source_text: entrada} solo con los textos existentes
+        """
+        entries = {}
+        for source_text in source_texts:
+            entry = self.get(lang_pair, source_text)
+            if entry is not None:
+                entries[source_text] = entry
+        return entries
+
+    @abstractmethod
+    def upsert(self,
+               lang_pair: str,
+               source_text: str,
+               target_text: str,
+               confidence: float) -> Tuple[Dict, bool]:
+        """
+        Crear o actualizar una entrada.
+
+        Una entrada nueva empieza con count=1; una existente incrementa count,
+        promedia confidence y añade la traducción si no estaba.
+
+        Returns:
+            Tupla (entrada resultante, True si se ha creado)
+        """
+
+    @abstractmethod
+    def source_texts(self) -> Dict[str, List[str]]:
+        """
+        Textos origen por par de idiomas (para construir índices fuzzy).
+
+        Returns:
+            Dict {lang_pair: [source_text, ...]} en orden de inserción
+        """
+
+    @abstractmethod
+    def iter_entries(self) -> Iterator[Tuple[str, str, Dict]]:
+        """
+        Recorrer todas las entradas.
+
+        Yields:
+            Tuplas (lang_pair, source_text, entrada)
+        """
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """
+        Número de textos origen por par de idiomas.
+
+        Returns:
+            Dict {lang_pair: total}
+        """
+
+    def poll_changes(self) -> Optional[MemoryChanges]:
+        """
+        Detectar cambios hechos fuera de este proceso.
+
+        Returns:
+            MemoryChanges o None si no hay cambios
+        """
+        return None
+
+    def flush(self):
+        """Persistir lo pendiente (al apagar el proceso)."""
+
+
+class JsonMemoryStore(MemoryStore):
+    """
+    Store de un solo proceso: dict en memoria + translation_memory.json + journal.
+
+    Estructura en disco:
+    backend/translations/
+        ├── translation_memory.json            (snapshot)
+        └── translation_memory.journal.jsonl   (guardados posteriores)
+    """
+
+    def __init__(self, snapshot_path: Path, compact_every: int = 500):
+        """
+        Inicializar JsonMemoryStore.
+
+        Args:
+            snapshot_path: Ruta al archivo translation_memory.json
+            compact_every: Guardados en journal antes de compactar el snapshot
+        """
+        self.snapshot_path = Path(snapshot_path)
+        self.journal = MemoryJournal(
+            self.snapshot_path,
+            memory_provider=lambda: self.memory,
+            compact_every=compact_every
+        )
+
+        self.memory: Dict[str, Dict[str, Dict]] = self._load()
+
+        if self.journal.pending_entries >= self.journal.compact_every:
+            self.journal.schedule_compaction()
+
+    def _load(self) -> Dict:
+        """Cargar el snapshot y aplicar el journal pendiente."""
+        self.journal.snapshot_signature = file_signature(self.snapshot_path)
+
+        try:
+            memory = self._read_snapshot()
+        except Exception as e:
+            print(f"Error loading translation memory: {e}")
+            return {}
+
+        try:
+            self.journal.replay(memory)
+        except Exception as e:
+            print(f"Error replaying translation memory journal: {e}")
+
+        return memory
+
+    def _read_snapshot(self) -> Dict:
+        """Leer el snapshot JSON (sin journal)."""
+        if not self.snapshot_path.exists():
+            return {}
+
+        with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def get(self, lang_pair: str, source_text: str) -> Optional[Dict]:
+        return self.memory.get(lang_pair, {}).get(source_text)
+
+    def upsert(self,
+               lang_pair: str,
+               source_text: str,
+               target_text: str,
+               confidence: float) -> Tuple[Dict, bool]:
+        # Mutar bajo el lock del journal para no interferir con una compactación o recarga
+        with self.journal.lock:
+            entries = self.memory.setdefault(lang_pair, {})
+            entry = entries.get(source_text)
+            created = entry is None
+
+            if created:
+                # Nueva entrada
+                entry = {
+                    "translations": [target_text],
+                    "count": 1,
+                    "confidence": confidence,
+                    "created_at": datetime.utcnow().isoformat(),
+                    "updated_at": datetime.utcnow().isoformat()
+                }
+                entries[source_text] = entry
+            else:
+                # Añadir traducción si no existe
+                if target_text not in entry["translations"]:
+                    entry["translations"].append(target_text)
+
+                entry["count"] = entry.get("count", 0) + 1
+                entry["updated_at"] = datetime.utcnow().isoformat()
+
+                # Actualizar confidence (promedio ponderado)
+                old_confidence = entry.get("confidence", 0.8)
+                entry["confidence"] = (old_confidence + confidence) / 2
+
+            # Persistir solo la entrada modificada (append al journal)
+            self.journal.append(lang_pair, source_text, entry)
+
+        return entry, created
+
+    def source_texts(self) -> Dict[str, List[str]]:
+        with self.journal.lock:
+            return {lang_pair: list(entries) for lang_pair, entries in self.memory.items()}
+
+    def iter_entries(self) -> Iterator[Tuple[str, str, Dict]]:
+        with self.journal.lock:
+            pairs = [(lang_pair, list(entries.items())) for lang_pair, entries in self.memory.items()]
+
+        for lang_pair, entries in pairs:
+            for source_text, entry in entries:
+                yield lang_pair, source_text, entry
+
+    def counts(self) -> Dict[str, int]:
+        with self.journal.lock:
+            return {lang_pair: len(entries) for lang_pair, entries in self.memory.items()}
+
+    def poll_changes(self) -> Optional[MemoryChanges]:
+        """Recargar el snapshot si ha cambiado fuera de este proceso."""
+        signature = file_signature(self.snapshot_path)
+
+        if signature == self.journal.snapshot_signature:
+            return None
+
+        try:
+            memory = self._read_snapshot()
+        except Exception as e:
+            # Archivo a medio escribir: se reintenta en el siguiente ciclo
+            print(f"Error reloading translation memory: {e}")
+            return None
+
+        with self.journal.lock:
+            if file_signature(self.snapshot_path) != signature:
+                # Cambió durante la lectura: se reintenta en el siguiente ciclo
+                return None
+
+            # Guardados locales aún no compactados siguen en el journal
+            self.journal.replay(memory)
+
+            self.memory = memory
+            self.journal.snapshot_signature = signature
+            texts = {lang_pair: list(entries) for lang_pair, entries in memory.items()}
+
+        return MemoryChanges(replaced=True, texts=texts)
+
+    def flush(self):
+        """Compactar el journal en translation_memory.json de forma síncrona."""
+        self.journal.wait()
+        if self.journal.pending_entries > 0:
+            self.journal.compact()
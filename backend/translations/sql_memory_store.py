@@ -0,0 +1,356 @@
+"""
+SQL Memory Store - Translation memory compartida entre procesos
+
+Guarda la memory en la tabla translation_memory de la base de datos de la
+aplicación (SQLite o PostgreSQL), de modo que todos los workers de uvicorn
+ven las mismas entradas:
+- Búsqueda exacta por índice único (lang_pair, sha256(source_text))
+- Upsert: count/confidence se actualizan en SQL sobre la fila bloqueada
+- Caché LRU por proceso, invalidada por poll_changes()
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from models.product_sheet import TranslationMemoryEntry
+from .memory_store import MemoryChanges, MemoryStore
+
+
+_MISSING = object()
+
+
+class SqlMemoryStore(MemoryStore):
+    """
+    Store multi-proceso sobre la tabla translation_memory.
+
+    Las entradas cacheadas (incluidas las ausencias) pueden quedar desfasadas
+    respecto a otros workers hasta la siguiente llamada a poll_changes(), que
+    TranslationEngine hace en cada ciclo de recarga automática.
+    """
+
+    # Margen hacia atrás en cada poll: cubre transacciones que confirman con un
+    # updated_at anterior al último poll y pequeñas diferencias de reloj
+    POLL_OVERLAP = timedelta(seconds=10)
+
+    # Tamaño de lote para consultas IN y para importaciones
+    CHUNK_SIZE = 500
+
+    def __init__(self, session_factory=None, cache_size: int = 2048):
+        """
+        Inicializar SqlMemoryStore.
+
+        Args:
+            session_factory: Factoría de sesiones (por defecto SessionLocal de backend.database)
+            cache_size: Entradas máximas en la caché LRU del proceso
+        """
+        if session_factory is None:
+            from backend.database import SessionLocal as session_factory
+
+        self.session_factory = session_factory
+        self.cache_size = cache_size
+
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._last_poll = datetime.utcnow()
+        self._seen: Dict[Tuple[str, str], datetime] = {}
+
+        # El router se importa antes de init_db(): crear la tabla si falta
+        with self.session_factory() as db:
+            TranslationMemoryEntry.__table__.create(bind=db.get_bind(), checkfirst=True)
+
+    def get(self, lang_pair: str, source_text: str) -> Optional[Dict]:
+        key = (lang_pair, source_text)
+
+        cached = self._cache_get(key)
+        if cached is not _MISSING:
+            return cached
+
+        with self.session_factory() as db:
+            row = db.execute(
+                select(TranslationMemoryEntry).where(
+                    TranslationMemoryEntry.lang_pair == lang_pair,
+                    TranslationMemoryEntry.source_hash == self._hash(source_text)
+                )
+            ).scalar_one_or_none()
+
+            entry = self._to_entry(row) if row is not None and row.source_text == source_text else None
+
+        self._cache_put(key, entry)
+        return entry
+
+    def get_many(self, lang_pair: str, source_texts: Iterable[str]) -> Dict[str, Dict]:
+        entries = {}
+        pending = {}
+
+        for source_text in source_texts:
+            cached = self._cache_get((lang_pair, source_text))
+            if cached is _MISSING:
+                pending[self._hash(source_text)] = source_text
+            elif cached is not None:
+                entries[source_text] = cached
+
+        if not pending:
+            return entries
+
+        hashes = list(pending)
+        found = {}
+
+        with self.session_factory() as db:
+            for start in range(0, len(hashes), self.CHUNK_SIZE):
+                rows = db.execute(
+                    select(TranslationMemoryEntry).where(
+                        TranslationMemoryEntry.lang_pair == lang_pair,
+                        TranslationMemoryEntry.source_hash.in_(hashes[start:start + self.CHUNK_SIZE])
+                    )
+                ).scalars()
+
+                for row in rows:
+                    if pending.get(row.source_hash) == row.source_text:
+                        found[row.source_text] = self._to_entry(row)
+
+        for source_text in pending.values():
+            entry = found.get(source_text)
+            self._cache_put((lang_pair, source_text), entry)
+            if entry is not None:
+                entries[source_text] = entry
+
+        return entries
+
+    def upsert(self,
+               lang_pair: str,
+               source_text: str,
+               target_text: str,
+               confidence: float) -> Tuple[Dict, bool]:
+        source_hash = self._hash(source_text)
+        where = (
+            TranslationMemoryEntry.lang_pair == lang_pair,
+            TranslationMemoryEntry.source_hash == source_hash,
+        )
+
+        for attempt in range(2):
+            db = self.session_factory()
+            try:
+                now = datetime.utcnow()
+
+                # El UPDATE atómico bloquea la fila (la base entera en SQLite)
+                # antes de leer translations: ningún guardado concurrente se pierde
+                result = db.execute(
+                    update(TranslationMemoryEntry)
+                    .where(*where)
+                    .values(
+                        count=TranslationMemoryEntry.count + 1,
+                        confidence=(TranslationMemoryEntry.confidence + confidence) / 2,
+                        updated_at=now
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                created = result.rowcount == 0
+
+                if created:
+                    row = TranslationMemoryEntry(
+                        lang_pair=lang_pair,
+                        source_hash=source_hash,
+                        source_text=source_text,
+                        translations=[target_text],
+                        count=1,
+                        confidence=confidence,
+                        created_at=now,
+                        updated_at=now
+                    )
+                    db.add(row)
+                    db.flush()
+                else:
+                    row = db.execute(select(TranslationMemoryEntry).where(*where)).scalar_one()
+                    if target_text not in (row.translations or []):
+                        row.translations = list(row.translations or []) + [target_text]
+
+                entry = self._to_entry(row)
+                db.commit()
+                break
+            except IntegrityError:
+                # Otro worker insertó la misma entrada: reintentar como actualización
+                db.rollback()
+                if attempt:
+                    raise
+            finally:
+                db.close()
+
+        self._cache_put((lang_pair, source_text), entry)
+        return entry, created
+
+    def source_texts(self) -> Dict[str, List[str]]:
+        texts: Dict[str, List[str]] = {}
+
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(TranslationMemoryEntry.lang_pair, TranslationMemoryEntry.source_text)
+                .order_by(TranslationMemoryEntry.created_at, TranslationMemoryEntry.entry_id)
+                .execution_options(yield_per=5000)
+            )
+            for lang_pair, source_text in rows:
+                texts.setdefault(lang_pair, []).append(source_text)
+
+        return texts
+
+    def iter_entries(self) -> Iterator[Tuple[str, str, Dict]]:
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(TranslationMemoryEntry)
+                .order_by(TranslationMemoryEntry.lang_pair, TranslationMemoryEntry.created_at)
+                .execution_options(yield_per=1000)
+            ).scalars()
+
+            for row in rows:
+                yield row.lang_pair, row.source_text, self._to_entry(row)
+
+    def counts(self) -> Dict[str, int]:
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(TranslationMemoryEntry.lang_pair, func.count())
+                .group_by(TranslationMemoryEntry.lang_pair)
+            ).all()
+
+        return {lang_pair: total for lang_pair, total in rows}
+
+    def poll_changes(self) -> Optional[MemoryChanges]:
+        """Entradas añadidas o modificadas (por cualquier worker) desde el último poll."""
+        with self._poll_lock:
+            now = datetime.utcnow()
+            since = self._last_poll - self.POLL_OVERLAP
+
+            with self.session_factory() as db:
+                rows = db.execute(
+                    select(
+                        TranslationMemoryEntry.lang_pair,
+                        TranslationMemoryEntry.source_text,
+                        TranslationMemoryEntry.updated_at
+                    ).where(TranslationMemoryEntry.updated_at >= since)
+                ).all()
+
+            self._last_poll = now
+
+            # Las filas dentro del margen ya vistas en el poll anterior no cuentan
+            seen = {}
+            changed: Dict[str, List[str]] = {}
+
+            for lang_pair, source_text, updated_at in rows:
+                key = (lang_pair, source_text)
+                seen[key] = updated_at
+                if self._seen.get(key) != updated_at:
+                    changed.setdefault(lang_pair, []).append(source_text)
+
+            self._seen = seen
+
+        if not changed:
+            return None
+
+        with self._cache_lock:
+            for lang_pair, source_texts in changed.items():
+                for source_text in source_texts:
+                    self._cache.pop((lang_pair, source_text), None)
+
+        return MemoryChanges(replaced=False, texts=changed)
+
+    def import_memory(self, memory: Dict) -> int:
+        """
+        Importar un dict de memory (ej: translation_memory.json).
+
+        Las entradas ya existentes en la tabla no se modifican.
+
+        Args:
+            memory: Dict {lang_pair: {source_text: entrada}}
+
+        Returns:
+            Número de entradas importadas
+        """
+        imported = 0
+
+        with self.session_factory() as db:
+            for lang_pair, entries in memory.items():
+                items = list(entries.items())
+
+                for start in range(0, len(items), self.CHUNK_SIZE):
+                    chunk = {self._hash(source_text): (source_text, entry)
+                             for source_text, entry in items[start:start + self.CHUNK_SIZE]}
+
+                    existing = set(db.execute(
+                        select(TranslationMemoryEntry.source_hash).where(
+                            TranslationMemoryEntry.lang_pair == lang_pair,
+                            TranslationMemoryEntry.source_hash.in_(list(chunk))
+                        )
+                    ).scalars())
+
+                    for source_hash, (source_text, entry) in chunk.items():
+                        if source_hash in existing:
+                            continue
+
+                        db.add(TranslationMemoryEntry(
+                            lang_pair=lang_pair,
+                            source_hash=source_hash,
+                            source_text=source_text,
+                            translations=list(entry.get("translations", [])),
+                            count=entry.get("count", 1),
+                            confidence=entry.get("confidence", 0.8),
+                            created_at=self._parse_datetime(entry.get("created_at")),
+                            updated_at=self._parse_datetime(entry.get("updated_at"))
+                        ))
+                        imported += 1
+
+            try:
+                db.commit()
+            except IntegrityError:
+                # Otro worker importó a la vez
+                db.rollback()
+                return 0
+
+        return imported
+
+    def _cache_get(self, key: Tuple[str, str]):
+        """Entrada cacheada (None si se sabe que no existe, _MISSING si no está en caché)."""
+        with self._cache_lock:
+            if key not in self._cache:
+                return _MISSING
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+    def _cache_put(self, key: Tuple[str, str], entry: Optional[Dict]):
+        """Guardar en la caché LRU, expulsando la entrada menos usada."""
+        if self.cache_size <= 0:
+            return
+
+        with self._cache_lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _hash(source_text: str) -> str:
+        """Clave del índice único: SHA-256 del texto origen."""
+        return hashlib.sha256(source_text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _to_entry(row: TranslationMemoryEntry) -> Dict:
+        """Fila -> entrada con el mismo formato que translation_memory.json."""
+        return {
+            "translations": list(row.translations or []),
+            "count": row.count,
+            "confidence": row.confidence,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "updated_at": row.updated_at.isoformat() if row.updated_at else None
+        }
+
+    @staticmethod
+    def _parse_datetime(value: Optional[str]) -> datetime:
+        """Fecha ISO de translation_memory.json (ahora si falta o es inválida)."""
+        try:
+            return datetime.fromisoformat(value) if value else datetime.utcnow()
+        except ValueError:
+            return datetime.utcnow()
@@ -2,17 +2,35 @@
 Translation Engine - Sugerencias Multidioma con Fuzzy Matching
 
 Proporciona traducción automática basada en:
-- Translation memory (JSON) con traducciones previas
+- Translation memory (JSON + journal JSONL, o tabla SQL compartida entre
+  workers) con traducciones previas
 - Glossaries (YAML) con términos específicos por familia
-- Fuzzy matching para sugerencias similares
+- Fuzzy matching para sugerencias similares (con índice de candidatos)
 """
 
-import json
-import difflib
+import threading
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, NamedTuple
 import yaml
-from datetime import datetime
+
+from .fuzzy_index import FuzzyMatchIndex
+from .glossary_index import GlossaryIndex, normalize_family
+from .memory_journal import file_signature
+from .memory_store import JsonMemoryStore, MemoryChanges, MemoryStore
+
+
+class EngineState(NamedTuple):
+    """
+    Estado inmutable (por referencia) del motor.
+    
+    Se sustituye entero con una sola asignación al recargar, de modo que una
+    petición en curso que captura el estado al empezar nunca ve una mezcla de
+    datos viejos y nuevos. Ni el dict ni los índices se modifican una vez
+    publicados: save_translation y las recargas incrementales publican
+    índices nuevos creados con FuzzyMatchIndex.extended().
+    """
+    fuzzy_indexes: Dict[str, FuzzyMatchIndex]
+    glossary_index: GlossaryIndex
 
 
 class TranslationEngine:
@@ -21,37 +39,116 @@ class TranslationEngine:
     
     Funcionalidades:
     - suggest_translation(): Sugerencias basadas en memory + glossary + fuzzy matching
+    - suggest_batch(): Sugerencias para muchos textos en una sola llamada
+    - suggest_terms(): Términos de glossary contenidos en un texto largo
     - save_translation(): Guardar nueva traducción en memory
     - get_glossary(): Obtener glosario para familia y idioma
     - export_memory_to_csv(): Exportar memory a CSV
+    - flush(): Persistir lo pendiente (compactar journal con backend JSON)
+    - reload_if_changed(): Recargar glossaries/memory modificados fuera del proceso
+    - start_auto_reload(): Polling periódico de mtimes en background
     """
     
     def __init__(self, 
                  memory_path: str = "backend/translations/translation_memory.json",
-                 glossaries_dir: str = "backend/translations/glossaries"):
+                 glossaries_dir: str = "backend/translations/glossaries",
+                 journal_compact_every: int = 500,
+                 memory_backend: str = "json",
+                 memory_cache_size: int = 2048,
+                 store: Optional[MemoryStore] = None):
         """
         Inicializar TranslationEngine.
         
         Args:
             memory_path: Ruta al archivo translation_memory.json
             glossaries_dir: Directorio con archivos glossary_*.yaml
+            journal_compact_every: Guardados en journal antes de compactar el snapshot
+            memory_backend: "json" (un proceso) o "sql" (tabla compartida entre workers)
+            memory_cache_size: Entradas en la caché LRU del backend "sql"
+            store: MemoryStore ya construido (ignora memory_backend)
         """
         self.memory_path = Path(memory_path)
         self.glossaries_dir = Path(glossaries_dir)
-        self.memory = self._load_translation_memory()
-        self.glossaries = self._load_glossaries()
+        self.store = store or self._create_store(memory_backend, journal_compact_every, memory_cache_size)
+        
+        self._glossary_signatures: Dict[Path, Tuple[int, int]] = {}
+        self._index_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._reload_stop: Optional[threading.Event] = None
+        
+        glossaries = self._load_glossaries()
+        self._state = EngineState(
+            fuzzy_indexes=self._build_fuzzy_indexes(self.store.source_texts()),
+            glossary_index=GlossaryIndex(glossaries)
+        )
     
-    def _load_translation_memory(self) -> Dict:
-        """Cargar translation memory desde JSON."""
-        if not self.memory_path.exists():
-            return {}
+    def _create_store(self, memory_backend: str, compact_every: int, cache_size: int) -> MemoryStore:
+        """
+        Construir el store de translation memory.
         
-        try:
-            with open(self.memory_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading translation memory: {e}")
-            return {}
+        Con "sql", si la tabla está vacía se importa translation_memory.json
+        (snapshot + journal) una única vez.
+        """
+        if memory_backend == "json":
+            return JsonMemoryStore(self.memory_path, compact_every=compact_every)
+        
+        if memory_backend != "sql":
+            raise ValueError(f"Unknown translation memory backend: {memory_backend}")
+        
+        from .sql_memory_store import SqlMemoryStore
+        
+        store = SqlMemoryStore(cache_size=cache_size)
+        
+        if not store.counts() and self.memory_path.exists():
+            imported = store.import_memory(JsonMemoryStore(self.memory_path, compact_every=compact_every).memory)
+            print(f"Imported {imported} translation memory entries into the database")
+        
+        return store
+    
+    @property
+    def fuzzy_indexes(self) -> Dict[str, FuzzyMatchIndex]:
+        """Índices fuzzy vigentes por par de idiomas."""
+        return self._state.fuzzy_indexes
+    
+    @property
+    def glossary_index(self) -> GlossaryIndex:
+        """Glossaries compilados vigentes."""
+        return self._state.glossary_index
+    
+    @property
+    def glossaries(self) -> Dict:
+        """Glossaries tal como están en YAML: {family: {lang: {subfamily: {term: translation}}}}."""
+        return self._state.glossary_index.glossaries
+    
+    def _build_fuzzy_indexes(self,
+                             texts: Dict[str, List[str]],
+                             previous: Optional[EngineState] = None) -> Dict[str, FuzzyMatchIndex]:
+        """
+        Construir un índice fuzzy por par de idiomas.
+        
+        Args:
+            texts: Textos origen por par de idiomas (MemoryStore.source_texts())
+            previous: Estado anterior; se reutilizan los índices de los pares
+                      cuyos textos origen no han cambiado
+        
+        Returns:
+            Dict con estructura: {lang_pair: FuzzyMatchIndex}
+        """
+        indexes = {}
+        
+        for lang_pair, source_texts in texts.items():
+            if (previous is not None
+                    and lang_pair in previous.fuzzy_indexes
+                    and previous.fuzzy_indexes[lang_pair].same_texts(source_texts)):
+                indexes[lang_pair] = previous.fuzzy_indexes[lang_pair]
+                continue
+            
+            index = FuzzyMatchIndex()
+            for source_text in source_texts:
+                index.add(source_text)
+            indexes[lang_pair] = index
+        
+        return indexes
     
     def _load_glossaries(self) -> Dict:
         """
@@ -68,25 +165,171 @@ class TranslationEngine:
         # Buscar todos los archivos glossary_*.yaml
         for yaml_file in self.glossaries_dir.glob("glossary_*.yaml"):
             try:
-                # Parse filename: glossary_cosmetics_pt.yaml -> family=cosmetics, lang=pt
-                parts = yaml_file.stem.replace("glossary_", "").split("_")
-                if len(parts) >= 2:
-                    family = "_".join(parts[:-1])  # cosmetics, food, etc.
-                    lang = parts[-1]  # pt, it, en, etc.
-                    
-                    with open(yaml_file, 'r', encoding='utf-8') as f:
-                        glossary_data = yaml.safe_load(f)
+                signature = file_signature(yaml_file)
+                loaded = self._load_glossary_file(yaml_file)
+                if loaded:
+                    family, lang, glossary_data = loaded
                     
                     # Organizar por familia
                     if family not in glossaries:
                         glossaries[family] = {}
                     glossaries[family][lang] = glossary_data
+                
+                self._glossary_signatures[yaml_file] = signature
             
             except Exception as e:
                 print(f"Error loading glossary {yaml_file}: {e}")
         
         return glossaries
     
+    def _load_glossary_file(self, yaml_file: Path) -> Optional[Tuple[str, str, Dict]]:
+        """
+        Cargar un archivo glossary_<family>_<lang>.yaml.
+        
+        Returns:
+            Tupla (family, lang, data) o None si el nombre no es válido
+        """
+        key = self._glossary_key(yaml_file)
+        if key is None:
+            return None
+        
+        with open(yaml_file, 'r', encoding='utf-8') as f:
+            glossary_data = yaml.safe_load(f)
+        
+        return key[0], key[1], glossary_data
+    
+    @staticmethod
+    def _glossary_key(yaml_file: Path) -> Optional[Tuple[str, str]]:
+        """Parse filename: glossary_cosmetics_pt.yaml -> (cosmetics, pt)."""
+        parts = yaml_file.stem.replace("glossary_", "").split("_")
+        if len(parts) < 2:
+            return None
+        return "_".join(parts[:-1]), parts[-1]
+    
+    def reload_if_changed(self) -> Dict:
+        """
+        Recargar glossaries y translation memory modificados en disco.
+        
+        Solo se vuelven a leer los archivos cuya firma (mtime, tamaño) ha
+        cambiado, y solo se recompilan los glossaries e índices fuzzy afectados.
+        El nuevo estado se publica con una única asignación.
+        
+        Returns:
+            Dict con lo recargado: {"glossaries": [...], "memory": bool}
+        """
+        with self._reload_lock:
+            reloaded_glossaries = self._reload_glossaries()
+            reloaded_memory = self._reload_memory()
+        
+        return {
+            "glossaries": reloaded_glossaries,
+            "memory": reloaded_memory
+        }
+    
+    def _reload_glossaries(self) -> List[str]:
+        """Recargar solo los glossary_*.yaml añadidos, modificados o eliminados."""
+        if self.glossaries_dir.exists():
+            current = {f: file_signature(f) for f in self.glossaries_dir.glob("glossary_*.yaml")}
+        else:
+            current = {}
+        
+        changed_files = [f for f, sig in current.items() if self._glossary_signatures.get(f) != sig]
+        removed_files = [f for f in self._glossary_signatures if f not in current]
+        
+        if not changed_files and not removed_files:
+            return []
+        
+        state = self._state
+        glossaries = {family: dict(langs) for family, langs in state.glossary_index.glossaries.items()}
+        changed_keys = set()
+        reloaded = []
+        
+        for yaml_file in removed_files:
+            key = self._glossary_key(yaml_file)
+            if key and key[1] in glossaries.get(key[0], {}):
+                del glossaries[key[0]][key[1]]
+                if not glossaries[key[0]]:
+                    del glossaries[key[0]]
+                changed_keys.add(key)
+            del self._glossary_signatures[yaml_file]
+            reloaded.append(yaml_file.name)
+        
+        for yaml_file in changed_files:
+            try:
+                loaded = self._load_glossary_file(yaml_file)
+            except Exception as e:
+                # Archivo a medio escribir: se reintenta en el siguiente ciclo
+                print(f"Error reloading glossary {yaml_file}: {e}")
+                continue
+            
+            if loaded:
+                family, lang, glossary_data = loaded
+                glossaries.setdefault(family, {})[lang] = glossary_data
+                changed_keys.add((family, lang))
+            
+            self._glossary_signatures[yaml_file] = current[yaml_file]
+            reloaded.append(yaml_file.name)
+        
+        if changed_keys:
+            glossary_index = state.glossary_index.updated(glossaries, changed_keys)
+            
+            with self._index_lock:
+                self._state = self._state._replace(glossary_index=glossary_index)
+        
+        return reloaded
+    
+    def _reload_memory(self) -> bool:
+        """Aplicar cambios de translation memory hechos fuera de este proceso."""
+        # Bajo el lock de índices: un save_translation concurrente publica su
+        # texto sobre el estado resultante, no sobre uno que se va a descartar
+        with self._index_lock:
+            changes: Optional[MemoryChanges] = self.store.poll_changes()
+            
+            if changes is None:
+                return False
+            
+            state = self._state
+            
+            if changes.replaced:
+                fuzzy_indexes = self._build_fuzzy_indexes(changes.texts, previous=state)
+                self._state = state._replace(fuzzy_indexes=fuzzy_indexes)
+            else:
+                # Copy-on-write: las búsquedas en curso siguen con los índices anteriores
+                fuzzy_indexes = dict(state.fuzzy_indexes)
+                for lang_pair, source_texts in changes.texts.items():
+                    fuzzy_indexes[lang_pair] = fuzzy_indexes.get(lang_pair, FuzzyMatchIndex()).extended(source_texts)
+                self._state = state._replace(fuzzy_indexes=fuzzy_indexes)
+        
+        return True
+    
+    def start_auto_reload(self, interval: float = 5.0):
+        """
+        Lanzar un hilo que comprueba cambios en disco cada `interval` segundos.
+        
+        Args:
+            interval: Segundos entre comprobaciones (<= 0 desactiva)
+        """
+        if interval <= 0 or self._reload_stop is not None:
+            return
+        
+        stop = threading.Event()
+        self._reload_stop = stop
+        
+        def poll():
+            while not stop.wait(interval):
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    print(f"Error reloading translations: {e}")
+        
+        threading.Thread(target=poll, daemon=True, name="translation-reload").start()
+    
+    def stop_auto_reload(self):
+        """Detener el hilo de recarga automática."""
+        if self._reload_stop is not None:
+            self._reload_stop.set()
+            self._reload_stop = None
+    
     def suggest_translation(self, 
                            source_text: str, 
                            source_lang: str, 
@@ -116,46 +359,136 @@ class TranslationEngine:
                 ...
             ]
         """
-        suggestions = []
         key = f"{source_lang}-{target_lang}"
+        state = self._state
+        
+        exact_entry = self.store.get(key, source_text)
+        glossary_terms = self._search_in_glossary(source_text, family, target_lang, state) if family else []
+        fuzzy_matches = self._fuzzy_search(source_text, key, threshold, state)
+        
+        return self._build_suggestions(exact_entry, glossary_terms, fuzzy_matches, max_suggestions)
+    
+    def suggest_batch(self,
+                      items: List[Dict],
+                      threshold: float = 0.75,
+                      max_suggestions: int = 5,
+                      include_fuzzy: bool = True) -> List[List[Dict]]:
+        """
+        Sugerir traducciones para muchos textos compartiendo el trabajo.
+        
+        - Entradas idénticas se resuelven una sola vez
+        - El glosario se consulta en el índice precompilado (sin recorrer subfamilias)
+        - Cada texto único se busca una vez por par de idiomas con el umbral
+          más bajo pedido y se filtra después por el umbral de cada entrada
+        
+        Args:
+            items: Lista de dicts con source_text, source_lang, target_lang,
+                   family (opcional), threshold y max_suggestions (opcionales)
+            threshold: Umbral por defecto para entradas que no lo indiquen
+            max_suggestions: Máximo por defecto para entradas que no lo indiquen
+            include_fuzzy: Si False, solo exact match y glossary (sin búsqueda fuzzy)
+        
+        Returns:
+            Lista de listas de sugerencias, en el mismo orden que items
+        """
+        state = self._state
+        
+        # Deduplicar entradas idénticas
+        unique_requests = {}
+        item_keys = []
+        
+        for item in items:
+            request_key = (
+                item["source_text"],
+                item["source_lang"],
+                item["target_lang"],
+                item.get("family") or None,
+                item.get("threshold", threshold),
+                item.get("max_suggestions", max_suggestions),
+            )
+            unique_requests.setdefault(request_key, None)
+            item_keys.append(request_key)
+        
+        # Umbral mínimo por (par de idiomas, texto) para una sola búsqueda fuzzy
+        fuzzy_thresholds: Dict[Tuple[str, str], float] = {}
+        for source_text, source_lang, target_lang, _, item_threshold, _ in unique_requests:
+            fuzzy_key = (f"{source_lang}-{target_lang}", source_text)
+            fuzzy_thresholds[fuzzy_key] = min(item_threshold, fuzzy_thresholds.get(fuzzy_key, item_threshold))
+        
+        fuzzy_cache = {}
+        for (lang_pair, source_text), min_threshold in fuzzy_thresholds.items():
+            if include_fuzzy and lang_pair in state.fuzzy_indexes:
+                fuzzy_cache[(lang_pair, source_text)] = self._fuzzy_search(source_text, lang_pair, min_threshold, state)
+        
+        for request_key in unique_requests:
+            source_text, source_lang, target_lang, family, item_threshold, item_max = request_key
+            lang_pair = f"{source_lang}-{target_lang}"
+            
+            exact_entry = self.store.get(lang_pair, source_text)
+            glossary_terms = self._search_in_glossary(source_text, family, target_lang, state) if family else []
+            
+            fuzzy_matches = [
+                match for match in fuzzy_cache.get((lang_pair, source_text), [])
+                if match[2] >= item_threshold
+            ]
+            
+            unique_requests[request_key] = self._build_suggestions(
+                exact_entry, glossary_terms, fuzzy_matches, item_max
+            )
+        
+        return [list(unique_requests[request_key]) for request_key in item_keys]
+    
+    def _build_suggestions(self,
+                           exact_entry: Optional[Dict],
+                           glossary_terms: List[str],
+                           fuzzy_matches: List[Tuple[str, Dict, float]],
+                           max_suggestions: int) -> List[Dict]:
+        """
+        Combinar exact match, glossary y fuzzy matches en la lista final.
+        
+        Args:
+            exact_entry: Entrada de memory para el texto exacto (o None)
+            glossary_terms: Traducciones encontradas en glossary
+            fuzzy_matches: Tuplas (texto_original, data, ratio) de _fuzzy_search
+            max_suggestions: Número máximo de sugerencias a retornar
+        
+        Returns:
+            Lista de sugerencias ordenadas por confidence
+        """
+        suggestions = []
         
-        # 1. Buscar exact match en memory
-        if key in self.memory and source_text in self.memory[key]:
-            entry = self.memory[key][source_text]
-            for translation in entry["translations"]:
+        # 1. Exact match en memory
+        if exact_entry:
+            for translation in exact_entry["translations"]:
                 suggestions.append({
                     "text": translation,
-                    "confidence": entry.get("confidence", 0.95),
+                    "confidence": exact_entry.get("confidence", 0.95),
                     "source": "exact_match",
-                    "count": entry.get("count", 0)
+                    "count": exact_entry.get("count", 0)
                 })
         
-        # 2. Buscar en glossary si se especifica familia
-        if family:
-            glossary_terms = self._search_in_glossary(source_text, family, target_lang)
-            for term in glossary_terms:
-                suggestions.append({
-                    "text": term,
-                    "confidence": 0.99,  # Glossary tiene alta confianza
-                    "source": "glossary",
-                    "count": 0
-                })
+        # 2. Glossary
+        for term in glossary_terms:
+            suggestions.append({
+                "text": term,
+                "confidence": 0.99,  # Glossary tiene alta confianza
+                "source": "glossary",
+                "count": 0
+            })
         
         # 3. Fuzzy matching en memory
-        if key in self.memory:
-            fuzzy_matches = self._fuzzy_search(source_text, self.memory[key], threshold)
-            for match_text, match_data, ratio in fuzzy_matches:
-                for translation in match_data["translations"]:
-                    # Ajustar confidence según ratio de similitud
-                    adjusted_confidence = match_data.get("confidence", 0.8) * ratio
-                    suggestions.append({
-                        "text": translation,
-                        "confidence": adjusted_confidence,
-                        "source": "fuzzy_match",
-                        "count": match_data.get("count", 0),
-                        "original_match": match_text,
-                        "similarity": ratio
-                    })
+        for match_text, match_data, ratio in fuzzy_matches:
+            for translation in match_data["translations"]:
+                # Ajustar confidence según ratio de similitud
+                adjusted_confidence = match_data.get("confidence", 0.8) * ratio
+                suggestions.append({
+                    "text": translation,
+                    "confidence": adjusted_confidence,
+                    "source": "fuzzy_match",
+                    "count": match_data.get("count", 0),
+                    "original_match": match_text,
+                    "similarity": ratio
+                })
         
         # Eliminar duplicados manteniendo el de mayor confidence
         unique_suggestions = {}
@@ -171,7 +504,11 @@ class TranslationEngine:
         
         return final_suggestions[:max_suggestions]
     
-    def _search_in_glossary(self, source_text: str, family: str, target_lang: str) -> List[str]:
+    def _search_in_glossary(self,
+                            source_text: str,
+                            family: str,
+                            target_lang: str,
+                            state: Optional[EngineState] = None) -> List[str]:
         """
         Buscar traducción en glossary para familia y idioma específico.
         
@@ -179,55 +516,78 @@ class TranslationEngine:
             source_text: Texto a buscar
             family: Familia de producto (cosmetics, food, etc.)
             target_lang: Idioma destino (pt, it, en)
+            state: Estado capturado por el llamador (por defecto el vigente)
         
         Returns:
             Lista de traducciones encontradas en glossary
         """
-        translations = []
-        
-        # Normalizar family name (COSMETICS_FACIAL -> cosmetics)
-        family_normalized = family.lower().split("_")[0] if "_" in family else family.lower()
-        
-        if family_normalized not in self.glossaries:
-            return translations
-        
-        if target_lang not in self.glossaries[family_normalized]:
-            return translations
+        state = state or self._state
+        return state.glossary_index.lookup(source_text, family, target_lang)
+    
+    def suggest_terms(self, source_text: str, family: str, target_lang: str) -> List[Dict]:
+        """
+        Detectar términos de glossary dentro de un texto largo.
         
-        glossary = self.glossaries[family_normalized][target_lang]
+        Usa un autómata Aho-Corasick precompilado: una sola pasada lineal por
+        el texto, independiente del tamaño del glossary.
         
-        # Buscar en todas las subfamilias del glossary
-        for subfamily, terms in glossary.items():
-            if isinstance(terms, dict) and source_text in terms:
-                translations.append(terms[source_text])
+        Args:
+            source_text: Texto origen (ej: párrafo de modo de empleo)
+            family: Familia de producto (COSMETICS_FACIAL, FOOD_PACKAGED, etc.)
+            target_lang: Idioma destino (pt, it, en)
         
-        return translations
+        Returns:
+            Lista de términos encontrados en orden de aparición:
+            [
+                {
+                    "term": "Uso externo",
+                    "matched_text": "uso externo",
+                    "translations": ["Uso esterno"],
+                    "start": 10,
+                    "end": 21
+                },
+                ...
+            ]
+        """
+        return self.glossary_index.find_terms(source_text, family, target_lang)
     
     def _fuzzy_search(self, 
                      text: str, 
-                     memory_dict: Dict, 
-                     threshold: float) -> List[Tuple[str, Dict, float]]:
+                     lang_pair: str, 
+                     threshold: float,
+                     state: Optional[EngineState] = None) -> List[Tuple[str, Dict, float]]:
         """
-        Búsqueda fuzzy en memory dict.
+        Búsqueda fuzzy en memory para un par de idiomas.
+        
+        Solo los candidatos que superan las cotas del índice se comparan con
+        SequenceMatcher, con los mismos resultados que recorrer toda la memory.
         
         Args:
             text: Texto a buscar
-            memory_dict: Dict de translation memory para idioma específico
+            lang_pair: Par de idiomas (ej: "es-pt")
             threshold: Umbral mínimo de similitud
+            state: Estado capturado por el llamador (por defecto el vigente)
         
         Returns:
             Lista de tuplas (texto_original, data, ratio_similitud)
         """
-        matches = []
+        state = state or self._state
+        index = state.fuzzy_indexes.get(lang_pair)
         
-        for stored_text, data in memory_dict.items():
-            # Calcular similitud usando SequenceMatcher
-            ratio = difflib.SequenceMatcher(None, 
-                                           text.lower(), 
-                                           stored_text.lower()).ratio()
-            
-            if ratio >= threshold:
-                matches.append((stored_text, data, ratio))
+        if index is None:
+            return []
+        
+        found = index.search(text, threshold)
+        if not found:
+            return []
+        
+        entries = self.store.get_many(lang_pair, [stored_text for stored_text, _ in found])
+        
+        matches = [
+            (stored_text, entries[stored_text], ratio)
+            for stored_text, ratio in found
+            if stored_text in entries
+        ]
         
         # Ordenar por ratio DESC
         matches.sort(key=lambda x: x[2], reverse=True)
@@ -241,7 +601,7 @@ class TranslationEngine:
                         target_lang: str,
                         confidence: float = 0.95):
         """
-        Guardar nueva traducción en memory y persistir a JSON.
+        Guardar nueva traducción en memory (upsert en el store).
         
         Args:
             source_text: Texto origen
@@ -252,47 +612,22 @@ class TranslationEngine:
         """
         key = f"{source_lang}-{target_lang}"
         
-        if key not in self.memory:
-            self.memory[key] = {}
-        
-        if source_text not in self.memory[key]:
-            # Nueva entrada
-            self.memory[key][source_text] = {
-                "translations": [target_text],
-                "count": 1,
-                "confidence": confidence,
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat()
-            }
-        else:
-            # Actualizar entrada existente
-            entry = self.memory[key][source_text]
-            
-            # Añadir traducción si no existe
-            if target_text not in entry["translations"]:
-                entry["translations"].append(target_text)
-            
-            entry["count"] = entry.get("count", 0) + 1
-            entry["updated_at"] = datetime.utcnow().isoformat()
-            
-            # Actualizar confidence (promedio ponderado)
-            old_confidence = entry.get("confidence", 0.8)
-            entry["confidence"] = (old_confidence + confidence) / 2
+        _, created = self.store.upsert(key, source_text, target_text, confidence)
         
-        # Persistir a archivo
-        self._persist_memory()
+        if created:
+            with self._index_lock:
+                state = self._state
+                index = state.fuzzy_indexes.get(key, FuzzyMatchIndex()).extended([source_text])
+                self._state = state._replace(fuzzy_indexes={**state.fuzzy_indexes, key: index})
     
-    def _persist_memory(self):
-        """Guardar translation memory a archivo JSON."""
-        try:
-            # Crear directorio si no existe
-            self.memory_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(self.memory_path, 'w', encoding='utf-8') as f:
-                json.dump(self.memory, f, ensure_ascii=False, indent=2)
+    def flush(self):
+        """
+        Persistir lo pendiente del store de translation memory.
         
-        except Exception as e:
-            print(f"Error persisting translation memory: {e}")
+        Con el backend JSON compacta el journal en translation_memory.json.
+        Útil al apagar el proceso para dejar un snapshot completo.
+        """
+        self.store.flush()
     
     def get_glossary(self, family: str, target_lang: str) -> Dict:
         """
@@ -305,15 +640,16 @@ class TranslationEngine:
         Returns:
             Dict con términos y traducciones
         """
-        family_normalized = family.lower().split("_")[0] if "_" in family else family.lower()
+        glossaries = self.glossaries
+        family_normalized = normalize_family(family)
         
-        if family_normalized not in self.glossaries:
+        if family_normalized not in glossaries:
             return {}
         
-        if target_lang not in self.glossaries[family_normalized]:
+        if target_lang not in glossaries[family_normalized]:
             return {}
         
-        return self.glossaries[family_normalized][target_lang]
+        return glossaries[family_normalized][target_lang]
     
     def export_memory_to_csv(self, output_path: str):
         """
@@ -326,21 +662,20 @@ class TranslationEngine:
         
         rows = []
         
-        for lang_pair, translations in self.memory.items():
+        for lang_pair, source_text, data in self.store.iter_entries():
             source_lang, target_lang = lang_pair.split("-")
             
-            for source_text, data in translations.items():
-                for target_text in data["translations"]:
-                    rows.append({
-                        "source_lang": source_lang,
-                        "target_lang": target_lang,
-                        "source_text": source_text,
-                        "target_text": target_text,
-                        "count": data.get("count", 0),
-                        "confidence": data.get("confidence", 0.0),
-                        "created_at": data.get("created_at", ""),
-                        "updated_at": data.get("updated_at", "")
-                    })
+            for target_text in data["translations"]:
+                rows.append({
+                    "source_lang": source_lang,
+                    "target_lang": target_lang,
+                    "source_text": source_text,
+                    "target_text": target_text,
+                    "count": data.get("count", 0),
+                    "confidence": data.get("confidence", 0.0),
+                    "created_at": data.get("created_at", ""),
+                    "updated_at": data.get("updated_at", "")
+                })
         
         # Escribir CSV
         with open(output_path, 'w', newline='', encoding='utf-8') as f:
@@ -357,17 +692,20 @@ class TranslationEngine:
         Returns:
             Dict con estadísticas: total_pairs, total_translations, languages, etc.
         """
-        total_pairs = len(self.memory)
-        total_translations = sum(len(translations) for translations in self.memory.values())
+        counts = self.store.counts()
+        glossaries = self.glossaries
+        
+        total_pairs = len(counts)
+        total_translations = sum(counts.values())
         
         languages = set()
-        for lang_pair in self.memory.keys():
+        for lang_pair in counts.keys():
             source, target = lang_pair.split("-")
             languages.add(source)
             languages.add(target)
         
         glossary_count = sum(
-            len(langs) for langs in self.glossaries.values()
+            len(langs) for langs in glossaries.values()
         )
         
         return {
@@ -375,5 +713,5 @@ class TranslationEngine:
             "total_source_texts": total_translations,
             "languages_supported": sorted(list(languages)),
             "glossaries_loaded": glossary_count,
-            "families_with_glossaries": list(self.glossaries.keys())
+            "families_with_glossaries": list(glossaries.keys())
         }
@@ -3,6 +3,8 @@ import axios from 'axios'
 const api = axios.create({
   baseURL: import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000/api',
   timeout: 10000,
+  // Send the last_write cookie so reads after a write hit the primary database
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json',
   }